@@ -3,17 +3,21 @@ Quiz Routes - Handles adaptive quiz flows and answer submission
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.db.session import get_db
-from app.core.dependencies import get_current_user
+from app.db.session import get_db, get_async_db
+from app.core.dependencies import get_current_user, get_current_user_async
 from app.models.user import User
 from app.models.question import Question
 from app.models.attempt import Attempt
 from app.schemas.question_schema import QuestionForQuiz, SubmitAnswerRequest, DiagnosticCompleteRequest
 from app.schemas.analytics_schema import RiskScoreResponse
 from app.core.service_container import get_service_container
+from app.core.logging import get_logger
 from app.core.exceptions import (
     NotFoundError,
     QuizSelectionError,
@@ -21,46 +25,38 @@ from app.core.exceptions import (
     ValidationError
 )
 from app.services.core.student_state import StudentState
-from app.services.persistence.mastery_repository import MasteryRepository
-from app.services.persistence.attempt_repository import AttemptRepository
+from app.services.persistence.mastery_repository import MasteryRepository, AsyncMasteryRepository
+from app.services.persistence.attempt_repository import AttemptRepository, AsyncAttemptRepository
+from app.services.persistence.student_state_repository import (
+    StudentStateRepository,
+    AsyncStudentStateRepository
+)
 
 router = APIRouter(prefix="/quiz", tags=["Quiz"])
 
+logger = get_logger("quiz_routes")
+
 
 def _get_or_create_student_state(db: Session, user_id: int) -> StudentState:
     """
-    Get or create in-memory student state from database.
-    This loads mastery, attempt history, and risk profile.
+    Get or create in-memory student state.
+    Served from the process-wide cache; on a miss this loads mastery,
+    attempt history, and risk profile from the database.
     """
-    state = StudentState(student_id=user_id)
-    
-    # Load mastery from DB
-    mastery_rows = db.query(Mastery).filter(Mastery.user_id == user_id).all()
-    for row in mastery_rows:
-        state.mastery_dict[row.concept] = row.mastery_value
-        state.confidence_metrics[row.concept] = row.confidence
-    
-    # Load attempt history
-    attempts = db.query(Attempt).filter(Attempt.user_id == user_id).all()
-    for attempt in attempts:
-        concept_row = db.query(Question).filter(Question.id == attempt.question_id).first()
-        if concept_row:
-            concept = concept_row.concept
-            state.attempt_history.setdefault(concept, []).append(attempt.is_correct)
-    
-    # Load latest risk profile
-    latest_risk = db.query(RiskHistory).filter(
-        RiskHistory.student_id == str(user_id)
-    ).order_by(RiskHistory.timestamp.desc()).first()
-    
-    if latest_risk:
-        state.risk_profile = {
-            "risk_probability": latest_risk.risk_score,
-            "risk_label": latest_risk.risk_label,
-            "risk_level": "high" if latest_risk.risk_score > 0.6 else "medium" if latest_risk.risk_score > 0.3 else "low"
-        }
-    
-    return state
+    services = get_service_container()
+    return services.student_state_cache.get_or_load(
+        user_id,
+        lambda: StudentStateRepository.load(db, user_id)
+    )
+
+
+def _process_submission(services, **kwargs) -> dict:
+    """
+    Run one submission on the current published graph. The graph is read
+    once, so the whole submission sees a single version even if a reload
+    lands meanwhile.
+    """
+    return services.pipeline.process_submission(graph=services.concept_graph, **kwargs)
 
 
 # Import at module level after function definitions
@@ -69,17 +65,17 @@ from app.models.risk_history import RiskHistory
 
 
 @router.get("/questions/all")
-def get_all_questions(
+async def get_all_questions(
     limit: int = 500,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Get all questions grouped by topic (used for diagnostic test).
     Returns questions organized by topic with options.
     """
     try:
-        questions = db.query(Question).limit(limit).all()
+        questions = (await db.execute(select(Question).limit(limit))).scalars().all()
         
         if not questions:
             raise NotFoundError("Question", "any")
@@ -114,20 +110,20 @@ def get_all_questions(
 
 
 @router.get("/questions/by-concept/{concept}")
-def get_questions_by_concept(
+async def get_questions_by_concept(
     concept: str,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Get questions for a specific concept.
     Returns questions with options.
     """
     try:
-        questions = db.query(Question).filter(
-            Question.concept == concept
-        ).limit(limit).all()
+        questions = (await db.execute(
+            select(Question).where(Question.concept == concept).limit(limit)
+        )).scalars().all()
         
         if not questions:
             raise NotFoundError("Question", f"with concept {concept}")
@@ -209,6 +205,13 @@ def complete_diagnostic_quiz(
         # Mark that the student has taken the diagnostic
         current_user.has_taken_diagnostic = True
         db.commit()
+
+        services = get_service_container()
+        services.student_state_cache.invalidate(current_user.id)
+        services.class_aggregate.apply(current_user.id, {
+            concept: mastery_data.get("value", 0.5) if isinstance(mastery_data, dict) else 0.5
+            for concept, mastery_data in mastery_scores.items()
+        })
         return {"success": True, "message": "Diagnostic quiz results saved"}
     
     except Exception as e:
@@ -231,7 +234,7 @@ def get_next_question(
     - Recent performance
     """
     try:
-        services = get_service_container(db)
+        services = get_service_container()
         
         # Get student state
         student_state = _get_or_create_student_state(db, current_user.id)
@@ -277,10 +280,10 @@ def get_next_question(
 
 
 @router.post("/submit")
-def submit_answer(
+async def submit_answer(
     request: SubmitAnswerRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Submit an answer to a quiz question.
@@ -293,9 +296,9 @@ def submit_answer(
     5. Propagate dependencies
     6. Extract risk features
     7. Predict risk
-    8. Generate analytics insights
     
     Returns updated mastery, risk score, and next question metadata.
+    Class analytics are refreshed in the background after the commit.
     """
     try:
         # Validate input
@@ -305,7 +308,7 @@ def submit_answer(
             raise ValidationError("confidence must be between 1-10")
         
         # Get question
-        question = db.query(Question).filter(Question.id == request.question_id).first()
+        question = await db.get(Question, request.question_id)
         if not question:
             raise NotFoundError("Question", request.question_id)
         
@@ -313,10 +316,18 @@ def submit_answer(
         is_correct = request.user_answer.strip().lower() == question.correct_answer.strip().lower()
         
         # Get service container
-        services = get_service_container(db)
+        services = get_service_container()
         
-        # Get or create student state
-        student_state = _get_or_create_student_state(db, current_user.id)
+        # Load the state from the primary, never from the cache: another
+        # worker may have committed since this process cached it, and the
+        # pipeline mutates the object in place.
+        student_state = await AsyncStudentStateRepository.load(db, current_user.id)
+        
+        # Values as currently persisted, used to write only what changes
+        persisted_mastery = {
+            c: (v, student_state.confidence_metrics.get(c, 0.5))
+            for c, v in student_state.mastery_dict.items()
+        }
         
         # Initialize concept if not seen before
         concept = question.concept
@@ -330,8 +341,12 @@ def submit_answer(
         # Process through cognitive pipeline
         class_states = {}  # Placeholder for class-level state
         
+        # numpy/sklearn work and the training sink run in the threadpool,
+        # not on the event loop
         try:
-            pipeline_result = services.pipeline.process_submission(
+            pipeline_result = await run_in_threadpool(
+                _process_submission,
+                services,
                 user_id=current_user.id,
                 student_state=student_state,
                 concept=concept,
@@ -345,23 +360,24 @@ def submit_answer(
             raise PipelineError(f"Pipeline processing failed: {str(e)}")
         
         # Store attempt in database
-        attempt = Attempt(
+        AsyncAttemptRepository.save_attempt(
+            db,
             user_id=current_user.id,
             question_id=request.question_id,
             is_correct=is_correct,
             confidence=request.confidence
         )
-        db.add(attempt)
         
-        # Store updated mastery values
-        for concept_name, mastery_value in student_state.mastery_dict.items():
-            MasteryRepository.upsert_mastery(
-                db,
-                current_user.id,
-                concept_name,
-                mastery_value,
-                student_state.confidence_metrics.get(concept_name, 0.5)
-            )
+        # Store updated mastery values (changed concepts only, one upsert statement)
+        await AsyncMasteryRepository.bulk_upsert_mastery(
+            db,
+            current_user.id,
+            {
+                concept_name: (mastery_value, student_state.confidence_metrics.get(concept_name, 0.5))
+                for concept_name, mastery_value in student_state.mastery_dict.items()
+            },
+            previous=persisted_mastery
+        )
         
         # Store risk score to database for real-time analytics
         if student_state.risk_profile:
@@ -372,7 +388,24 @@ def submit_answer(
             )
             db.add(risk_entry)
         
-        db.commit()
+        await db.commit()
+
+        # Write-through for the read routes: this object is not shared until
+        # now and later submits load their own copy
+        services.student_state_cache.put(current_user.id, student_state)
+        
+        # Teacher-facing analytics: coalesced per classroom, off the request path.
+        # The answer is already committed, so a failure here must not fail the
+        # request (a retry would submit it twice)
+        try:
+            await db.run_sync(
+                services.class_analytics.submission_committed,
+                current_user.id,
+                {c: student_state.mastery_dict[c] for c in pipeline_result["changed_concepts"]},
+                risk=float(student_state.risk_profile.get("risk_probability", 0)) if student_state.risk_profile else None
+            )
+        except Exception as e:
+            logger.warning(f"Class analytics update failed for user {current_user.id}: {e}")
         
         # Return response with updated state
         return {
@@ -448,7 +481,7 @@ def get_explanation(
         if not question:
             raise NotFoundError("Question", question_id)
         
-        services = get_service_container(db)
+        services = get_service_container()
         student_state = _get_or_create_student_state(db, current_user.id)
         
         # Get mastery for this concept
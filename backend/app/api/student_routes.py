@@ -1,44 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db, get_read_db, get_async_read_db
 from app.models.classroom import Classroom
 from app.models.classroom_student import ClassroomStudent
 from app.models.mastery import Mastery
 from app.models.attempt import Attempt
 from app.models.risk_history import RiskHistory
-from app.core.dependencies import require_role, get_current_user
+from app.core.dependencies import require_role, get_current_user, get_current_user_async
 from app.models.user import RoleEnum, User
 from app.schemas.analytics_schema import DashboardResponse, InsightResponse
 from app.core.service_container import get_service_container
-from app.services.core.student_state import StudentState
+from app.core.logging import get_logger
+from app.services.persistence.student_state_repository import AsyncStudentStateRepository
+from app.services.persistence.attempt_repository import AsyncAttemptRepository
 
 router = APIRouter(prefix="/student", tags=["Student"])
 
-
-def _get_student_state(db: Session, user_id: int) -> StudentState:
-    """Load student state from database"""
-    state = StudentState(student_id=user_id)
-    
-    # Load mastery
-    mastery_rows = db.query(Mastery).filter(Mastery.user_id == user_id).all()
-    for row in mastery_rows:
-        state.mastery_dict[row.concept] = row.mastery_value
-        state.confidence_metrics[row.concept] = row.confidence
-    
-    # Load latest risk profile
-    latest_risk = db.query(RiskHistory).filter(
-        RiskHistory.student_id == str(user_id)
-    ).order_by(RiskHistory.timestamp.desc()).first()
-    
-    if latest_risk:
-        state.risk_profile = {
-            "risk_probability": latest_risk.risk_score,
-            "risk_label": latest_risk.risk_label,
-            "risk_level": "high" if latest_risk.risk_score > 0.6 else "medium" if latest_risk.risk_score > 0.3 else "low"
-        }
-    
-    return state
+logger = get_logger("student_routes")
 
 
 @router.post("/join/{classroom_id}")
@@ -73,22 +54,27 @@ def join_classroom(
 
 
 @router.get("/dashboard")
-def get_student_dashboard(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_student_dashboard(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> DashboardResponse:
     """
     Get student's personal dashboard with mastery, risk, and insights.
     """
     try:
-        services = get_service_container(db)
-        student_state = _get_student_state(db, current_user.id)
+        services = get_service_container()
+        student_state = await AsyncStudentStateRepository.load_for_read(
+            db, current_user.id, services.student_state_cache
+        )
         
         # Generate insights
         try:
-            weak_topics = services.insight_generator.weak_topics(db, current_user.id)
-            calibration_gap = services.insight_generator.calibration_gap(db, current_user.id)
-        except:
+            weak_topics = await db.run_sync(services.insight_generator.weak_topics, current_user.id)
+            calibration_gap = await db.run_sync(services.insight_generator.calibration_gap, current_user.id)
+        except SQLAlchemyError as e:
+            # Fall back to the state's own concepts; roll back so the queries below can run
+            logger.warning(f"Insight queries failed for student {current_user.id}: {e}")
+            await db.rollback()
             weak_topics = list(student_state.mastery_dict.keys())[:3]
             calibration_gap = 0.0
         
@@ -110,9 +96,7 @@ def get_student_dashboard(
             recommended_topics=weak_topics[:3]
         )
         
-        recent_attempts = db.query(Attempt).filter(
-            Attempt.user_id == current_user.id
-        ).order_by(Attempt.id.desc()).limit(10).all()
+        recent_attempts = await AsyncAttemptRepository.recent_attempts(db, current_user.id)
         
         recent_data = [
             {"question_id": a.question_id, "is_correct": a.is_correct, "confidence": a.confidence}
@@ -133,7 +117,7 @@ def get_student_dashboard(
 
 @router.get("/classrooms")
 def get_student_classrooms(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_role(RoleEnum.student))
 ):
     """Get all classrooms the student is enrolled in"""
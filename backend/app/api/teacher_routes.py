@@ -1,47 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db, get_read_db, get_async_read_db
 from app.models.classroom import Classroom
 from app.models.classroom_student import ClassroomStudent
 from app.models.user import User
 from app.models.attempt import Attempt
 from app.models.mastery import Mastery
 from app.models.risk_history import RiskHistory
-from app.schemas.classroom_schema import ClassroomCreate, ClassroomResponse
+from app.schemas.classroom_schema import ClassroomCreate, ClassroomResponse, ConceptGraphUpload
 from app.schemas.analytics_schema import ClassAnalyticsResponse, DashboardResponse, InsightResponse
-from app.core.dependencies import require_role
+from app.core.dependencies import require_role, require_role_async
 from app.models.user import RoleEnum
 from app.core.service_container import get_service_container
+from app.core.logging import get_logger
 from app.core.exceptions import NotFoundError
-from app.services.core.student_state import StudentState
+from app.services.persistence.student_state_repository import (
+    StudentStateRepository,
+    AsyncStudentStateRepository
+)
+from app.services.persistence.attempt_repository import AsyncAttemptRepository
+from app.services.analytics.class_risk_aggregator import ClassRiskAggregator
+from app.services.analytics.heatmap_builder import HeatmapBuilder
+from app.services.risk_engine.risk_orchestrator import RiskOrchestrator
+from app.services.risk_engine.feature_extractor import RiskFeatureExtractor
+from app.services.cognitive_engine.concept_graph import ConceptGraph, GraphCycleError
+from app.services.persistence.concept_graph_repository import ConceptGraphRepository
+from app.services.core.concept_graph_store import classroom_scope
+from app.services.core.event_bus import EventBus, classroom_topic
 
 router = APIRouter(prefix="/teacher", tags=["Teacher"])
 
+logger = get_logger("teacher_routes")
 
-def _get_student_state(db: Session, user_id: int) -> StudentState:
-    """Load student state from database"""
-    state = StudentState(student_id=user_id)
-    
-    # Load mastery
-    mastery_rows = db.query(Mastery).filter(Mastery.user_id == user_id).all()
-    for row in mastery_rows:
-        state.mastery_dict[row.concept] = row.mastery_value
-        state.confidence_metrics[row.concept] = row.confidence
-    
-    # Load latest risk profile
-    latest_risk = db.query(RiskHistory).filter(
-        RiskHistory.student_id == str(user_id)
-    ).order_by(RiskHistory.timestamp.desc()).first()
-    
-    if latest_risk:
-        state.risk_profile = {
-            "risk_probability": latest_risk.risk_score,
-            "risk_label": latest_risk.risk_label,
-            "risk_level": "high" if latest_risk.risk_score > 0.6 else "medium" if latest_risk.risk_score > 0.3 else "low"
-        }
-    
-    return state
+
+def _get_student_states(db: Session, user_ids: list) -> dict:
+    """
+    Load states for a whole roster: cached states are reused and the
+    rest are bulk-loaded (mastery + latest risk) in a constant number of queries.
+    """
+    cache = get_service_container().student_state_cache
+
+    states = {}
+    missing = []
+    for user_id in user_ids:
+        state = cache.get(user_id)
+        if state is None:
+            missing.append(user_id)
+        else:
+            states[user_id] = state
+
+    states.update(StudentStateRepository.load_many(db, missing))
+    return states
 
 
 @router.post("/classroom", response_model=ClassroomResponse)
@@ -68,7 +85,7 @@ def create_classroom(
 
 @router.get("/classrooms")
 def get_teacher_classrooms(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(require_role(RoleEnum.teacher))
 ):
     """
@@ -99,7 +116,7 @@ def get_teacher_classrooms(
 @router.get("/classroom/{classroom_id}/students")
 def get_classroom_students(
     classroom_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(require_role(RoleEnum.teacher))
 ):
     """
@@ -113,23 +130,26 @@ def get_classroom_students(
         if classroom.teacher_id != current_user.id:
             raise HTTPException(status_code=403, detail="You do not have access to this classroom")
         
-        students = db.query(ClassroomStudent).filter(
+        students = db.query(User).join(
+            ClassroomStudent,
+            ClassroomStudent.student_id == User.id
+        ).filter(
             ClassroomStudent.classroom_id == classroom_id
-        ).all()
+        ).order_by(ClassroomStudent.id).all()
+        
+        states = _get_student_states(db, list({student.id for student in students}))
         
         student_list = []
-        for cs in students:
-            student = db.query(User).filter(User.id == cs.student_id).first()
-            if student:
-                state = _get_student_state(db, student.id)
-                student_list.append({
-                    "id": student.id,
-                    "email": student.email,
-                    "role": student.role,
-                    "mastery": state.mastery_dict,
-                    "risk": state.risk_profile.get("risk_probability", 0) if state.risk_profile else 0,
-                    "risk_level": state.risk_profile.get("risk_level", "low") if state.risk_profile else "low"
-                })
+        for student in students:
+            state = states[student.id]
+            student_list.append({
+                "id": student.id,
+                "email": student.email,
+                "role": student.role,
+                "mastery": state.mastery_dict,
+                "risk": state.risk_profile.get("risk_probability", 0) if state.risk_profile else 0,
+                "risk_level": state.risk_profile.get("risk_level", "low") if state.risk_profile else "low"
+            })
         
         return student_list
     except HTTPException:
@@ -143,7 +163,7 @@ def get_classroom_students(
 @router.get("/classroom/{classroom_id}/insights")
 def get_class_insights(
     classroom_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(require_role(RoleEnum.teacher))
 ) -> ClassAnalyticsResponse:
     """
@@ -157,16 +177,12 @@ def get_class_insights(
         if classroom.teacher_id != current_user.id:
             raise HTTPException(status_code=403, detail="You do not have access to this classroom")
         
-        services = get_service_container(db)
-        
-        # Get all students in class
-        students = db.query(ClassroomStudent).filter(
+        # Count enrolled students
+        total_students = db.query(func.count(ClassroomStudent.id)).filter(
             ClassroomStudent.classroom_id == classroom_id
-        ).all()
-        
-        student_ids = [s.student_id for s in students]
+        ).scalar()
         
-        if not student_ids:
+        if not total_students:
             return ClassAnalyticsResponse(
                 class_id=classroom_id,
                 average_mastery=0.0,
@@ -176,53 +192,31 @@ def get_class_insights(
                 heatmap={}
             )
         
-        # Calculate class-level metrics
-        student_mastery_averages = []
-        at_risk_count = 0
-        concept_totals = {}
-        concept_counts = {}
+        # Class-level metrics are aggregated in the database, scoped to this classroom
+        class_risk = ClassRiskAggregator.aggregate_for_classroom(db, classroom_id)
+        total_mastery_score = class_risk["average_mastery"]
         
-        for student_id in student_ids:
-            state = _get_student_state(db, student_id)
-            
-            # Get risk
-            if state.risk_profile and state.risk_profile.get("risk_probability", 0) > 0.6:
-                at_risk_count += 1
-            
-            # Aggregate mastery by concept
-            student_total = 0.0
-            for concept, value in state.mastery_dict.items():
-                concept_totals[concept] = concept_totals.get(concept, 0) + value
-                concept_counts[concept] = concept_counts.get(concept, 0) + 1
-                student_total += value
-            
-            # Average per student
-            if state.mastery_dict:
-                student_mastery_averages.append(student_total / len(state.mastery_dict))
+        at_risk_count = ClassRiskAggregator.at_risk_count_for_classroom(db, classroom_id)
         
-        # Calculate class average from per-student averages
-        total_mastery_score = sum(student_mastery_averages) / len(student_mastery_averages) if student_mastery_averages else 0.0
+        concept_averages = HeatmapBuilder.concept_averages_for_classroom(db, classroom_id)
         
         weak_concepts = sorted(
-            [
-                (concept, concept_totals[concept] / concept_counts[concept])
-                for concept in concept_totals
-            ],
+            concept_averages.items(),
             key=lambda x: x[1]
         )[:5]
         
         weak_concept_names = [c[0] for c in weak_concepts]
         
         heatmap = {
-            concept: round(concept_totals.get(concept, 0) / max(concept_counts.get(concept, 1), 1), 2)
-            for concept in concept_totals
+            concept: round(value, 2)
+            for concept, value in concept_averages.items()
         }
         
         return ClassAnalyticsResponse(
             class_id=classroom_id,
             average_mastery=round(total_mastery_score, 2),
             at_risk_count=at_risk_count,
-            total_students=len(student_ids),
+            total_students=total_students,
             weak_concepts=weak_concept_names,
             heatmap=heatmap
         )
@@ -235,41 +229,302 @@ def get_class_insights(
         raise HTTPException(status_code=500, detail=f"Failed to get class insights: {str(e)}")
 
 
-@router.get("/student/{student_id}/dashboard")
-def get_student_dashboard(
-    student_id: int,
+@router.post("/classroom/{classroom_id}/rescore")
+def rescore_classroom(
+    classroom_id: int,
     db: Session = Depends(get_db),
     current_user = Depends(require_role(RoleEnum.teacher))
+):
+    """
+    Re-score risk for every enrolled student in one vectorized pass.
+
+    Builds one (N x 17) feature matrix for the roster, predicts it in a
+    single call, appends a RiskHistory row per student and pushes the
+    new scores to live dashboards. Like the submit pipeline, temporal
+    features use the last 10 attempts on one concept: the concept the
+    student attempted most recently.
+    """
+    try:
+        classroom = db.query(Classroom).filter(Classroom.id == classroom_id).first()
+        if not classroom:
+            raise NotFoundError("Classroom", classroom_id)
+
+        if classroom.teacher_id != current_user.id:
+            raise HTTPException(status_code=403, detail="You do not have access to this classroom")
+
+        student_ids = [
+            row.student_id for row in
+            db.query(ClassroomStudent.student_id)
+            .filter(ClassroomStudent.classroom_id == classroom_id)
+            .distinct()
+            .all()
+        ]
+
+        if not student_ids:
+            return {"classroom_id": classroom_id, "scored": 0, "scores": []}
+
+        services = get_service_container()
+        pipeline = services.pipeline
+
+        states = _get_student_states(db, student_ids)
+        recent_attempts = StudentStateRepository.latest_concept_attempts_many(db, student_ids)
+
+        # Features use the classroom's own syllabus graph when one is published
+        orchestrator = RiskOrchestrator(
+            RiskFeatureExtractor(services.graph_store.for_classroom(db, classroom)),
+            pipeline.risk_predictor
+        )
+        results = orchestrator.compute_risk_batch(
+            [states[student_id] for student_id in student_ids],
+            attempt_histories=[recent_attempts[student_id] for student_id in student_ids]
+        )
+
+        rows = [
+            {
+                "student_id": str(student_id),
+                "risk_label": int(result["risk_probability"] >= 0.5),
+                "risk_score": result["risk_probability"]
+            }
+            for student_id, result in zip(student_ids, results)
+        ]
+        db.execute(insert(RiskHistory), rows)
+        db.commit()
+
+        # Cached states are shared with read routes, so they are dropped
+        # rather than edited; the next read loads the new profile
+        for student_id in student_ids:
+            services.student_state_cache.invalidate(student_id)
+
+        EventBus.push_teacher_update(classroom_id, {
+            "type": "risk_scores",
+            "classroom_id": classroom_id,
+            "risk": {student_id: row["risk_score"] for student_id, row in zip(student_ids, rows)}
+        })
+
+        return {
+            "classroom_id": classroom_id,
+            "scored": len(rows),
+            "scores": [
+                {
+                    "student_id": student_id,
+                    "risk_probability": round(result["risk_probability"], 4),
+                    "risk_level": result["risk_level"]
+                }
+                for student_id, result in zip(student_ids, results)
+            ]
+        }
+
+    except HTTPException:
+        raise
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to re-score classroom: {str(e)}")
+
+
+def _get_owned_classroom(db: Session, classroom_id: int, current_user) -> Classroom:
+    classroom = db.query(Classroom).filter(Classroom.id == classroom_id).first()
+    if not classroom:
+        raise NotFoundError("Classroom", classroom_id)
+
+    if classroom.teacher_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You do not have access to this classroom")
+
+    return classroom
+
+
+@router.get("/classroom/{classroom_id}/concept-graph")
+def get_classroom_concept_graph(
+    classroom_id: int,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(require_role(RoleEnum.teacher))
+):
+    """
+    The concept graph in effect for a classroom: its own published graph,
+    else its subject's, else the global one.
+    """
+    try:
+        classroom = _get_owned_classroom(db, classroom_id, current_user)
+
+        store = get_service_container().graph_store
+        scope = store.resolve_scope(db, classroom)
+        graph = store.get(scope, db)
+
+        return {
+            "classroom_id": classroom_id,
+            "scope": scope,
+            "version": store.version(scope),
+            "concepts": sorted(graph.nodes),
+            "edges": graph.edges(),
+            "max_depth": graph.max_depth()
+        }
+
+    except HTTPException:
+        raise
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get concept graph: {str(e)}")
+
+
+@router.put("/classroom/{classroom_id}/concept-graph")
+def publish_classroom_concept_graph(
+    classroom_id: int,
+    data: ConceptGraphUpload,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(RoleEnum.teacher))
+):
+    """
+    Publish a new version of the classroom's concept graph.
+    Validated in one pass (all cycles are reported). It takes effect for
+    this classroom's re-scoring and concept-graph views at once in this
+    process, and in other workers within CONCEPT_GRAPH_CHECK_SECONDS.
+    Quiz submissions keep using the CONCEPT_GRAPH_SCOPE graph.
+    A publish that loses a version-number race is retried, then 409.
+    """
+    try:
+        classroom = _get_owned_classroom(db, classroom_id, current_user)
+
+        if any(len(edge) not in (2, 3) for edge in data.edges):
+            raise HTTPException(status_code=400, detail="Edges must be [parent, child] or [parent, child, weight]")
+
+        try:
+            graph = ConceptGraph.from_edges(data.edges, concepts=data.concepts)
+        except GraphCycleError as e:
+            raise HTTPException(status_code=400, detail={"message": str(e), "cycles": e.cycles})
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid concept graph: {str(e)}")
+
+        scope = classroom_scope(classroom.id)
+        for attempt in range(3):
+            try:
+                row = ConceptGraphRepository.save_version(db, scope, graph)
+                db.commit()
+                break
+            except IntegrityError:
+                # Another publish took this version number; take the next one
+                db.rollback()
+        else:
+            raise HTTPException(
+                status_code=409,
+                detail="The concept graph is being published concurrently, try again"
+            )
+
+        get_service_container().graph_store.reload(scope, db)
+
+        return {
+            "classroom_id": classroom_id,
+            "scope": scope,
+            "version": row.version,
+            "concepts": len(graph.nodes),
+            "edges": graph.total_edges()
+        }
+
+    except HTTPException:
+        raise
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to publish concept graph: {str(e)}")
+
+
+@router.get("/classroom/{classroom_id}/events")
+async def stream_class_events(
+    classroom_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(RoleEnum.teacher))
+):
+    """
+    Server-Sent Events stream of live classroom updates.
+
+    Events published within EVENT_STREAM_BATCH_SECONDS are merged into one
+    `delta` message: {"mastery": {student: {concept: value}},
+    "risk": {student: score}, "analytics": {...latest class refresh}}.
+    """
+    classroom = await db.get(Classroom, classroom_id)
+    if not classroom:
+        raise HTTPException(status_code=404, detail=f"Classroom not found: {classroom_id}")
+
+    if classroom.teacher_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You do not have access to this classroom")
+
+    # The stream is long-lived - don't hold a pooled connection for it
+    await db.close()
+
+    batch_seconds = float(os.getenv("EVENT_STREAM_BATCH_SECONDS", "0.5"))
+    queue_size = int(os.getenv("EVENT_STREAM_QUEUE_SIZE", "256"))
+    keepalive_seconds = float(os.getenv("EVENT_STREAM_KEEPALIVE_SECONDS", "15"))
+
+    async def event_stream():
+        subscription = EventBus.subscribe(classroom_topic(classroom_id), max_queue=queue_size)
+        try:
+            yield "retry: 3000\n\n"
+            async for events in subscription.batches(
+                window=batch_seconds,
+                idle_timeout=keepalive_seconds
+            ):
+                if await request.is_disconnected():
+                    break
+                if not events:
+                    yield ": keepalive\n\n"
+                    continue
+                delta = EventBus.merge_deltas(events)
+                yield f"event: delta\ndata: {json.dumps(delta, default=str)}\n\n"
+        finally:
+            EventBus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/student/{student_id}/dashboard")
+async def get_student_dashboard(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user = Depends(require_role_async(RoleEnum.teacher))
 ) -> DashboardResponse:
     """
     Get detailed dashboard for a specific student.
     """
     try:
         # Verify teacher can access this student
-        student = db.query(User).filter(User.id == student_id).first()
+        student = await db.get(User, student_id)
         if not student:
             raise NotFoundError("User", student_id)
         
         # Check if student is in any of teacher's classrooms
-        has_access = db.query(ClassroomStudent).join(
-            Classroom,
-            Classroom.id == ClassroomStudent.classroom_id
-        ).filter(
-            ClassroomStudent.student_id == student_id,
-            Classroom.teacher_id == current_user.id
-        ).first()
+        has_access = (await db.execute(
+            select(ClassroomStudent.id)
+            .join(Classroom, Classroom.id == ClassroomStudent.classroom_id)
+            .where(
+                ClassroomStudent.student_id == student_id,
+                Classroom.teacher_id == current_user.id
+            )
+            .limit(1)
+        )).first()
         
         if not has_access and current_user.id != student_id:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        services = get_service_container(db)
-        student_state = _get_student_state(db, student_id)
+        services = get_service_container()
+        student_state = await AsyncStudentStateRepository.load_for_read(
+            db, student_id, services.student_state_cache
+        )
         
         # Generate insights
         try:
-            weak_topics = services.insight_generator.weak_topics(db, student_id)
-            calibration_gap = services.insight_generator.calibration_gap(db, student_id)
-        except:
+            weak_topics = await db.run_sync(services.insight_generator.weak_topics, student_id)
+            calibration_gap = await db.run_sync(services.insight_generator.calibration_gap, student_id)
+        except SQLAlchemyError as e:
+            # Fall back to the state's own concepts; roll back so the queries below can run
+            logger.warning(f"Insight queries failed for student {student_id}: {e}")
+            await db.rollback()
             weak_topics = list(student_state.mastery_dict.keys())[:3]
             calibration_gap = 0.0
         
@@ -291,9 +546,7 @@ def get_student_dashboard(
             recommended_topics=weak_topics[:3]
         )
         
-        recent_attempts = db.query(Attempt).filter(
-            Attempt.user_id == student_id
-        ).order_by(Attempt.id.desc()).limit(10).all()
+        recent_attempts = await AsyncAttemptRepository.recent_attempts(db, student_id)
         
         recent_data = [
             {"question_id": a.question_id, "is_correct": a.is_correct, "confidence": a.confidence}
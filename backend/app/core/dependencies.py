@@ -1,15 +1,13 @@
 from fastapi import Request, HTTPException, Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import verify_token
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app.models.user import User
 
 
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db)
-):
+def _user_id_from_request(request: Request):
 
 
     token = request.cookies.get("access_token")
@@ -29,8 +27,10 @@ def get_current_user(
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
+    return user_id
 
-    user = db.query(User).filter(User.id == user_id).first()
+
+def _check_user(user):
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -41,6 +41,30 @@ def get_current_user(
 
     return user
 
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+
+    user_id = _user_id_from_request(request)
+
+    user = db.query(User).filter(User.id == user_id).first()
+
+    return _check_user(user)
+
+
+async def get_current_user_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+
+    user_id = _user_id_from_request(request)
+
+    user = await db.get(User, user_id)
+
+    return _check_user(user)
+
 from app.models.user import RoleEnum
 
 def require_role(required_role: RoleEnum):
@@ -55,4 +79,18 @@ def require_role(required_role: RoleEnum):
 
         return current_user
 
-    return role_checker
\ No newline at end of file
+    return role_checker
+
+def require_role_async(required_role: RoleEnum):
+
+    async def role_checker(current_user: User = Depends(get_current_user_async)):
+
+        if current_user.role != required_role:
+            raise HTTPException(
+                status_code=403,
+                detail="You do not have permission to perform this action"
+            )
+
+        return current_user
+
+    return role_checker
@@ -1,17 +1,31 @@
 """
 Service Container for Dependency Injection
 Centralizes instantiation of all services and engines
+
+The container only holds process-wide resources (concept graph, risk model,
+BKT parameters, caches, background workers). It never holds a database
+session: routes pass their own per-request session to whatever needs one.
 """
 
 from typing import Optional
-from sqlalchemy.orm import Session
 import os
+import threading
 
 from app.services.cognitive_engine.pipeline import CognitivePipeline
 from app.services.cognitive_engine.concept_graph import ConceptGraph
 from app.services.ai_generation.explanation_generator import ExplanationGenerator
 from app.services.analytics.insight_generator import InsightGenerator
+from app.services.analytics.class_mastery_aggregate import ClassMasteryAggregate
+from app.services.analytics.class_analytics_refresher import ClassAnalyticsRefresher
 from app.services.core.submission_controller import SubmissionController
+from app.services.core.student_state_cache import StudentStateCache
+from app.services.core.concept_graph_store import ConceptGraphStore, DEFAULT_SCOPE
+from app.services.core.training_data_store import TrainingDataStore
+from app.services.core.training_sample_sink import (
+    TrainingSampleSink,
+    DatabaseTrainingBackend,
+    FileTrainingBackend
+)
 from app.services.persistence.mastery_repository import MasteryRepository
 from app.services.persistence.attempt_repository import AttemptRepository
 from app.core.exceptions import PipelineError
@@ -21,43 +35,129 @@ class ServiceContainer:
     """
     Global service container.
     Singleton pattern - instantiates once per app lifecycle.
+    Lazy properties are initialized under a lock, so concurrent first
+    requests in the threadpool build each resource exactly once.
     """
 
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self):
+        self._lock = threading.RLock()
         self._pipeline: Optional[CognitivePipeline] = None
-        self._concept_graph: Optional[ConceptGraph] = None
+        self._graph_store: Optional[ConceptGraphStore] = None
         self._explanation_generator: Optional[ExplanationGenerator] = None
         self._insight_generator: Optional[InsightGenerator] = None
         self._submission_controller: Optional[SubmissionController] = None
         self._mastery_repository: Optional[MasteryRepository] = None
-        self._training_data_store: list = []  # In-memory for now
+        self._student_state_cache: Optional[StudentStateCache] = None
+        self._class_aggregate: Optional[ClassMasteryAggregate] = None
+        self._training_sink: Optional[TrainingSampleSink] = None
+        self._class_analytics: Optional[ClassAnalyticsRefresher] = None
+
+    @property
+    def graph_store(self) -> ConceptGraphStore:
+        """
+        Lazy load the versioned concept graph store.
+        Published graphs are picked up within CONCEPT_GRAPH_CHECK_SECONDS.
+        """
+        if self._graph_store is None:
+            with self._lock:
+                if self._graph_store is None:
+                    self._graph_store = ConceptGraphStore(
+                        check_seconds=float(os.getenv("CONCEPT_GRAPH_CHECK_SECONDS", "30"))
+                    )
+        return self._graph_store
 
     @property
     def concept_graph(self) -> ConceptGraph:
-        """Lazy load concept graph"""
-        if self._concept_graph is None:
-            self._concept_graph = ConceptGraph()
-        return self._concept_graph
+        """
+        Live graph of the pipeline's scope (CONCEPT_GRAPH_SCOPE, default "global").
+        Pass it to process_submission as that submission's graph snapshot.
+        """
+        return self.graph_store.get(os.getenv("CONCEPT_GRAPH_SCOPE", DEFAULT_SCOPE))
 
     @property
     def explanation_generator(self) -> ExplanationGenerator:
         """Lazy load explanation generator"""
         if self._explanation_generator is None:
-            try:
-                self._explanation_generator = ExplanationGenerator()
-            except Exception:
-                # Gracefully handle LLM client initialization failure
-                self._explanation_generator = None
+            with self._lock:
+                if self._explanation_generator is None:
+                    try:
+                        self._explanation_generator = ExplanationGenerator()
+                    except Exception:
+                        # Gracefully handle LLM client initialization failure
+                        self._explanation_generator = None
         return self._explanation_generator
 
     @property
     def insight_generator(self) -> InsightGenerator:
         """Lazy load insight generator"""
         if self._insight_generator is None:
-            self._insight_generator = InsightGenerator()
+            with self._lock:
+                if self._insight_generator is None:
+                    self._insight_generator = InsightGenerator()
         return self._insight_generator
 
+    @property
+    def student_state_cache(self) -> StudentStateCache:
+        """Lazy load the process-wide student state cache"""
+        if self._student_state_cache is None:
+            with self._lock:
+                if self._student_state_cache is None:
+                    self._student_state_cache = StudentStateCache(
+                        max_size=int(os.getenv("STUDENT_STATE_CACHE_SIZE", "1024")),
+                        ttl_seconds=float(os.getenv("STUDENT_STATE_CACHE_TTL", "300"))
+                    )
+        return self._student_state_cache
+
+    @property
+    def class_aggregate(self) -> ClassMasteryAggregate:
+        """Lazy load the incrementally maintained class mastery aggregate"""
+        if self._class_aggregate is None:
+            with self._lock:
+                if self._class_aggregate is None:
+                    self._class_aggregate = ClassMasteryAggregate(
+                        refresh_seconds=float(os.getenv("CLASS_AGGREGATE_REFRESH_SECONDS", "300"))
+                    )
+        return self._class_aggregate
+
+    @property
+    def class_analytics(self) -> ClassAnalyticsRefresher:
+        """
+        Lazy load the background class analytics refresher.
+        Submits in the same classroom within ANALYTICS_COALESCE_SECONDS
+        share one recompute; ANALYTICS_WORKER_CONCURRENCY bounds the pool.
+        """
+        if self._class_analytics is None:
+            with self._lock:
+                if self._class_analytics is None:
+                    self._class_analytics = ClassAnalyticsRefresher(
+                        self.class_aggregate,
+                        concurrency=int(os.getenv("ANALYTICS_WORKER_CONCURRENCY", "2")),
+                        coalesce_seconds=float(os.getenv("ANALYTICS_COALESCE_SECONDS", "2.0"))
+                    )
+        return self._class_analytics
+
+    @property
+    def training_sink(self) -> TrainingSampleSink:
+        """
+        Lazy load the bounded training-sample sink.
+        TRAINING_SINK selects the backend: "db" (training_data table) or "file".
+        """
+        if self._training_sink is None:
+            with self._lock:
+                if self._training_sink is None:
+                    if os.getenv("TRAINING_SINK", "db") == "file":
+                        backend = FileTrainingBackend(
+                            TrainingDataStore(os.getenv("TRAINING_DATA_PATH", "training_data.jsonl"))
+                        )
+                    else:
+                        backend = DatabaseTrainingBackend()
+
+                    self._training_sink = TrainingSampleSink(
+                        backend,
+                        capacity=int(os.getenv("TRAINING_SINK_CAPACITY", "10000"))
+                    )
+        return self._training_sink
+
     @property
     def mastery_repository(self) -> MasteryRepository:
         """Get mastery repository"""
@@ -70,20 +170,22 @@ class ServiceContainer:
         This is the core AI engine orchestrator.
         """
         if self._pipeline is None:
-            try:
-                risk_model_path = os.getenv(
-                    "RISK_MODEL_PATH",
-                    "app/services/risk_engine/models/risk_model.joblib"
-                )
-
-                self._pipeline = CognitivePipeline(
-                    graph=self.concept_graph,
-                    risk_model_path=risk_model_path,
-                    training_data_store=self._training_data_store,
-                    db=self.db
-                )
-            except Exception as e:
-                raise PipelineError(f"Failed to initialize cognitive pipeline: {str(e)}")
+            with self._lock:
+                if self._pipeline is None:
+                    try:
+                        risk_model_path = os.getenv(
+                            "RISK_MODEL_PATH",
+                            "app/services/risk_engine/models/risk_model.joblib"
+                        )
+
+                        self._pipeline = CognitivePipeline(
+                            graph=self.concept_graph,
+                            risk_model_path=risk_model_path,
+                            training_data_store=self.training_sink,
+                            class_aggregate=self.class_aggregate
+                        )
+                    except Exception as e:
+                        raise PipelineError(f"Failed to initialize cognitive pipeline: {str(e)}")
 
         return self._pipeline
 
@@ -94,35 +196,56 @@ class ServiceContainer:
         This orchestrates quiz submission processing.
         """
         if self._submission_controller is None:
-            self._submission_controller = SubmissionController(
-                cognitive_pipeline=self.pipeline,
-                training_store=self._training_data_store
-            )
+            with self._lock:
+                if self._submission_controller is None:
+                    self._submission_controller = SubmissionController(
+                        cognitive_pipeline=self.pipeline,
+                        training_store=self.training_sink
+                    )
         return self._submission_controller
 
     def reset_pipeline(self):
         """Reset pipeline (useful for testing or model reloads)"""
-        self._pipeline = None
-        self._concept_graph = None
+        with self._lock:
+            self._pipeline = None
+            self._submission_controller = None
+            if self._graph_store is not None:
+                self._graph_store.clear()
 
 
 # Global container instance
 _service_container: Optional[ServiceContainer] = None
+_service_container_lock = threading.Lock()
 
 
-def get_service_container(db: Session) -> ServiceContainer:
+def get_service_container() -> ServiceContainer:
     """
     Get or initialize the global service container.
     Call this in your FastAPI dependency to get access to all services.
     """
     global _service_container
     if _service_container is None:
-        _service_container = ServiceContainer(db)
+        with _service_container_lock:
+            if _service_container is None:
+                _service_container = ServiceContainer()
     return _service_container
 
 
+def shutdown_service_container():
+    """Flush and stop background resources owned by the container"""
+    if _service_container is None:
+        return
+    if _service_container._class_analytics is not None:
+        _service_container._class_analytics.close()
+    if _service_container._training_sink is not None:
+        _service_container._training_sink.close()
+    if _service_container._graph_store is not None:
+        _service_container._graph_store.close()
+
+
 def reset_service_container():
     """Reset the service container (for testing)"""
     global _service_container
-    _service_container = None
+    with _service_container_lock:
+        _service_container = None
 
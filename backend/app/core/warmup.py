@@ -0,0 +1,139 @@
+"""
+Startup warmup for the cognitive pipeline.
+
+With WARMUP_ON_STARTUP=true the startup event builds the pipeline (loading
+the joblib risk model and importing numpy/sklearn), then runs one full
+process_submission on a throwaway StudentState in a background thread, so
+the first /quiz/submit doesn't pay the cold start. /health returns 503 until
+it's done, and stays 503 ("failed") if the submit path itself is broken.
+"""
+
+import copy
+
+import os
+import threading
+import time
+
+from app.core.logging import get_logger
+
+logger = get_logger("warmup")
+
+
+class WarmupState:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = "disabled"    # disabled | running | ready | failed
+        self.timings_ms = {}
+        self.error = None
+
+    def set(self, **fields):
+        with self._lock:
+            for key, value in fields.items():
+                setattr(self, key, value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snapshot = {"status": self.status, "timings_ms": dict(self.timings_ms)}
+            if self.error:
+                snapshot["error"] = self.error
+            return snapshot
+
+
+_state = WarmupState()
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WARMUP_ON_STARTUP", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def warmup_status() -> dict:
+    return _state.snapshot()
+
+
+def is_ready() -> bool:
+    return _state.status in ("disabled", "ready")
+
+
+class _WarmupSink:
+    """Stands in for the training sink so warmup samples are never persisted"""
+
+    def __init__(self):
+        self.samples = []
+
+    def append(self, features, label, timestamp=None):
+        self.samples.append((features, label))
+
+
+def run_warmup():
+    """Build the pipeline and run one submission through it. Blocking."""
+
+    from app.core.service_container import get_service_container
+    from app.services.core.student_state import StudentState
+    from app.services.analytics.class_mastery_aggregate import ClassMasteryAggregate
+
+    timings = {}
+    _state.set(status="running", timings_ms=timings, error=None)
+    start = time.perf_counter()
+
+    try:
+        step = time.perf_counter()
+        services = get_service_container()
+        pipeline = services.pipeline
+        graph = services.concept_graph
+        timings["pipeline_build"] = round((time.perf_counter() - step) * 1000, 2)
+
+        # Same models and graph, but the side effects (training samples,
+        # class aggregate) go to throwaway objects
+        warm = copy.copy(pipeline)
+        warm.training_data_store = _WarmupSink()
+        warm.class_aggregate = ClassMasteryAggregate()
+
+        # A concept with BKT parameters, like any real question's
+        tracked = sorted(pipeline.mastery_updater.concept_params)
+        concept = next((c for c in tracked if c in graph.nodes), tracked[0])
+
+        state = StudentState(student_id="warmup")
+        state.mastery_dict = {c: 0.5 for c in set(graph.nodes) | {concept}}
+        state.confidence_metrics = dict.fromkeys(state.mastery_dict, 0.5)
+
+        step = time.perf_counter()
+        result = warm.process_submission(
+            user_id=0,
+            student_state=state,
+            concept=concept,
+            correct=True,
+            response_time=1000.0,
+            student_confidence=0.5,
+            total_attempts=0,
+            class_states={},
+            graph=graph
+        )
+        timings["process_submission"] = round((time.perf_counter() - step) * 1000, 2)
+
+        # Fields the submit route persists and returns
+        risk = result["risk"]
+        for field in ("risk_probability", "risk_level", "risk_label"):
+            if field not in risk:
+                raise ValueError(f"Pipeline risk result has no {field!r}")
+        if len(warm.training_data_store.samples) != 1:
+            raise ValueError("Pipeline did not record a training sample")
+
+    except Exception as e:
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        _state.set(status="failed", error=str(e))
+        logger.error(f"Warmup failed after {timings['total']} ms: {e}")
+        return
+
+    timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+    _state.set(status="ready")
+    logger.info(f"Warmup complete in {timings['total']} ms: {timings}")
+
+
+def start_warmup():
+    """Run the warmup in a background thread (startup isn't blocked)."""
+
+    _state.set(status="running")
+    thread = threading.Thread(target=run_warmup, name="pipeline-warmup", daemon=True)
+    thread.start()
+    return thread
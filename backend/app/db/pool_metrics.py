@@ -0,0 +1,105 @@
+"""
+Connection pool metrics.
+
+Engines created by app.db.session use a QueuePool subclass that times every
+checkout, so the wait for a free connection (the symptom of an undersized
+pool) is visible alongside the pool's own checked-out / overflow counters.
+"""
+
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+
+class PoolMetrics:
+    """Checkout wait statistics for one pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3)
+            }
+
+        # QueuePool counters; other pool classes (e.g. SQLite's) may lack them
+        for key, attr in (
+            ("size", "size"),
+            ("checked_out", "checkedout"),
+            ("checked_in", "checkedin"),
+            ("overflow", "overflow"),
+        ):
+            if hasattr(pool, attr):
+                stats[key] = getattr(pool, attr)()
+
+        if hasattr(pool, "_max_overflow"):
+            stats["max_overflow"] = pool._max_overflow
+        if hasattr(pool, "_timeout"):
+            stats["timeout_seconds"] = pool._timeout
+
+        return stats
+
+
+def timed_pool_class(base, metrics: PoolMetrics):
+    """
+    Subclass of `base` (QueuePool / AsyncAdaptedQueuePool) that records the
+    time spent waiting for a connection. A new class per engine keeps the
+    metrics attached when the pool is recreated (engine.dispose()).
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except PoolTimeoutError:
+            metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+# name -> (engine, PoolMetrics)
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def register(name: str, engine, metrics: PoolMetrics = None):
+    with _registry_lock:
+        _registry[name] = (engine, metrics or PoolMetrics(name))
+
+
+def pool_stats() -> dict:
+    """Current stats for every registered engine's pool."""
+
+    with _registry_lock:
+        entries = list(_registry.items())
+
+    stats = {}
+    for name, (engine, metrics) in entries:
+        pool = engine.sync_engine.pool if hasattr(engine, "sync_engine") else engine.pool
+        stats[name] = {
+            "pool_class": type(pool).__name__,
+            **metrics.snapshot(pool)
+        }
+    return stats
@@ -1,9 +1,34 @@
+"""
+Database engines and sessions.
+
+Pool configuration (per engine, per worker process):
+    DB_POOL_SIZE              persistent connections            (default 5)
+    DB_MAX_OVERFLOW           extra connections under burst     (default 10)
+    DB_POOL_TIMEOUT           seconds to wait for a connection  (default 30)
+    DB_POOL_RECYCLE           recycle connections older than N seconds (default 1800, -1 disables)
+    DB_POOL_PRE_PING          ping on every checkout            (default true)
+    DB_STATEMENT_TIMEOUT_MS   server-side statement timeout, PostgreSQL only (default 0 = off)
+
+Each worker holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections per engine
+(sync and async primary, plus the replica when configured), so size the pool
+so that workers x engines x (size + overflow) stays under the server's
+max_connections. Pool sizing is not applied to SQLite.
+
+DATABASE_READ_URL, if set, routes the read-only analytics and dashboard
+routes (get_read_db / get_async_read_db) to a replica.
+"""
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from dotenv import load_dotenv
 from pathlib import Path
 import os
 
+from app.db import pool_metrics
+
 # Load .env first
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 env_path = BASE_DIR / ".env"
@@ -12,11 +37,63 @@ load_dotenv(dotenv_path=env_path)
 
 # THEN read env variables
 DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-)
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine / create_async_engine kwargs from the DB_POOL_* settings"""
+
+    backend = make_url(url).get_backend_name()
+
+    options = {
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", "true"),
+    }
+
+    if backend == "sqlite":
+        return options
+
+    options.update({
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    })
+
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    if statement_timeout and backend == "postgresql":
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+
+    return options
+
+
+def _instrumented_options(name: str, url: str, is_async: bool = False):
+    """engine_options plus a checkout-timing pool class when the pool is sized"""
+
+    options = engine_options(url, is_async)
+    metrics = pool_metrics.PoolMetrics(name)
+
+    if "pool_size" in options:
+        base = AsyncAdaptedQueuePool if is_async else QueuePool
+        options["poolclass"] = pool_metrics.timed_pool_class(base, metrics)
+
+    return options, metrics
+
+
+def _create_engine(name: str, url: str):
+    options, metrics = _instrumented_options(name, url)
+    new_engine = create_engine(url, **options)
+    pool_metrics.register(name, new_engine, metrics)
+    return new_engine
+
+
+engine = _create_engine("primary", DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -29,4 +106,98 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ============================================
+# READ REPLICA (read-only analytics / dashboards)
+# ============================================
+
+read_engine = _create_engine("replica", DATABASE_READ_URL) if DATABASE_READ_URL else engine
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+)
+
+def get_read_db():
+    """Session on the read replica (the primary when DATABASE_READ_URL is unset)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ============================================
+# ASYNC ENGINE (async routes)
+# ============================================
+
+# Async drivers for the sync DATABASE_URL backends
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str = None) -> str:
+    """
+    ASYNC_DATABASE_URL if set (for the primary), else the URL with its
+    driver swapped for the async one (asyncpg / aiosqlite).
+    """
+    if url is None and os.getenv("ASYNC_DATABASE_URL"):
+        return os.getenv("ASYNC_DATABASE_URL")
+
+    url = make_url(url or DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}; set ASYNC_DATABASE_URL")
+
+    return url.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# Created on first use so sync-only tools never import the async drivers
+_async_engines = {}
+_async_session_factories = {}
+
+def _get_async_engine(name: str, url: str):
+    if name not in _async_engines:
+        options, metrics = _instrumented_options(name, url, is_async=True)
+        _async_engines[name] = create_async_engine(url, **options)
+        pool_metrics.register(name, _async_engines[name], metrics)
+    return _async_engines[name]
+
+def get_async_engine():
+    return _get_async_engine("primary_async", async_database_url())
+
+def get_async_read_engine():
+    if not DATABASE_READ_URL:
+        return get_async_engine()
+    return _get_async_engine("replica_async", async_database_url(DATABASE_READ_URL))
+
+def _async_session(name: str, engine_factory) -> AsyncSession:
+    if name not in _async_session_factories:
+        _async_session_factories[name] = async_sessionmaker(
+            bind=engine_factory(),
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _async_session_factories[name]()
+
+def AsyncSessionLocal() -> AsyncSession:
+    return _async_session("primary", get_async_engine)
+
+def AsyncReadSessionLocal() -> AsyncSession:
+    return _async_session("replica", get_async_read_engine)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """Async session on the read replica (the primary when DATABASE_READ_URL is unset)"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    for async_engine in _async_engines.values():
+        await async_engine.dispose()
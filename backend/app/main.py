@@ -6,19 +6,23 @@ from fastapi.exceptions import RequestValidationError
 from pathlib import Path
 import traceback
 
-from app.db.session import engine
+from app.db.session import engine, dispose_async_engine
+from app.db.pool_metrics import pool_stats
 from app.db.base import Base
 
-from app.models.user import User
+from app.models.user import User, RoleEnum
 from app.models.classroom import Classroom
 from app.models.question import Question
 from app.models.attempt import Attempt
 from app.models.mastery import Mastery
 from app.models.classroom_student import ClassroomStudent
+from app.models.concept_graph_version import ConceptGraphVersion
 
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, require_role
 from app.core.logging import get_logger
 from app.core.exceptions import CognitiveException
+from app.core.service_container import shutdown_service_container
+from app.core.warmup import warmup_enabled, start_warmup, warmup_status, is_ready
 from app.api.auth_routes import router as auth_router
 from app.api.teacher_routes import router as teacher_router
 from app.api.student_routes import router as student_router
@@ -110,8 +114,24 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 @app.get("/health")
 def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "cognitive_twin"}
+    """
+    Health check endpoint.
+    Returns 503 until the startup warmup (WARMUP_ON_STARTUP) has finished.
+    """
+    body = {"status": "healthy", "service": "cognitive_twin", "warmup": warmup_status()}
+    if not is_ready():
+        body["status"] = "warming_up" if body["warmup"]["status"] == "running" else "unhealthy"
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@app.get("/health/db-pool")
+def db_pool_metrics(current_user=Depends(require_role(RoleEnum.teacher))):
+    """
+    Connection pool metrics per engine: checked out, overflow, checkout wait.
+    Staff only, since it exposes database topology.
+    """
+    return pool_stats()
 
 
 @app.get("/protected")
@@ -131,12 +151,17 @@ async def startup_event():
     logger.info("✅ Database tables initialized")
     logger.info("✅ Routes registered")
     logger.info("✅ Service container ready")
+    if warmup_enabled():
+        start_warmup()
+        logger.info("⏳ Cognitive pipeline warmup started")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info("🛑 Cognitive Twin Backend shutting down...")
+    shutdown_service_container()
+    await dispose_async_engine()
 
 
 # ============================================
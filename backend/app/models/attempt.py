@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, ForeignKey, Index
 from app.db.base import Base
 
 class Attempt(Base):
     __tablename__ = "attempts"
+    __table_args__ = (
+        # History hydration / recent attempts: WHERE user_id = ? ORDER BY id
+        Index("ix_attempts_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
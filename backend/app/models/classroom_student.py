@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from app.db.base import Base
 
 
 class ClassroomStudent(Base):
     __tablename__ = "classroom_students"
+    __table_args__ = (
+        # Roster joins: WHERE classroom_id = ? -> student_id
+        Index("ix_classroom_students_classroom_student", "classroom_id", "student_id"),
+        # Student's classrooms / teacher access checks: WHERE student_id = ?
+        Index("ix_classroom_students_student", "student_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class ConceptGraphVersion(Base):
+    __tablename__ = "concept_graph_versions"
+    __table_args__ = (
+        # Versions are append-only; the highest version per scope is live
+        UniqueConstraint("scope", "version", name="uq_concept_graph_scope_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, nullable=False, index=True)   # "global", "subject:<name>", "classroom:<id>"
+    version = Column(Integer, nullable=False)
+
+    concepts = Column(JSON, nullable=False)   # [concept, ...]
+    edges = Column(JSON, nullable=False)      # [[parent, child, weight], ...]
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, UniqueConstraint
 from app.db.base import Base
 
 class Mastery(Base):
     __tablename__ = "mastery"
+    __table_args__ = (
+        # One row per (student, concept); target of the bulk upsert
+        UniqueConstraint("user_id", "concept", name="uq_mastery_user_concept"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.base import Base
 
 
 class MasteryHistory(Base):
     __tablename__ = "mastery_history"
+    __table_args__ = (
+        # Insight queries: WHERE user_id = ? AND concept = ? ORDER BY timestamp
+        Index("ix_mastery_history_user_concept_ts", "user_id", "concept", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.base import Base
 
 class RiskHistory(Base):
     __tablename__ = "risk_history"
+    __table_args__ = (
+        # Latest risk: WHERE student_id = ? ORDER BY timestamp DESC
+        Index("ix_risk_history_student_ts", "student_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(String, index=True)
@@ -16,4 +16,9 @@ class ClassroomResponse(BaseModel):
     subject: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ConceptGraphUpload(BaseModel):
+    # [parent, child] or [parent, child, weight]
+    edges: List[List[Any]]
+    concepts: Optional[List[str]] = None
@@ -0,0 +1,39 @@
+"""
+Mastery history compaction job.
+Keeps the last snapshot per (student, concept, bucket) for history older than N days.
+
+Run from backend directory: python app/scripts/compact_mastery_history.py [days] [bucket]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.persistence.mastery_history_writer import MasteryHistoryWriter
+
+
+def compact(older_than_days: int = 30, bucket: str = "hour"):
+    """Compact mastery_history rows older than `older_than_days`"""
+
+    db = SessionLocal()
+
+    try:
+        print(f"Compacting mastery history older than {older_than_days} days (per {bucket})...")
+        deleted = MasteryHistoryWriter.compact(db, older_than_days, bucket)
+        db.commit()
+        print(f"✓ Removed {deleted} superseded history rows")
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Compaction failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    bucket = sys.argv[2] if len(sys.argv) > 2 else "hour"
+    compact(days, bucket)
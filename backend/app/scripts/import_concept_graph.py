@@ -0,0 +1,55 @@
+"""
+Publish a concept graph file as the next version of a scope.
+Running workers pick it up within CONCEPT_GRAPH_CHECK_SECONDS.
+
+Scopes: global, subject:<name>, classroom:<id>
+Formats: .json {"concepts": [...], "edges": [...]} or .csv parent,child[,weight]
+
+Run from backend directory: python app/scripts/import_concept_graph.py <file> [scope]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.cognitive_engine.concept_graph import ConceptGraph, GraphCycleError
+from app.services.persistence.concept_graph_repository import ConceptGraphRepository
+from app.services.core.concept_graph_store import DEFAULT_SCOPE
+
+
+def import_graph(path: str, scope: str = DEFAULT_SCOPE):
+    """Validate the file and store it as a new version of `scope`"""
+
+    try:
+        graph = ConceptGraph.from_file(path)
+    except GraphCycleError as e:
+        print(f"✗ {path} is not a DAG:")
+        for cycle in e.cycles:
+            print("   " + " -> ".join(cycle + cycle[:1]))
+        raise
+
+    db = SessionLocal()
+
+    try:
+        row = ConceptGraphRepository.save_version(db, scope, graph)
+        db.commit()
+        print(
+            f"✓ Published {scope} v{row.version}: {len(graph.nodes)} concepts, "
+            f"{graph.total_edges()} edges, max depth {graph.max_depth()}"
+        )
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Import failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    import_graph(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SCOPE)
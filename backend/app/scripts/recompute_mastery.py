@@ -0,0 +1,131 @@
+"""
+Recompute stored mastery from the attempts table with the current BKT
+parameters (e.g. after changing bkt_config.CONCEPT_PARAMS).
+
+Every student's attempts are replayed in one vectorized pass
+(MasteryUpdater.replay). By default this is a dry run that only reports
+how far the replayed values are from the stored ones; --write replaces
+the stored mastery_value of every replayed (student, concept).
+
+--write is lossy. Only the BKT step is replayed from a 0.5 prior, so
+what the stored values got from dependency propagation and from the
+diagnostic quiz (which writes mastery without attempts) is discarded.
+
+After --write, restart the API workers. Until then their
+StudentStateCache and ClassMasteryAggregate keep serving the old values,
+for up to STUDENT_STATE_CACHE_TTL / CLASS_AGGREGATE_REFRESH_SECONDS.
+Submissions always reload state from the database, so they don't write
+cached values back.
+
+Run from backend directory:
+    python app/scripts/recompute_mastery.py [classroom_id] [--write]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.db.session import SessionLocal
+from app.models.user import User  # registers users for the mastery_history foreign key
+from app.models.attempt import Attempt
+from app.models.question import Question
+from app.models.mastery import Mastery
+from app.models.classroom_student import ClassroomStudent
+from app.services.cognitive_engine.mastery_update import MasteryUpdater
+from app.services.cognitive_engine.bkt_config import CONCEPT_PARAMS
+from app.services.persistence.mastery_repository import MasteryRepository
+
+
+def recompute(classroom_id: int = None, write: bool = False):
+    """Replay attempts (optionally one classroom's roster); store the results only with write=True"""
+
+    db = SessionLocal()
+
+    try:
+        query = (
+            db.query(Attempt.user_id, Question.concept, Attempt.is_correct, Attempt.confidence)
+            .join(Question, Question.id == Attempt.question_id)
+        )
+        if classroom_id is not None:
+            roster = db.query(ClassroomStudent.student_id).filter(
+                ClassroomStudent.classroom_id == classroom_id
+            )
+            query = query.filter(Attempt.user_id.in_(roster.scalar_subquery()))
+
+        start = time.perf_counter()
+        rows = query.order_by(Attempt.id.asc()).all()
+        loaded = time.perf_counter() - start
+
+        user_ids, concepts, is_correct, confidence = (list(column) for column in zip(*rows)) if rows else ([], [], [], [])
+
+        # Attempts store confidence on the 1-10 scale; submit passes it to BKT / 10
+        attempt_log = {
+            "user_id": user_ids,
+            "concept": concepts,
+            "correct": [bool(c) for c in is_correct],
+            "self_confidence": [(c if c is not None else 5) / 10.0 for c in confidence]
+        }
+
+        start = time.perf_counter()
+        result = MasteryUpdater(concept_params=CONCEPT_PARAMS).replay(attempt_log)
+        replayed = time.perf_counter() - start
+
+        print(
+            f"Replayed {len(rows)} attempts for {len(result['mastery'])} students "
+            f"(load {loaded:.2f}s, replay {replayed:.3f}s, {result['skipped']} skipped: no BKT parameters)"
+        )
+
+        existing = {}
+        for row in db.query(Mastery.user_id, Mastery.concept, Mastery.mastery_value, Mastery.confidence).filter(
+            Mastery.user_id.in_(list(result["mastery"]))
+        ):
+            existing.setdefault(row.user_id, {})[row.concept] = (row.mastery_value, row.confidence)
+
+        deltas = [
+            abs(value - existing.get(user_id, {}).get(concept, (0.0, None))[0])
+            for user_id, mastery in result["mastery"].items()
+            for concept, value in mastery.items()
+        ]
+        print(
+            f"{sum(1 for d in deltas if d > 0)} of {len(deltas)} mastery rows would change "
+            f"(max |delta| {max(deltas, default=0.0):.4f})"
+        )
+
+        if not write:
+            print("Dry run - nothing written (pass --write to replace the stored values)")
+            return result
+
+        written = 0
+        for user_id, mastery in result["mastery"].items():
+            previous = existing.get(user_id, {})
+            written += len(MasteryRepository.bulk_upsert_mastery(
+                db,
+                user_id,
+                {
+                    concept: (value, previous.get(concept, (None, 0.5))[1])
+                    for concept, value in mastery.items()
+                },
+                previous=previous
+            ))
+
+        db.commit()
+        print(f"✓ Updated {written} mastery rows - restart the API workers to drop cached mastery")
+        return result
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Recompute failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    recompute(
+        classroom_id=int(args[0]) if args else None,
+        write="--write" in sys.argv
+    )
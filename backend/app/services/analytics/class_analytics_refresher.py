@@ -0,0 +1,150 @@
+import threading
+
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.classroom_student import ClassroomStudent
+from app.services.analytics.class_mastery_aggregate import ClassMasteryAggregate
+from app.services.analytics.heatmap_builder import HeatmapBuilder
+from app.services.analytics.insight_generator import InsightGenerator
+from app.services.core.analytics_worker import AnalyticsWorker
+from app.services.core.event_bus import EventBus
+
+logger = get_logger("class_analytics")
+
+
+class ClassAnalyticsRefresher:
+    """
+    Teacher-facing analytics recomputed off the submit request path.
+
+    submission_committed() publishes the student's mastery delta to each
+    classroom the student is enrolled in and enqueues one job per classroom;
+    the AnalyticsWorker coalesces them, and refresh() then recomputes class
+    risk, the concept heatmap and the insights of the students who submitted,
+    publishing the changed part to the classroom topic.
+    """
+
+    def __init__(
+        self,
+        class_aggregate: ClassMasteryAggregate,
+        concurrency: int = 2,
+        coalesce_seconds: float = 2.0,
+        session_factory=None
+    ):
+        if session_factory is None:
+            from app.db.session import SessionLocal
+            session_factory = SessionLocal
+
+        self.class_aggregate = class_aggregate
+        self.session_factory = session_factory
+        self.worker = AnalyticsWorker(
+            self.refresh,
+            concurrency=concurrency,
+            coalesce_seconds=coalesce_seconds
+        )
+
+        self._lock = threading.Lock()
+        self._latest = {}
+
+    # --------------------------------------------------
+    # Request Side
+    # --------------------------------------------------
+
+    def submission_committed(self, db: Session, user_id: int, mastery: dict, risk: float = None):
+        """
+        mastery: {concept: new_value} for the concepts this submit changed.
+        Pushes the delta to live dashboards and schedules a refresh for
+        every classroom the student belongs to.
+        """
+
+        classroom_ids = [
+            row.classroom_id
+            for row in db.query(ClassroomStudent.classroom_id)
+            .filter(ClassroomStudent.student_id == user_id)
+            .all()
+        ]
+
+        for classroom_id in classroom_ids:
+            EventBus.push_teacher_update(
+                class_id=classroom_id,
+                payload={
+                    "type": "mastery_delta",
+                    "student_id": user_id,
+                    "mastery": mastery,
+                    "risk": risk
+                }
+            )
+            self.worker.submit(
+                classroom_id,
+                {"user_id": user_id, "concepts": list(mastery)}
+            )
+
+        return classroom_ids
+
+    # --------------------------------------------------
+    # Worker Side
+    # --------------------------------------------------
+
+    def refresh(self, classroom_id: int, items: list):
+        """AnalyticsWorker handler: one recompute for a batch of submits."""
+
+        user_ids = sorted({item["user_id"] for item in items})
+        concepts = sorted({c for item in items for c in item["concepts"]})
+
+        db = self.session_factory()
+        try:
+            self.class_aggregate.ensure_loaded(db)
+
+            roster = [
+                row.student_id
+                for row in db.query(ClassroomStudent.student_id)
+                .filter(ClassroomStudent.classroom_id == classroom_id)
+                .all()
+            ]
+
+            class_risk = self.class_aggregate.class_risk(roster)
+            heatmap = HeatmapBuilder.concept_averages_for_classroom(db, classroom_id)
+
+            insights = {
+                user_id: InsightGenerator.generate_student_insights(db, user_id)
+                for user_id in user_ids
+            }
+        finally:
+            db.close()
+
+        result = {
+            "classroom_id": classroom_id,
+            "class_average_risk": class_risk["class_average_risk"],
+            "high_risk_students": class_risk["high_risk_students"],
+            "heatmap": heatmap,
+            "changed_concepts": concepts,
+            "student_insights": insights
+        }
+
+        with self._lock:
+            self._latest[classroom_id] = result
+
+        # Dashboards only need the heatmap cells that moved
+        EventBus.push_teacher_update(
+            class_id=classroom_id,
+            payload={
+                **result,
+                "type": "class_analytics",
+                "heatmap": {c: heatmap[c] for c in concepts if c in heatmap}
+            }
+        )
+
+        logger.debug(
+            f"Refreshed analytics for classroom {classroom_id} "
+            f"({len(items)} submits, {len(user_ids)} students)"
+        )
+
+        return result
+
+    def close(self):
+        self.worker.close()
+
+    def latest(self, classroom_id: int):
+        """Most recent refresh result for a classroom, or None."""
+        with self._lock:
+            return self._latest.get(classroom_id)
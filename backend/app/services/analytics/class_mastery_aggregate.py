@@ -0,0 +1,211 @@
+import threading
+import time
+
+from sqlalchemy.orm import Session
+from app.models.mastery import Mastery
+
+
+class ClassMasteryAggregate:
+    """
+    In-memory mastery aggregate kept current from per-submission deltas.
+
+    Holds per-concept sums/counts and per-student sums/counts so class
+    risk and concept averages cost O(changed concepts) per submit instead
+    of a full scan of the mastery table. The aggregate is seeded from the
+    database once and re-seeded every `refresh_seconds` to pick up writes
+    made by other workers or scripts.
+    """
+
+    def __init__(self, threshold: float = 0.4, refresh_seconds: float = 300.0):
+        self.threshold = threshold
+        self.refresh_seconds = refresh_seconds
+
+        self._lock = threading.RLock()
+        self._seed_lock = threading.Lock()     # one re-seed at a time
+        self._loaded_at = None
+        self._pending = None        # applies made while a re-seed reads the table
+        self._reset()
+
+    def _reset(self):
+        self._values = {}           # user_id -> {concept: mastery}
+        self._concept_sum = {}
+        self._concept_count = {}
+        self._student_sum = {}
+        self._student_count = {}
+        self._average_sum = 0.0     # sum of per-student average mastery
+        self._high_risk = set()
+
+    # --------------------------------------------------
+    # Loading
+    # --------------------------------------------------
+
+    def ensure_loaded(self, db: Session):
+        """
+        Seed from the mastery table if never loaded or stale.
+
+        Only one thread re-seeds; the others keep reading the current
+        aggregate. The query runs outside the main lock, so increments
+        applied meanwhile are journaled and replayed on top of the
+        fresh rows instead of being lost.
+        """
+
+        if self._is_fresh():
+            return
+
+        with self._seed_lock:
+            with self._lock:
+                if self._is_fresh():
+                    return
+                self._pending = []
+
+            try:
+                rows = db.query(
+                    Mastery.user_id,
+                    Mastery.concept,
+                    Mastery.mastery_value
+                ).all()
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                raise
+
+            with self._lock:
+                self._reset()
+                for user_id, concept, value in rows:
+                    self._set(user_id, concept, value)
+                for user_id, changes in self._pending:
+                    for concept, value in changes.items():
+                        self._set(user_id, concept, value)
+                self._pending = None
+                self._loaded_at = time.monotonic()
+
+    def _is_fresh(self):
+        with self._lock:
+            return self._loaded_at is not None and \
+                time.monotonic() - self._loaded_at < self.refresh_seconds
+
+    def invalidate(self):
+        """Force a re-seed on the next ensure_loaded call."""
+        with self._lock:
+            self._loaded_at = None
+
+    # --------------------------------------------------
+    # Incremental Updates
+    # --------------------------------------------------
+
+    def apply(self, user_id, changes: dict):
+        """
+        changes: {concept: new_mastery_value}
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((user_id, dict(changes)))
+            for concept, value in changes.items():
+                self._set(user_id, concept, value)
+
+    def _set(self, user_id, concept, value):
+        if value is None:
+            return
+
+        student = self._values.setdefault(user_id, {})
+        old_average = self._student_average(user_id)
+        old_value = student.get(concept)
+
+        if old_value is None:
+            self._concept_count[concept] = self._concept_count.get(concept, 0) + 1
+            self._student_count[user_id] = self._student_count.get(user_id, 0) + 1
+        else:
+            self._concept_sum[concept] -= old_value
+            self._student_sum[user_id] -= old_value
+
+        self._concept_sum[concept] = self._concept_sum.get(concept, 0.0) + value
+        self._student_sum[user_id] = self._student_sum.get(user_id, 0.0) + value
+        student[concept] = value
+
+        new_average = self._student_average(user_id)
+        self._average_sum += new_average - (old_average or 0.0)
+
+        if 1 - new_average >= (1 - self.threshold):
+            self._high_risk.add(user_id)
+        else:
+            self._high_risk.discard(user_id)
+
+    def _student_average(self, user_id):
+        count = self._student_count.get(user_id, 0)
+        if not count:
+            return None
+        return self._student_sum[user_id] / count
+
+    # --------------------------------------------------
+    # Read Side
+    # --------------------------------------------------
+
+    def student_risk(self, user_id):
+        with self._lock:
+            average = self._student_average(user_id)
+            return None if average is None else 1 - average
+
+    def risk_summary(self, user_id=None):
+        """
+        O(1) class risk summary, optionally with one student's risk.
+        """
+        with self._lock:
+            student_count = len(self._student_count)
+            summary = {
+                "class_average_risk": (
+                    1 - self._average_sum / student_count
+                    if student_count else 0
+                ),
+                "high_risk_count": len(self._high_risk),
+                "total_students": student_count
+            }
+
+        if user_id is not None:
+            summary["student_risk"] = self.student_risk(user_id)
+
+        return summary
+
+    def class_risk(self, user_ids=None):
+        """
+        Same shape as ClassRiskAggregator.aggregate_from_mastery, served
+        from memory. Pass `user_ids` to restrict to a roster.
+        """
+        with self._lock:
+            if user_ids is None:
+                user_ids = list(self._student_count)
+
+            student_risk = {}
+            for user_id in user_ids:
+                average = self._student_average(user_id)
+                if average is not None:
+                    student_risk[user_id] = 1 - average
+
+        high_risk = [
+            student for student, risk in student_risk.items()
+            if risk >= (1 - self.threshold)
+        ]
+
+        class_average_risk = (
+            sum(student_risk.values()) / len(student_risk)
+            if student_risk else 0
+        )
+
+        return {
+            "class_average_risk": class_average_risk,
+            "high_risk_students": high_risk,
+            "student_risk_map": student_risk
+        }
+
+    def concept_averages(self, concepts=None):
+        """
+        {concept: class average mastery}, for all concepts or a subset.
+        """
+        with self._lock:
+            if concepts is None:
+                concepts = list(self._concept_count)
+
+            return {
+                concept: self._concept_sum[concept] / self._concept_count[concept]
+                for concept in concepts
+                if self._concept_count.get(concept)
+            }
@@ -1,5 +1,8 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, case, cast, String
 from app.models.mastery import Mastery
+from app.models.classroom_student import ClassroomStudent
+from app.models.risk_history import RiskHistory
 
 
 class ClassRiskAggregator:
@@ -41,4 +44,76 @@ class ClassRiskAggregator:
             "class_average_risk": class_average_risk,
             "high_risk_students": high_risk,
             "student_risk_map": student_risk
-        }
\ No newline at end of file
+        }
+
+
+    @staticmethod
+    def aggregate_for_classroom(db: Session, classroom_id: int, threshold: float = 0.4):
+        """
+        Classroom-scoped class risk, aggregated in the database.
+        Only summary values and the high-risk student ids are returned.
+        """
+
+        per_student = (
+            db.query(
+                Mastery.user_id.label("user_id"),
+                func.avg(Mastery.mastery_value).label("avg_mastery")
+            )
+            .join(ClassroomStudent, ClassroomStudent.student_id == Mastery.user_id)
+            .filter(ClassroomStudent.classroom_id == classroom_id)
+            .group_by(Mastery.user_id)
+            .subquery()
+        )
+
+        is_high_risk = per_student.c.avg_mastery <= threshold
+
+        student_count, average_mastery, high_risk_count = db.query(
+            func.count(per_student.c.user_id),
+            func.avg(per_student.c.avg_mastery),
+            func.coalesce(func.sum(case((is_high_risk, 1), else_=0)), 0)
+        ).one()
+
+        high_risk = [
+            row.user_id
+            for row in db.query(per_student.c.user_id).filter(is_high_risk).all()
+        ]
+
+        average_mastery = float(average_mastery) if average_mastery is not None else 0.0
+
+        return {
+            "class_average_risk": 1 - average_mastery if student_count else 0,
+            "average_mastery": average_mastery,
+            "high_risk_students": high_risk,
+            "high_risk_count": int(high_risk_count),
+            "student_count": student_count
+        }
+
+
+    @staticmethod
+    def at_risk_count_for_classroom(db: Session, classroom_id: int, risk_threshold: float = 0.6):
+        """
+        Number of enrolled students whose latest RiskHistory score exceeds
+        risk_threshold. The latest row per student is picked with a window function.
+        """
+
+        ranked = (
+            db.query(
+                RiskHistory.student_id.label("student_id"),
+                RiskHistory.risk_score.label("risk_score"),
+                func.row_number().over(
+                    partition_by=RiskHistory.student_id,
+                    order_by=(RiskHistory.timestamp.desc(), RiskHistory.id.desc())
+                ).label("rn")
+            )
+            .join(
+                ClassroomStudent,
+                cast(ClassroomStudent.student_id, String) == RiskHistory.student_id
+            )
+            .filter(ClassroomStudent.classroom_id == classroom_id)
+            .subquery()
+        )
+
+        return db.query(func.count()).select_from(ranked).filter(
+            ranked.c.rn == 1,
+            ranked.c.risk_score > risk_threshold
+        ).scalar()
@@ -1,5 +1,8 @@
+import numpy as np
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from app.models.mastery import Mastery
+from app.models.classroom_student import ClassroomStudent
 
 
 class HeatmapBuilder:
@@ -29,36 +32,115 @@ class HeatmapBuilder:
 
 
     @staticmethod
-    def build_class_matrix(db: Session):
+    def build_class_matrix(
+        db: Session,
+        classroom_id: int = None,
+        concepts: list = None,
+        as_array: bool = False
+    ):
         """
         Returns:
         {
             "students": [list of ids],
             "concepts": [list of concepts],
-            "matrix": [[values]]
+            "matrix": [[values]]      # np.ndarray if as_array
         }
+
+        classroom_id : restrict to students enrolled in that classroom
+        concepts     : restrict to this concept subset
         """
 
-        rows = db.query(Mastery).all()
+        query = db.query(Mastery.user_id, Mastery.concept, Mastery.mastery_value)
+
+        if classroom_id is not None:
+            query = query.join(
+                ClassroomStudent,
+                ClassroomStudent.student_id == Mastery.user_id
+            ).filter(ClassroomStudent.classroom_id == classroom_id)
+
+        if concepts is not None:
+            query = query.filter(Mastery.concept.in_(list(concepts)))
+
+        rows = query.all()
+
+        user_ids = [r[0] for r in rows]
+        concept_names = [r[1] for r in rows]
+        values = [r[2] for r in rows]
 
-        students = sorted(list(set(r.user_id for r in rows)))
-        concepts = sorted(list(set(r.concept for r in rows)))
+        return HeatmapBuilder.matrix_from_columns(
+            user_ids,
+            concept_names,
+            values,
+            as_array=as_array
+        )
 
-        matrix = []
 
-        for student in students:
-            row_values = []
-            for concept in concepts:
-                record = next(
-                    (r for r in rows if r.user_id == student and r.concept == concept),
-                    None
-                )
-                row_values.append(record.mastery_value if record else 0.0)
+    @staticmethod
+    def matrix_from_columns(user_ids, concepts, values, as_array: bool = False):
+        """
+        Pivot (user_id, concept, value) columns into a dense
+        students x concepts matrix in one pass over the rows.
+        Missing cells are 0.0.
+        """
 
-            matrix.append(row_values)
+        n_rows = len(values)
+
+        student_ids, student_idx = np.unique(
+            np.asarray(user_ids, dtype=np.int64),
+            return_inverse=True
+        )
+
+        # Factorize concept names with a dict, then reorder codes so
+        # columns come out sorted like the student axis
+        concept_index = {}
+        concept_codes = np.fromiter(
+            (concept_index.setdefault(c, len(concept_index)) for c in concepts),
+            dtype=np.int64,
+            count=n_rows
+        )
+
+        concept_names = sorted(concept_index)
+        remap = np.empty(len(concept_names), dtype=np.int64)
+        for position, name in enumerate(concept_names):
+            remap[concept_index[name]] = position
+        concept_idx = remap[concept_codes]
+
+        matrix = np.zeros((len(student_ids), len(concept_names)), dtype=np.float64)
+        matrix[student_idx, concept_idx] = np.nan_to_num(
+            np.asarray(values, dtype=np.float64)
+        )
 
         return {
-            "students": students,
-            "concepts": concepts,
-            "matrix": matrix
-        }
\ No newline at end of file
+            "students": student_ids.tolist(),
+            "concepts": concept_names,
+            "matrix": matrix if as_array else matrix.tolist()
+        }
+
+
+    @staticmethod
+    def concept_averages_for_classroom(db: Session, classroom_id: int):
+        """
+        Classroom-scoped average mastery per concept, grouped in the database.
+
+        Returns:
+        {
+            concept: average_mastery
+        }
+        """
+
+        rows = (
+            db.query(
+                Mastery.concept,
+                func.avg(Mastery.mastery_value).label("avg_mastery")
+            )
+            .join(ClassroomStudent, ClassroomStudent.student_id == Mastery.user_id)
+            .filter(ClassroomStudent.classroom_id == classroom_id)
+            .group_by(Mastery.concept)
+            .all()
+        )
+
+        return {
+            row.concept: float(row.avg_mastery)
+            for row in rows
+            if row.avg_mastery is not None
+        }
@@ -1,5 +1,6 @@
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, or_, case
 from app.models.mastery import Mastery
 from app.models.attempt import Attempt
 from app.models.mastery_history import MasteryHistory
@@ -31,19 +32,21 @@ class InsightGenerator:
     @staticmethod
     def calibration_gap(db: Session, user_id: int):
 
-        attempts = (
-            db.query(Attempt)
+        count, avg_confidence, accuracy = (
+            db.query(
+                func.count(Attempt.id),
+                func.avg(Attempt.confidence),
+                func.avg(case((Attempt.is_correct, 1.0), else_=0.0))
+            )
             .filter(Attempt.user_id == user_id)
-            .all()
+            .one()
         )
 
-        if not attempts:
+        # AVG skips NULL confidences; all NULL means nothing to compare against
+        if not count or avg_confidence is None:
             return 0.0
 
-        avg_confidence = sum(a.confidence for a in attempts) / len(attempts)
-        accuracy = sum(1 if a.is_correct else 0 for a in attempts) / len(attempts)
-
-        return round(avg_confidence - accuracy, 4)
+        return round(float(avg_confidence) - float(accuracy), 4)
 
 
     # ---------------------------------------------------------
@@ -102,35 +105,124 @@ class InsightGenerator:
         return round(end - start, 4)
 
 
+    # ---------------------------------------------------------
+    # Volatility + Trend for All Concepts (Single Query)
+    # ---------------------------------------------------------
+    @staticmethod
+    def concept_dynamics(db: Session, user_id: int, concepts: list = None, window: int = 10):
+        """
+        Volatility and learning trend for every concept in one query.
+
+        Fetches the first and last `window` history points per concept
+        with ROW_NUMBER windows, then computes both metrics with numpy.
+        Matches volatility_score / learning_trend per concept.
+        """
+
+        ranked = (
+            db.query(
+                MasteryHistory.concept.label("concept"),
+                MasteryHistory.mastery_value.label("mastery_value"),
+                func.row_number().over(
+                    partition_by=MasteryHistory.concept,
+                    order_by=(MasteryHistory.timestamp.desc(), MasteryHistory.id.desc())
+                ).label("rn_desc"),
+                func.row_number().over(
+                    partition_by=MasteryHistory.concept,
+                    order_by=(MasteryHistory.timestamp.asc(), MasteryHistory.id.asc())
+                ).label("rn_asc")
+            )
+            .filter(MasteryHistory.user_id == user_id)
+        )
+
+        if concepts is not None:
+            ranked = ranked.filter(MasteryHistory.concept.in_(concepts))
+
+        ranked = ranked.subquery()
+
+        rows = (
+            db.query(ranked)
+            .filter(or_(ranked.c.rn_desc <= window, ranked.c.rn_asc <= window))
+            .all()
+        )
+
+        names = sorted({r.concept for r in rows} | set(concepts or []))
+        code_of = {name: i for i, name in enumerate(names)}
+        n = len(names)
+
+        if rows:
+            codes = np.array([code_of[r.concept] for r in rows], dtype=np.int64)
+            values = np.array([r.mastery_value for r in rows], dtype=np.float64)
+            rn_desc = np.array([r.rn_desc for r in rows], dtype=np.int64)
+            rn_asc = np.array([r.rn_asc for r in rows], dtype=np.int64)
+        else:
+            codes = values = rn_desc = rn_asc = np.empty(0, dtype=np.int64)
+
+        # --- Volatility: mean |diff| over the last `window` points ---
+        recent = rn_desc <= window
+        order = np.lexsort((rn_desc[recent], codes[recent]))
+        c = codes[recent][order]
+        v = values[recent][order]
+
+        same = c[1:] == c[:-1]
+        diffs = np.abs(np.diff(v))[same]
+        diff_sum = np.bincount(c[1:][same], weights=diffs, minlength=n)
+        diff_count = np.bincount(c[1:][same], minlength=n)
+
+        volatility = np.divide(
+            diff_sum, diff_count,
+            out=np.zeros(n, dtype=np.float64),
+            where=diff_count > 0
+        )
+
+        # --- Trend: last minus first of the earliest `window` points ---
+        history_len = np.zeros(n, dtype=np.int64)
+        history_len[codes] = rn_asc + rn_desc - 1
+
+        start = np.zeros(n, dtype=np.float64)
+        first = rn_asc == 1
+        start[codes[first]] = values[first]
+
+        end = np.zeros(n, dtype=np.float64)
+        last = rn_asc == np.minimum(window, history_len[codes])
+        end[codes[last]] = values[last]
+
+        trend = np.where(history_len >= 2, end - start, 0.0)
+
+        return {
+            name: {
+                "volatility": round(float(volatility[i]), 4),
+                "learning_trend": round(float(trend[i]), 4)
+            }
+            for i, name in enumerate(names)
+        }
+
+
     # ---------------------------------------------------------
     # Full Student Insight Package
     # ---------------------------------------------------------
     @staticmethod
-    def generate_student_insights(db: Session, user_id: int):
+    def generate_student_insights(db: Session, user_id: int, threshold: float = 0.4):
 
         # Get all concepts student currently has
         mastery_rows = (
-            db.query(Mastery)
+            db.query(Mastery.concept, Mastery.mastery_value)
             .filter(Mastery.user_id == user_id)
             .all()
         )
 
         concepts = [row.concept for row in mastery_rows]
 
-        concept_dynamics = {}
-
-        for concept in concepts:
-            concept_dynamics[concept] = {
-                "volatility": InsightGenerator.volatility_score(
-                    db, user_id, concept
-                ),
-                "learning_trend": InsightGenerator.learning_trend(
-                    db, user_id, concept
-                )
-            }
+        concept_dynamics = InsightGenerator.concept_dynamics(db, user_id, concepts)
 
         return {
-            "weak_topics": InsightGenerator.weak_topics(db, user_id),
+            "weak_topics": [
+                row.concept
+                for row in mastery_rows
+                if row.mastery_value <= threshold
+            ],
             "calibration_gap": InsightGenerator.calibration_gap(db, user_id),
-            "concept_dynamics": concept_dynamics
-        }
\ No newline at end of file
+            "concept_dynamics": {
+                concept: concept_dynamics[concept]
+                for concept in concepts
+            }
+        }
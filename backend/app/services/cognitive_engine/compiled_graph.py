@@ -0,0 +1,257 @@
+import numpy as np
+
+
+# Set bits per byte, for counting reachable nodes in packed bitsets
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def _csr(sources: np.ndarray, targets: np.ndarray, weights: np.ndarray, n: int):
+    """(indptr, indices, weights) with the edges of node i in indices[indptr[i]:indptr[i+1]]"""
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return indptr, targets[order], weights[order]
+
+
+class GraphCycleError(ValueError):
+    """
+    Raised when prerequisite edges form cycles. `cycles` holds one cycle
+    per strongly connected component, each a list of concept names in
+    edge order (the last concept is a prerequisite of the first).
+    """
+
+    def __init__(self, cycles: list):
+        self.cycles = cycles
+        shown = "; ".join(" -> ".join(cycle + cycle[:1]) for cycle in cycles[:5])
+        more = f" (and {len(cycles) - 5} more)" if len(cycles) > 5 else ""
+        super().__init__(f"Graph contains {len(cycles)} cycle(s): {shown}{more}")
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Flat positions into `indices` of every edge leaving `nodes`"""
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = counts.sum()
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(total)
+
+
+class CompiledGraph:
+    """
+    Frozen, array-backed snapshot of a ConceptGraph.
+
+    Concepts get integer ids (sorted by name). Adjacency is stored as CSR
+    arrays in both directions, and depth, influence, topological order and
+    reachability are computed once in a single layered Kahn pass:
+
+        concepts          id -> concept name
+        index             concept name -> id
+        child_indptr / child_indices / child_weights     parent -> children
+        parent_indptr / parent_indices / parent_weights  child -> parents
+        depth             longest prerequisite chain ending at each node
+        influence         number of downstream concepts per node
+        topo_order        node ids, parents before children (by depth)
+        reach             packed bitset rows, bit j of row i set if j is downstream of i
+
+    All arrays are read-only; build a new snapshot to change the graph.
+    """
+
+    def __init__(self, concepts, edges):
+        """
+        concepts: iterable of concept names
+        edges: iterable of (parent, child, weight); duplicates are kept
+        """
+
+        self.concepts = tuple(sorted(concepts))
+        self.index = {concept: i for i, concept in enumerate(self.concepts)}
+        n = len(self.concepts)
+
+        edges = list(edges)
+        sources = np.fromiter((self.index[p] for p, _, _ in edges), dtype=np.int64, count=len(edges))
+        targets = np.fromiter((self.index[c] for _, c, _ in edges), dtype=np.int64, count=len(edges))
+        weights = np.fromiter((w for _, _, w in edges), dtype=np.float64, count=len(edges))
+
+        self.n_edges = len(edges)
+        self.density = self.n_edges / (n * (n - 1)) if n > 1 else 0
+
+        self.child_indptr, self.child_indices, self.child_weights = _csr(sources, targets, weights, n)
+        self.parent_indptr, self.parent_indices, self.parent_weights = _csr(targets, sources, weights, n)
+
+        self.depth, self.topo_order = self._layered_topological_pass(n)
+        self.reach, self.influence = self._reachability(n)
+
+        for array in (
+            self.child_indptr, self.child_indices, self.child_weights,
+            self.parent_indptr, self.parent_indices, self.parent_weights,
+            self.depth, self.topo_order, self.reach, self.influence
+        ):
+            array.flags.writeable = False
+
+    def __len__(self):
+        return len(self.concepts)
+
+    # --------------------------------------------------
+    # Construction Passes
+    # --------------------------------------------------
+
+    def _layered_topological_pass(self, n: int):
+        """
+        Kahn's algorithm one layer at a time. A node enters layer k once
+        its last parent has been removed, so k is its longest chain of
+        prerequisites and the concatenated layers are a topological order.
+        """
+
+        in_degree = np.diff(self.parent_indptr)
+        depth = np.zeros(n, dtype=np.int64)
+        layers = []
+
+        frontier = np.flatnonzero(in_degree == 0)
+        level = 0
+
+        while frontier.size:
+            depth[frontier] = level
+            layers.append(frontier)
+
+            children = self.child_indices[_gather(self.child_indptr, self.child_indices, frontier)]
+            in_degree = in_degree - np.bincount(children, minlength=n)
+
+            candidates = np.unique(children)
+            frontier = candidates[in_degree[candidates] == 0]
+            level += 1
+
+        topo_order = np.concatenate(layers) if layers else np.empty(0, dtype=np.int64)
+
+        if topo_order.size != n:
+            raise GraphCycleError(self._find_cycles(in_degree > 0))
+
+        return depth, topo_order
+
+    def _find_cycles(self, remaining: np.ndarray) -> list:
+        """
+        One cycle per strongly connected component among the nodes Kahn's
+        pass could not remove (iterative Tarjan, then a walk inside each
+        component until a node repeats).
+        """
+
+        def successors(node):
+            children = self.child_indices[self.child_indptr[node]:self.child_indptr[node + 1]]
+            return [int(c) for c in children if remaining[c]]
+
+        index, lowlink, on_stack = {}, {}, set()
+        stack, components = [], []
+        counter = 0
+
+        for root in np.flatnonzero(remaining):
+            root = int(root)
+            if root in index:
+                continue
+            work = [(root, iter(successors(root)))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(successors(child))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+        cycles = []
+        for component in components:
+            start = min(component)
+            if len(component) == 1 and start not in successors(start):
+                continue    # downstream of a cycle, not part of one
+
+            path, position = [], {}
+            node = start
+            while node not in position:
+                position[node] = len(path)
+                path.append(node)
+                node = next(c for c in successors(node) if c in component)
+
+            cycles.append([self.concepts[i] for i in path[position[node]:]])
+
+        return sorted(cycles)
+
+    def _reachability(self, n: int):
+        """Downstream bitsets, children before parents (reverse topological order)"""
+
+        reach = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+
+        for node in self.topo_order[::-1]:
+            start, end = self.child_indptr[node], self.child_indptr[node + 1]
+            if start == end:
+                continue
+            children = self.child_indices[start:end]
+            row = np.bitwise_or.reduce(reach[children], axis=0)
+            np.bitwise_or.at(row, children >> 3, (0x80 >> (children & 7)).astype(np.uint8))
+            reach[node] = row
+
+        influence = _POPCOUNT8[reach].sum(axis=1) if n else np.zeros(0, dtype=np.int64)
+        return reach, influence
+
+    # --------------------------------------------------
+    # Lookups
+    # --------------------------------------------------
+
+    def ids(self, concepts) -> np.ndarray:
+        """Node ids for concept names, -1 for concepts not in the graph"""
+        return np.fromiter(
+            (self.index.get(c, -1) for c in concepts), dtype=np.int64, count=len(concepts)
+        )
+
+    def depth_of(self, concepts) -> np.ndarray:
+        """Depth per concept name (0 for concepts not in the graph)"""
+        ids = self.ids(concepts)
+        return np.where(ids >= 0, self.depth[ids], 0) if len(self.depth) else np.zeros(len(ids), dtype=np.int64)
+
+    def influence_of(self, concepts) -> np.ndarray:
+        """Downstream concept count per concept name (0 for concepts not in the graph)"""
+        ids = self.ids(concepts)
+        return np.where(ids >= 0, self.influence[ids], 0) if len(self.influence) else np.zeros(len(ids), dtype=np.int64)
+
+    def downstream(self, concept) -> set:
+        i = self.index.get(concept)
+        if i is None:
+            return set()
+        bits = np.unpackbits(self.reach[i], count=len(self.concepts))
+        return {self.concepts[j] for j in np.flatnonzero(bits)}
+
+    def children_of(self, i: int):
+        """(child ids, weights) of node id i"""
+        start, end = self.child_indptr[i], self.child_indptr[i + 1]
+        return self.child_indices[start:end], self.child_weights[start:end]
+
+    def parents_of(self, i: int):
+        """(parent ids, weights) of node id i"""
+        start, end = self.parent_indptr[i], self.parent_indptr[i + 1]
+        return self.parent_indices[start:end], self.parent_weights[start:end]
@@ -1,4 +1,11 @@
-from collections import defaultdict, deque
+import csv
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from app.services.cognitive_engine.compiled_graph import CompiledGraph, GraphCycleError
+
+DEFAULT_EDGE_WEIGHT = 0.5
 
 
 class ConceptGraph:
@@ -8,19 +15,19 @@ class ConceptGraph:
         self.children = defaultdict(list)    # parent -> [(child, weight)]
         self.nodes = set()
 
-        # Cached metrics
-        self._depth_cache = {}
-        self._influence_cache = {}
-        self._topo_order = None
+        # Frozen array form, built on first use and dropped on every edit
+        self._compiled = None
 
     # --------------------------------------------------
     # Core Graph Construction
     # --------------------------------------------------
 
     def add_concept(self, concept: str):
-        self.nodes.add(concept)
+        if concept not in self.nodes:
+            self.nodes.add(concept)
+            self._invalidate_cache()
 
-    def add_prerequisite(self, parent: str, child: str, weight: float = 0.5):
+    def add_prerequisite(self, parent: str, child: str, weight: float = DEFAULT_EDGE_WEIGHT):
         if parent == child:
             raise ValueError("Self-dependency is not allowed.")
 
@@ -36,17 +43,89 @@ class ConceptGraph:
 
         self._invalidate_cache()
 
+    # --------------------------------------------------
+    # Bulk Loading
+    # --------------------------------------------------
+
+    @classmethod
+    def from_edges(cls, edges, concepts=None) -> "ConceptGraph":
+        """
+        Build a graph from (parent, child) or (parent, child, weight) edges
+        in time linear in the edge count.
+
+        Instead of a DFS per edge, acyclicity is checked once by the Kahn
+        pass that compiles the graph, so depth, influence and topological
+        order come out of the same pass. Raises GraphCycleError listing
+        every cycle found (self-dependencies included).
+
+        concepts: optional extra concepts with no edges
+        """
+
+        graph = cls()
+        nodes = set(concepts or ())
+
+        for edge in edges:
+            if len(edge) == 2:
+                parent, child = edge
+                weight = DEFAULT_EDGE_WEIGHT
+            else:
+                parent, child, weight = edge
+            weight = float(weight)
+
+            graph.children[parent].append((child, weight))
+            graph.parents[child].append((parent, weight))
+            nodes.add(parent)
+            nodes.add(child)
+
+        graph.nodes = nodes
+        graph.compile()
+        return graph
+
+    @classmethod
+    def from_file(cls, path) -> "ConceptGraph":
+        """
+        Load a syllabus graph from disk.
+
+        .json: {"concepts": [...], "edges": [{"parent", "child", "weight"?}, ...]}
+               ("edges" may also hold [parent, child, weight?] lists)
+        .csv:  header row with parent,child[,weight]
+        """
+
+        path = Path(path)
+
+        if path.suffix.lower() == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            edges = [
+                (e["parent"], e["child"], e.get("weight", DEFAULT_EDGE_WEIGHT))
+                if isinstance(e, dict) else tuple(e)
+                for e in data.get("edges", [])
+            ]
+            return cls.from_edges(edges, concepts=data.get("concepts"))
+
+        if path.suffix.lower() == ".csv":
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                edges = [
+                    (row["parent"], row["child"], row.get("weight") or DEFAULT_EDGE_WEIGHT)
+                    for row in csv.DictReader(f)
+                ]
+            return cls.from_edges(edges)
+
+        raise ValueError(f"Unsupported concept graph format: {path.suffix or path.name}")
+
     # --------------------------------------------------
     # Cycle Detection (DFS)
     # --------------------------------------------------
 
     def _creates_cycle(self, parent, child):
+        # parent -> child closes a cycle if parent is already downstream of child
         visited = set()
-        stack = [parent]
+        stack = [child]
 
         while stack:
             node = stack.pop()
-            if node == child:
+            if node == parent:
                 return True
             for next_node, _ in self.children.get(node, []):
                 if next_node not in visited:
@@ -67,6 +146,14 @@ class ConceptGraph:
     def weighted_out_degree(self, concept):
         return sum(weight for _, weight in self.children.get(concept, []))
 
+    def edges(self):
+        """(parent, child, weight) for every edge"""
+        return [
+            (parent, child, weight)
+            for parent, edges in self.children.items()
+            for child, weight in edges
+        ]
+
     def total_edges(self):
         return sum(len(v) for v in self.children.values())
 
@@ -77,108 +164,59 @@ class ConceptGraph:
         return self.total_edges() / (n * (n - 1))
 
     # --------------------------------------------------
-    # Depth Computation (Longest Prerequisite Chain)
+    # Compiled Form (Depth, Influence, Topological Order)
     # --------------------------------------------------
 
-    def compute_depth(self, concept):
-        if concept in self._depth_cache:
-            return self._depth_cache[concept]
-
-        visited = set()
-
-        def dfs(node):
-            if node in visited:
-                return 0
-            visited.add(node)
-
-            parents = self.parents.get(node, [])
-            if not parents:
-                return 0
+    def compile(self) -> CompiledGraph:
+        """
+        Array-backed snapshot of the graph with every structural metric
+        precomputed. Cached until the next add_prerequisite.
+        """
+        compiled = self._compiled
+        if compiled is None:
+            compiled = CompiledGraph(self.nodes, self.edges())
+            self._compiled = compiled
+        return compiled
 
-            return 1 + max(dfs(p) for p, _ in parents)
-
-        depth = dfs(concept)
-        self._depth_cache[concept] = depth
-        return depth
-
-    # --------------------------------------------------
-    # Downstream Influence
-    # --------------------------------------------------
+    def compute_depth(self, concept):
+        """Longest prerequisite chain leading to the concept"""
+        compiled = self.compile()
+        i = compiled.index.get(concept)
+        return int(compiled.depth[i]) if i is not None else 0
 
     def downstream_concepts(self, concept):
-        if concept in self._influence_cache:
-            return self._influence_cache[concept]
-
-        visited = set()
-        queue = deque([concept])
-
-        while queue:
-            node = queue.popleft()
-            for child, _ in self.children.get(node, []):
-                if child not in visited:
-                    visited.add(child)
-                    queue.append(child)
-
-        self._influence_cache[concept] = visited
-        return visited
+        return self.compile().downstream(concept)
 
     def influence_score(self, concept):
-        return len(self.downstream_concepts(concept))
-
-    # --------------------------------------------------
-    # Topological Sort (Useful for Analytics + ML)
-    # --------------------------------------------------
+        compiled = self.compile()
+        i = compiled.index.get(concept)
+        return int(compiled.influence[i]) if i is not None else 0
 
     def topological_sort(self):
-        if self._topo_order is not None:
-            return self._topo_order
-
-        in_degree_map = {node: 0 for node in self.nodes}
-
-        for parent in self.children:
-            for child, _ in self.children[parent]:
-                in_degree_map[child] += 1
-
-        queue = deque([node for node in self.nodes if in_degree_map[node] == 0])
-        topo_order = []
-
-        while queue:
-            node = queue.popleft()
-            topo_order.append(node)
-
-            for child, _ in self.children.get(node, []):
-                in_degree_map[child] -= 1
-                if in_degree_map[child] == 0:
-                    queue.append(child)
-
-        if len(topo_order) != len(self.nodes):
-            raise ValueError("Graph contains a cycle.")
-
-        self._topo_order = topo_order
-        return topo_order
+        compiled = self.compile()
+        return [compiled.concepts[i] for i in compiled.topo_order]
 
     # --------------------------------------------------
     # Global Graph Statistics (Future ML Features)
     # --------------------------------------------------
 
     def max_depth(self):
-        return max((self.compute_depth(n) for n in self.nodes), default=0)
+        compiled = self.compile()
+        return int(compiled.depth.max()) if len(compiled) else 0
 
     def average_depth(self):
         if not self.nodes:
             return 0
-        return sum(self.compute_depth(n) for n in self.nodes) / len(self.nodes)
+        return float(self.compile().depth.mean())
 
     def average_influence(self):
         if not self.nodes:
             return 0
-        return sum(self.influence_score(n) for n in self.nodes) / len(self.nodes)
+        return float(self.compile().influence.mean())
 
     # --------------------------------------------------
     # Cache Invalidation
     # --------------------------------------------------
 
     def _invalidate_cache(self):
-        self._depth_cache.clear()
-        self._influence_cache.clear()
-        self._topo_order = None
\ No newline at end of file
+        self._compiled = None
\ No newline at end of file
@@ -1,5 +1,24 @@
 from collections import deque
 
+import numpy as np
+
+
+class _Schedule:
+    """
+    Edge updates of one propagation, grouped into hazard-free batches.
+
+    nodes     global node ids touched, indexed by the local ids below
+    written   local ids of the nodes that receive updates
+    batches   [(src, dst, level, weight)] arrays of local ids per batch
+    """
+
+    __slots__ = ("nodes", "written", "batches")
+
+    def __init__(self, nodes, written, batches):
+        self.nodes = nodes
+        self.written = written
+        self.batches = batches
+
 
 class DependencyPropagator:
     def __init__(self, concept_graph):
@@ -8,13 +27,18 @@ class DependencyPropagator:
         """
         self.graph = concept_graph
 
+        # (compiled graph, {(start id, max_depth): _Schedule}), swapped as one
+        # tuple so calls on different graphs can't mix their schedules
+        self._schedules = (None, {})
+
     def propagate(
         self,
         mastery_dict: dict,
         updated_concept: str,
         alpha: float = 0.08,
         decay_factor: float = 0.7,
-        max_depth: int = 5
+        max_depth: int = 5,
+        graph=None
     ):
         """
         Propagates mastery changes through dependency graph.
@@ -24,41 +48,218 @@ class DependencyPropagator:
         alpha: base propagation rate
         decay_factor: decay multiplier per level
         max_depth: limit propagation depth for safety
+        graph: ConceptGraph to use instead of self.graph (a per-call snapshot)
+
+        Each edge visited by a breadth-first walk from updated_concept
+        moves the child toward its parent by alpha * decay_factor**level
+        * weight. The walk only depends on the graph, so its edge updates
+        are precomputed once per (concept, max_depth) and applied as numpy
+        gather/scatter batches with the same floats as one-at-a-time updates.
         """
 
         if updated_concept not in mastery_dict:
             return mastery_dict
 
-        queue = deque([(updated_concept, 0)])
-        visited = set([updated_concept])
+        graph = (self.graph if graph is None else graph).compile()
+        start = graph.index.get(updated_concept)
+        if start is None:
+            return mastery_dict
 
-        while queue:
-            current_concept, level = queue.popleft()
+        schedule = self._schedule(graph, start, max_depth)
+        if not schedule.batches:
+            return mastery_dict
 
-            if level >= max_depth:
+        concepts = [graph.concepts[i] for i in schedule.nodes]
+        values = np.array([mastery_dict.get(c, 0.0) for c in concepts], dtype=np.float64)
+
+        self._apply(values[np.newaxis, :], schedule, alpha, decay_factor)
+
+        for i in schedule.written:
+            mastery_dict[concepts[i]] = float(values[i])
+
+        return mastery_dict
+
+    def propagate_many(
+        self,
+        mastery_dicts: list,
+        updated_concepts: list,
+        alpha: float = 0.08,
+        decay_factor: float = 0.7,
+        max_depth: int = 5,
+        graph=None
+    ) -> list:
+        """
+        propagate() for many students at once (bulk recomputation).
+        mastery_dicts[i] is updated in place from updated_concepts[i].
+        graph: ConceptGraph to use instead of self.graph, as in propagate()
+        """
+
+        graph = (self.graph if graph is None else graph).compile()
+
+        # Students grouped by updated concept share one schedule
+        groups = {}
+        for row, (mastery, concept) in enumerate(zip(mastery_dicts, updated_concepts)):
+            start = graph.index.get(concept)
+            if start is not None and concept in mastery:
+                groups.setdefault(start, []).append(row)
+
+        for start, rows in groups.items():
+            schedule = self._schedule(graph, start, max_depth)
+            if not schedule.batches:
+                continue
+
+            concepts = [graph.concepts[i] for i in schedule.nodes]
+            values = np.array(
+                [[mastery_dicts[row].get(c, 0.0) for c in concepts] for row in rows],
+                dtype=np.float64
+            )
+
+            self._apply(values, schedule, alpha, decay_factor)
+
+            for values_row, row in zip(values.tolist(), rows):
+                mastery = mastery_dicts[row]
+                for i in schedule.written:
+                    mastery[concepts[i]] = values_row[i]
+
+        return mastery_dicts
+
+    def propagate_matrix(
+        self,
+        matrix: np.ndarray,
+        starts: np.ndarray,
+        alpha: float = 0.08,
+        decay_factor: float = 0.7,
+        max_depth: int = 5,
+        graph=None
+    ) -> dict:
+        """
+        Dense form: matrix is (students x concepts) in compiled graph id
+        order and is updated in place; starts[i] is the updated concept id
+        of row i (-1 to skip). Rows sharing a start concept share one pass.
+        graph: ConceptGraph to use instead of self.graph; the column order
+        is that graph's compiled ids.
+
+        Returns {start id: global ids of the concepts that were written}.
+        """
+
+        graph = (self.graph if graph is None else graph).compile()
+        written = {}
+
+        for start in np.unique(starts[starts >= 0]):
+            schedule = self._schedule(graph, int(start), max_depth)
+            if not schedule.batches:
                 continue
 
-            parent_mastery = mastery_dict.get(current_concept, 0.0)
+            rows = np.flatnonzero(starts == start)
+            columns = matrix[np.ix_(rows, schedule.nodes)]
+
+            self._apply(columns, schedule, alpha, decay_factor)
+
+            matrix[np.ix_(rows, schedule.nodes)] = columns
+            written[int(start)] = schedule.nodes[schedule.written]
+
+        return written
 
-            for child, weight in self.graph.children.get(current_concept, []):
+    # --------------------------------------------------
+    # Kernel
+    # --------------------------------------------------
 
-                if child not in mastery_dict:
-                    mastery_dict[child] = 0.0
+    @staticmethod
+    def _apply(values: np.ndarray, schedule: _Schedule, alpha: float, decay_factor: float):
+        """Run a schedule on (rows x local nodes) values in place"""
 
-                child_mastery = mastery_dict[child]
+        # Python floats, so each strength is computed exactly as
+        # alpha * (decay_factor ** level) * weight
+        factors = np.array([alpha * (decay_factor ** level) for level in range(
+            max(int(batch[2].max()) for batch in schedule.batches) + 1
+        )], dtype=np.float64)
 
-                # Distance-based decay
-                influence_strength = alpha * (decay_factor ** level) * weight
+        for src, dst, level, weight in schedule.batches:
+            influence_strength = factors[level] * weight
 
-                adjustment = influence_strength * (parent_mastery - child_mastery)
+            parent_mastery = values[:, src]
+            child_mastery = values[:, dst]
 
-                new_mastery = child_mastery + adjustment
+            new_mastery = child_mastery + influence_strength * (parent_mastery - child_mastery)
 
-                # Clamp between 0 and 1
-                mastery_dict[child] = min(max(new_mastery, 0.0), 1.0)
+            # Clamp between 0 and 1
+            values[:, dst] = np.minimum(np.maximum(new_mastery, 0.0), 1.0)
+
+    def _schedule(self, graph, start: int, max_depth: int) -> _Schedule:
+        compiled_for, schedules = self._schedules
+        if compiled_for is not graph:
+            schedules = {}
+            self._schedules = (graph, schedules)
+
+        key = (start, max_depth)
+        schedule = schedules.get(key)
+        if schedule is None:
+            schedule = self._build_schedule(graph, start, max_depth)
+            schedules[key] = schedule
+        return schedule
+
+    @staticmethod
+    def _build_schedule(graph, start: int, max_depth: int) -> _Schedule:
+        """
+        Replay the breadth-first walk to list its edge updates in order,
+        then give each update the earliest batch that keeps sequential
+        semantics when a batch gathers all reads before scattering writes:
+        after the last write to its parent or child (read-after-write and
+        write-after-write), and not before the last read of its child
+        (write-after-read; same batch is fine).
+        """
+
+        updates = []    # (src, dst, level, weight), in sequential order
+        queue = deque([(start, 0)])
+        visited = {start}
+
+        while queue:
+            node, level = queue.popleft()
+
+            if level >= max_depth:
+                continue
+
+            children, weights = graph.children_of(node)
+            for child, weight in zip(children.tolist(), weights.tolist()):
+                updates.append((node, child, level, weight))
 
                 if child not in visited:
                     visited.add(child)
                     queue.append((child, level + 1))
 
-        return mastery_dict
\ No newline at end of file
+        local = {}
+        last_write = {}
+        last_read = {}
+        batches = []
+
+        for src, dst, level, weight in updates:
+            batch = max(last_write.get(src, -1) + 1, last_write.get(dst, -1) + 1, last_read.get(dst, 0))
+
+            last_write[dst] = batch
+            last_read[src] = max(last_read.get(src, 0), batch)
+
+            if batch == len(batches):
+                batches.append([])
+            batches[batch].append((
+                local.setdefault(src, len(local)),
+                local.setdefault(dst, len(local)),
+                level,
+                weight
+            ))
+
+        nodes = np.array(list(local), dtype=np.int64)
+        written = np.array(sorted(local[dst] for dst in last_write), dtype=np.int64)
+
+        return _Schedule(
+            nodes=nodes,
+            written=written,
+            batches=[
+                (
+                    np.array([u[0] for u in batch], dtype=np.int64),
+                    np.array([u[1] for u in batch], dtype=np.int64),
+                    np.array([u[2] for u in batch], dtype=np.int64),
+                    np.array([u[3] for u in batch], dtype=np.float64),
+                )
+                for batch in batches
+            ]
+        )
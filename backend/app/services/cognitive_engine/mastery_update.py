@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class BKTParameters:
@@ -64,6 +66,149 @@ class MasteryUpdater:
 
         return max(0.0, min(1.0, p_new))
 
+    # --------------------------------------------------
+    # Vectorized Kernel
+    # --------------------------------------------------
+
+    @staticmethod
+    def bkt_kernel(p_l, correct, self_confidence, p_learn, p_guess, p_slip) -> np.ndarray:
+        """
+        update() over numpy arrays (all broadcastable), with the same
+        float operations in the same order, so results are identical.
+        """
+
+        p_l = np.asarray(p_l, dtype=np.float64)
+        correct = np.asarray(correct, dtype=bool)
+
+        # ---- 1️⃣ Bayesian update ----
+        numerator = np.where(correct, p_l * (1 - p_slip), p_l * p_slip)
+        denominator = numerator + (1 - p_l) * np.where(correct, p_guess, 1 - p_guess)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_posterior = np.where(denominator == 0, p_l, numerator / denominator)
+
+        # ---- 2️⃣ Confidence weighting ----
+        confidence_weight = 0.6 + 0.4 * (np.asarray(self_confidence, dtype=np.float64) / 5.0)
+        p_posterior = p_posterior * confidence_weight + p_l * (1 - confidence_weight)
+
+        # ---- 3️⃣ Learning transition ----
+        p_new = p_posterior + (1 - p_posterior) * p_learn
+
+        return np.maximum(0.0, np.minimum(1.0, p_new))
+
+    def param_arrays(self, concepts) -> tuple:
+        """
+        (known, p_init, p_learn, p_guess, p_slip) arrays aligned with
+        `concepts`; `known` is False where a concept has no parameters.
+        """
+
+        params = [self.concept_params.get(c) for c in concepts]
+        known = np.array([p is not None for p in params], dtype=bool)
+
+        def column(name):
+            return np.array([getattr(p, name) if p is not None else 0.0 for p in params], dtype=np.float64)
+
+        return known, column("p_init"), column("p_learn"), column("p_guess"), column("p_slip")
+
+    def update_batch(self, concepts, current_mastery, correct, self_confidence) -> np.ndarray:
+        """update() for many (concept, mastery, correct, confidence) at once"""
+
+        known, _, p_learn, p_guess, p_slip = self.param_arrays(concepts)
+        if not known.all():
+            raise KeyError(f"No BKT parameters for: {sorted({c for c, k in zip(concepts, known) if not k})}")
+
+        return self.bkt_kernel(current_mastery, correct, self_confidence, p_learn, p_guess, p_slip)
+
+    def replay(self, attempt_log, initial_mastery: float = 0.5) -> dict:
+        """
+        Recompute BKT mastery trajectories for many students in one pass.
+
+        attempt_log: iterable of (user_id, concept, correct, self_confidence)
+                     in attempt order (self_confidence on the scale
+                     update() receives), or a dict of equal-length arrays
+                     under those keys
+        initial_mastery: prior per (student, concept) - 0.5, as on a
+                         student's first submit; None uses p_init
+
+        Every attempt gets its rank within its (student, concept) sequence,
+        then rank k of every sequence is updated in one kernel call, so the
+        loop runs once per attempt depth rather than once per attempt.
+        Only the BKT step is replayed (no decay or propagation). Attempts
+        on concepts without parameters are skipped.
+
+        Returns:
+        {
+            "mastery": {user_id: {concept: mastery}},
+            "trajectory": np.ndarray,   # mastery after each attempt, NaN if skipped
+            "skipped": int
+        }
+        """
+
+        if isinstance(attempt_log, dict):
+            columns = [attempt_log[key] for key in ("user_id", "concept", "correct", "self_confidence")]
+        else:
+            columns = list(zip(*attempt_log)) or [(), (), (), ()]
+
+        users, concepts, correct, confidence = (np.asarray(column) for column in columns)
+        trajectory = np.full(len(users), np.nan)
+
+        if not len(users):
+            return {"mastery": {}, "trajectory": trajectory, "skipped": 0}
+
+        correct = correct.astype(bool)
+        confidence = confidence.astype(np.float64)
+
+        concept_names, concept_codes = np.unique(concepts.astype(str), return_inverse=True)
+        user_ids, user_codes = np.unique(users, return_inverse=True)
+
+        known, p_init, p_learn, p_guess, p_slip = self.param_arrays(concept_names.tolist())
+        usable = known[concept_codes]
+
+        # One sequence per (student, concept)
+        keys, sequence = np.unique(
+            user_codes.astype(np.int64) * len(concept_names) + concept_codes,
+            return_inverse=True
+        )
+        sequence_concept = keys % len(concept_names)
+        sequence_user = keys // len(concept_names)
+
+        if initial_mastery is None:
+            mastery = p_init[sequence_concept].copy()
+        else:
+            mastery = np.full(len(keys), float(initial_mastery))
+
+        # Rank of each attempt within its sequence (stable sort keeps attempt order)
+        attempts = np.flatnonzero(usable)
+        by_sequence = attempts[np.argsort(sequence[attempts], kind="stable")]
+        counts = np.bincount(sequence[by_sequence], minlength=len(keys))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        rank = np.arange(len(by_sequence)) - starts[sequence[by_sequence]]
+
+        by_rank = by_sequence[np.argsort(rank, kind="stable")]
+        rank_bounds = np.concatenate(([0], np.cumsum(np.bincount(rank)))) if len(rank) else [0]
+
+        for k in range(len(rank_bounds) - 1):
+            step = by_rank[rank_bounds[k]:rank_bounds[k + 1]]
+            seq = sequence[step]
+            c = concept_codes[step]
+
+            mastery[seq] = self.bkt_kernel(
+                mastery[seq], correct[step], confidence[step],
+                p_learn[c], p_guess[c], p_slip[c]
+            )
+            trajectory[step] = mastery[seq]
+
+        final = {}
+        replayed = counts > 0
+        for u, c, value in zip(sequence_user[replayed], sequence_concept[replayed], mastery[replayed]):
+            final.setdefault(user_ids[u].item(), {})[str(concept_names[c])] = float(value)
+
+        return {
+            "mastery": final,
+            "trajectory": trajectory,
+            "skipped": int((~usable).sum())
+        }
+
     def _confidence_weight(self, self_confidence: int, correct: bool):
         """
         Adjust how strongly the answer affects mastery.
@@ -9,9 +9,7 @@ from .confidence_model import ConfidenceModel
 from app.services.risk_engine.feature_extractor import RiskFeatureExtractor
 from app.services.risk_engine.predictor import RiskPredictor
 
-from app.services.analytics.class_risk_aggregator import ClassRiskAggregator
-from app.services.analytics.heatmap_builder import HeatmapBuilder
-from app.services.analytics.insight_generator import InsightGenerator
+from app.services.analytics.class_mastery_aggregate import ClassMasteryAggregate
 from .bkt_config import CONCEPT_PARAMS
 
 
@@ -25,18 +23,25 @@ class CognitivePipeline:
     Confidence →
     Propagation →
     Risk →
-    Analytics →
-    Training Data Storage
+    Training Data Storage →
+    Class Aggregate Update
+
+    Class-wide analytics (class risk, heatmap, insights) are recomputed
+    in the background by ClassAnalyticsRefresher once the submit commits.
+
+    Holds only process-wide, read-only resources (concept graph, BKT
+    params, risk model) and never a database session, so one instance is
+    shared by every request thread. Callers persist the results.
     """
 
     def __init__(
         self,
         graph,
         risk_model_path: str,
-        training_data_store: list,# in-memory for now (replace with DB later)
-        db
+        training_data_store,  # TrainingSampleSink (bounded, drains to DB/file)
+        class_aggregate: ClassMasteryAggregate = None
     ):
-        self.db = db
+        self.graph = graph
         self.mastery_updater = MasteryUpdater(concept_params=CONCEPT_PARAMS)
         self.decay_engine = RetentionDecay()
         self.propagator = DependencyPropagator(graph)
@@ -45,13 +50,10 @@ class CognitivePipeline:
         self.feature_extractor = RiskFeatureExtractor(graph)
         self.risk_predictor = RiskPredictor(risk_model_path)
 
-        self.class_risk_aggregator = ClassRiskAggregator()
-        self.heatmap_builder = HeatmapBuilder()
-        self.insight_generator = InsightGenerator()
+        self.class_aggregate = class_aggregate or ClassMasteryAggregate()
 
         self.training_data_store = training_data_store  # stored for overnight retrain
 
-
     def process_submission(
         self,
         user_id : int,
@@ -61,9 +63,16 @@ class CognitivePipeline:
         response_time: float,
         student_confidence: float,
         total_attempts: int,
-        class_states: Dict[str, Any]
+        class_states: Dict[str, Any],
+        graph=None
     ) -> Dict[str, Any]:
+        """
+        graph: the concept graph for this submission (e.g. the latest
+        published one); defaults to the graph the pipeline was built with.
+        The same graph is used for propagation and risk features.
+        """
 
+        graph = self.graph if graph is None else graph
         now = datetime.now()
 
         old_mastery_snapshot = student_state.mastery_dict.copy()
@@ -95,8 +104,7 @@ class CognitivePipeline:
         # ---------------------------
         # 3️⃣ Update Attempt History
         # ---------------------------
-        student_state.attempt_history.setdefault(concept, []).append(correct)
-        student_state.last_attempt_time[concept] = now
+        student_state.record_attempt(concept, correct, now)
 
         # ---------------------------
         # 4️⃣ Confidence Recalculation
@@ -112,41 +120,50 @@ class CognitivePipeline:
         # ---------------------------
         self.propagator.propagate(
             mastery_dict=student_state.mastery_dict,
-            updated_concept=concept
+            updated_concept=concept,
+            graph=graph
         )
 
         # ---------------------------
         # 6️⃣ Risk Feature Extraction
         # ---------------------------
-        feature_vector = self.feature_extractor.extract_features(
+        # Temporal features take the submitted concept's recent attempts
+        feature_vector, features = self.feature_extractor.extract_features(
             mastery_dict=student_state.mastery_dict,
-            attempt_history=student_state.attempt_history,
+            attempt_history=[
+                {"correct": attempt}
+                for attempt in student_state.attempt_history[concept][-10:]
+            ],
             confidence_metrics=student_state.confidence_metrics,
             decay_deltas=student_state.compute_decay_deltas(),
-            total_attempts=total_attempts
+            graph=graph
         )
 
-        risk_prediction = self.risk_predictor.predict(feature_vector)
+        risk_prediction = self.risk_predictor.predict(features)
+        risk_prediction["risk_label"] = int(risk_prediction["risk_probability"] >= 0.5)
 
         student_state.risk_profile = risk_prediction
 
         # ---------------------------
         # 7️⃣ Store Training Data (For Manual Overnight Retrain)
         # ---------------------------
-        self.training_data_store.append({
-            "features": feature_vector,
-            "label": risk_prediction["risk_label"],  # later can replace with real outcome
-            "timestamp": now.isoformat()
-        })
+        self.training_data_store.append(
+            features=feature_vector,
+            label=risk_prediction["risk_label"],  # later can replace with real outcome
+            timestamp=now
+        )
 
         # ---------------------------
-        # 8️⃣ Analytics Integration
+        # 8️⃣ Class Aggregate Update
         # ---------------------------
-        class_risk = self.class_risk_aggregator.aggregate_from_mastery(self.db)
-
-        heatmap = self.heatmap_builder.build_class_matrix(self.db)
+        # Only concepts touched by this submission feed the class aggregate;
+        # reading it (and re-seeding it) happens in the analytics worker
+        changed_mastery = {
+            c: v for c, v in student_state.mastery_dict.items()
+            if old_mastery_snapshot.get(c) != v
+        }
 
-        insights = self.insight_generator.generate_student_insights(self.db, user_id)
+        self.class_aggregate.apply(user_id, changed_mastery)
 
         # ---------------------------
         # 9️⃣ Delta Snapshot (Teacher Real-Time View)
@@ -161,7 +178,5 @@ class CognitivePipeline:
             "mastery_delta": mastery_delta,
             "risk": risk_prediction,
             "confidence": student_state.confidence_metrics,
-            "class_risk": class_risk,
-            "heatmap": heatmap,
-            "insights": insights
+            "changed_concepts": list(changed_mastery)
         }
\ No newline at end of file
@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.logging import get_logger
+
+logger = get_logger("analytics_worker")
+
+
+class AnalyticsWorker:
+    """
+    In-process background task queue with per-key coalescing.
+
+    submit(key, item) schedules handler(key, items) to run `coalesce_seconds`
+    later. Every item submitted for the same key before the job starts is
+    folded into that one call, so a burst of submits in one classroom
+    triggers a single recompute. Jobs run on a pool of at most
+    `concurrency` threads, and never more than one at a time per key.
+    """
+
+    def __init__(self, handler, concurrency: int = 2, coalesce_seconds: float = 2.0):
+        self.handler = handler
+        self.coalesce_seconds = coalesce_seconds
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix="analytics-worker"
+        )
+        self._cond = threading.Condition()
+        self._heap = []                 # (due, seq, key)
+        self._pending = {}              # key -> [items]
+        self._running = set()
+        self._seq = itertools.count()
+        self._stopped = False
+        self._thread = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    # --------------------------------------------------
+    # Producer Side
+    # --------------------------------------------------
+
+    def submit(self, key, item=None):
+        with self._cond:
+            if self._stopped:
+                return
+
+            self.submitted += 1
+            self._ensure_scheduler()
+
+            if key in self._pending:
+                # Already scheduled - ride along with that run
+                self._pending[key].append(item)
+                return
+
+            self._pending[key] = [item]
+            due = time.monotonic() + self.coalesce_seconds
+            heapq.heappush(self._heap, (due, next(self._seq), key))
+            self._cond.notify()
+
+    # --------------------------------------------------
+    # Scheduler
+    # --------------------------------------------------
+
+    def _ensure_scheduler(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run,
+                name="analytics-scheduler",
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._heap and self._heap[0][0] <= time.monotonic():
+                        break
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+
+                if self._stopped:
+                    return
+
+                _, _, key = heapq.heappop(self._heap)
+
+                if key in self._running:
+                    # Previous run for this key still going - try again later
+                    due = time.monotonic() + self.coalesce_seconds
+                    heapq.heappush(self._heap, (due, next(self._seq), key))
+                    continue
+
+                items = self._pending.pop(key)
+                self._running.add(key)
+
+                # Still under the lock: close() marks the worker stopped
+                # before shutting the executor down, so it is open here
+                # unless the interpreter itself is exiting
+                try:
+                    self._executor.submit(self._execute, key, items)
+                except RuntimeError as e:
+                    self._running.discard(key)
+                    logger.info(f"Dropped analytics job for {key!r}: {e}")
+                    return
+
+    def _execute(self, key, items):
+        ok = False
+        try:
+            self.handler(key, items)
+            ok = True
+        except Exception as e:
+            logger.error(f"Analytics job for {key!r} failed: {e}")
+        finally:
+            # Counters share the scheduler lock with stats()
+            with self._cond:
+                self._running.discard(key)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+
+    def close(self, wait: bool = True):
+        """Stop scheduling. Jobs already running finish; pending ones are dropped."""
+        with self._cond:
+            self._stopped = True
+            dropped = len(self._pending)
+            self._pending.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+
+        if dropped:
+            logger.info(f"Dropped {dropped} pending analytics jobs on shutdown")
+
+        self._executor.shutdown(wait=wait)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "running": len(self._running),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed
+            }
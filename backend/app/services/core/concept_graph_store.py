@@ -0,0 +1,183 @@
+import threading
+import time
+
+from app.core.logging import get_logger
+from app.services.cognitive_engine.concept_graph import ConceptGraph
+from app.services.persistence.concept_graph_repository import ConceptGraphRepository
+
+logger = get_logger("concept_graph_store")
+
+DEFAULT_SCOPE = "global"
+
+
+def classroom_scope(classroom_id) -> str:
+    return f"classroom:{classroom_id}"
+
+
+def subject_scope(subject: str) -> str:
+    return f"subject:{subject.strip().lower()}"
+
+
+class ConceptGraphStore:
+    """
+    Process-wide cache of the versioned concept graphs in
+    `concept_graph_versions`, compiled once per (scope, version).
+
+    get() never touches the database for a scope it has loaded: the
+    first get() of a scope loads it, and from then on a background
+    thread re-reads the latest version numbers of all loaded scopes
+    (one query) every `check_seconds`, rebuilding only the ones that
+    changed, so a graph published from any worker is picked up without
+    a restart. reload() forces the check (e.g. right after publishing
+    in this process). Scopes with no stored version resolve to an empty
+    graph. check_seconds <= 0 disables the background thread.
+    """
+
+    def __init__(self, session_factory=None, check_seconds: float = 30.0):
+        if session_factory is None:
+            from app.db.session import SessionLocal
+            session_factory = SessionLocal
+
+        self.session_factory = session_factory
+        self.check_seconds = check_seconds
+
+        self._graphs = {}       # scope -> (version, ConceptGraph)
+        self._lock = threading.Lock()
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, scope: str = DEFAULT_SCOPE, db=None) -> ConceptGraph:
+        """Cached graph for a scope; loaded on first use only"""
+
+        with self._lock:
+            entry = self._graphs.get(scope)
+        if entry is not None:
+            return entry[1]
+
+        graph = self._refresh(scope, db)
+        self._ensure_refresher()
+        return graph
+
+    def reload(self, scope: str = DEFAULT_SCOPE, db=None) -> ConceptGraph:
+        return self._refresh(scope, db)
+
+    def version(self, scope: str = DEFAULT_SCOPE):
+        """Cached version of a scope (None if not loaded or never published)"""
+        with self._lock:
+            entry = self._graphs.get(scope)
+        return entry[0] if entry else None
+
+    def versions(self) -> dict:
+        with self._lock:
+            return {scope: version for scope, (version, _) in self._graphs.items()}
+
+    def resolve_scope(self, db, classroom) -> str:
+        """
+        Most specific scope with a published graph for a classroom:
+        the classroom's own, then its subject's, then the global one.
+        """
+
+        candidates = [classroom_scope(classroom.id)]
+        if classroom.subject:
+            candidates.append(subject_scope(classroom.subject))
+
+        published = ConceptGraphRepository.latest_versions(db, candidates)
+        return next((scope for scope in candidates if scope in published), DEFAULT_SCOPE)
+
+    def for_classroom(self, db, classroom) -> ConceptGraph:
+        return self.get(self.resolve_scope(db, classroom), db)
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+
+    def close(self):
+        """Stop the background version checks"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # --------------------------------------------------
+    # Background Version Checks
+    # --------------------------------------------------
+
+    def check_versions(self) -> list:
+        """
+        Re-read the latest version of every loaded scope in one query and
+        rebuild the ones that changed. Returns the scopes that were rebuilt.
+        """
+
+        with self._lock:
+            cached = {scope: version for scope, (version, _) in self._graphs.items()}
+        if not cached:
+            return []
+
+        db = self.session_factory()
+        try:
+            latest = ConceptGraphRepository.latest_versions(db, list(cached))
+            changed = [scope for scope, version in cached.items() if latest.get(scope) != version]
+            for scope in changed:
+                self._refresh(scope, db)
+        finally:
+            db.close()
+
+        return changed
+
+    def _ensure_refresher(self):
+        if self.check_seconds <= 0 or self._stop.is_set():
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="concept-graph-refresher",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.check_seconds):
+            try:
+                self.check_versions()
+            except Exception as e:
+                # Keep serving the cached graphs; try again next interval
+                logger.warning(f"Concept graph version check failed: {e}")
+
+    # --------------------------------------------------
+    # Loading
+    # --------------------------------------------------
+
+    def _refresh(self, scope: str, db=None) -> ConceptGraph:
+        own_session = db is None
+        if own_session:
+            db = self.session_factory()
+
+        try:
+            latest = ConceptGraphRepository.latest_versions(db, [scope]).get(scope)
+
+            with self._lock:
+                entry = self._graphs.get(scope)
+            if entry is not None and entry[0] == latest:
+                return entry[1]
+
+            if latest is None:
+                graph = ConceptGraph()
+            else:
+                # Built (and compiled) outside the lock; readers keep the old graph meanwhile
+                start = time.perf_counter()
+                graph = ConceptGraphRepository.to_graph(ConceptGraphRepository.load(db, scope, latest))
+                logger.info(
+                    f"Loaded concept graph {scope} v{latest}: {len(graph.nodes)} concepts, "
+                    f"{graph.total_edges()} edges in {(time.perf_counter() - start) * 1000:.1f} ms"
+                )
+        finally:
+            if own_session:
+                db.close()
+
+        with self._lock:
+            self._graphs[scope] = (latest, graph)
+
+        return graph
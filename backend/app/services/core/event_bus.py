@@ -1,9 +1,165 @@
+import asyncio
+import threading
+import time
+
+from app.core.logging import get_logger
+
+logger = get_logger("event_bus")
+
+
+def classroom_topic(class_id) -> str:
+    return f"classroom:{class_id}"
+
+
+class Subscription:
+    """
+    One subscriber on one topic.
+
+    Events land in a bounded asyncio.Queue owned by the subscriber's event
+    loop. When the subscriber falls behind, the oldest event is dropped so
+    a slow dashboard can never grow memory or block publishers.
+    """
+
+    def __init__(self, topic: str, loop: asyncio.AbstractEventLoop, max_queue: int = 256):
+        self.topic = topic
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def _offer(self, event):
+        # Always runs on self.loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    async def batches(self, window: float = 0.5, max_events: int = 200, idle_timeout: float = None):
+        """
+        Yield lists of events: waits for one event, then gathers whatever
+        else arrives within `window` seconds (up to `max_events`).
+        Yields an empty list after `idle_timeout` seconds without events.
+        """
+        while True:
+            try:
+                batch = [await asyncio.wait_for(self.queue.get(), idle_timeout)]
+            except asyncio.TimeoutError:
+                yield []
+                continue
+            deadline = time.monotonic() + window
+
+            while len(batch) < max_events:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            yield batch
+
+
 class EventBus:
+    """
+    In-process pub/sub with per-topic fan-out.
+
+    publish() is safe to call from any thread (request handlers, the
+    analytics worker); delivery is scheduled onto each subscriber's own
+    event loop. Subscribers are created with subscribe() from inside a
+    running loop, e.g. a Server-Sent Events endpoint.
+    """
+
+    _subscribers = {}   # topic -> set[Subscription]
+    _lock = threading.Lock()
+
+    @classmethod
+    def subscribe(cls, topic: str, max_queue: int = 256) -> Subscription:
+        subscription = Subscription(topic, asyncio.get_running_loop(), max_queue)
+        with cls._lock:
+            cls._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, subscription: Subscription):
+        with cls._lock:
+            subscribers = cls._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del cls._subscribers[subscription.topic]
+
+    @classmethod
+    def publish(cls, topic: str, event) -> int:
+        """Fan an event out to every subscriber of `topic`. Returns the count."""
+        with cls._lock:
+            subscribers = list(cls._subscribers.get(topic, ()))
+
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+                delivered += 1
+            except RuntimeError:
+                # Subscriber's loop is closed - it went away without unsubscribing
+                cls.unsubscribe(subscription)
+
+        return delivered
+
+    @classmethod
+    def subscriber_count(cls, topic: str = None) -> int:
+        with cls._lock:
+            if topic is not None:
+                return len(cls._subscribers.get(topic, ()))
+            return sum(len(s) for s in cls._subscribers.values())
 
     @staticmethod
     def push_teacher_update(class_id, payload):
+        """Publish an update to the teacher dashboards watching a classroom."""
+        delivered = EventBus.publish(classroom_topic(class_id), payload)
+        logger.debug(f"Teacher update for class {class_id} -> {delivered} subscribers")
+
+    @staticmethod
+    def merge_deltas(events: list) -> dict:
         """
-        Replace with WebSocket / Redis pub-sub later.
+        Collapse a batch of classroom events into one delta:
+        the latest mastery value per (student, concept), the latest risk
+        per student (from submissions or a classroom re-score), and the
+        latest class analytics snapshot with the heatmap cells and
+        student insights of every analytics event in the batch merged in
+        (latest value wins). Events are shared between subscribers, so
+        they are never modified.
         """
-        print(f"[Teacher Update] Class {class_id}")
-        print(payload)
\ No newline at end of file
+        mastery = {}
+        risk = {}
+        analytics = None
+
+        for event in events:
+            kind = event.get("type")
+            if kind == "mastery_delta":
+                student_id = event["student_id"]
+                mastery.setdefault(student_id, {}).update(event.get("mastery", {}))
+                if event.get("risk") is not None:
+                    risk[student_id] = event["risk"]
+            elif kind == "risk_scores":
+                risk.update(event.get("risk", {}))
+            elif kind == "class_analytics":
+                previous = analytics or {}
+                analytics = {
+                    **event,
+                    "heatmap": {**previous.get("heatmap", {}), **event.get("heatmap", {})},
+                    "changed_concepts": sorted(
+                        set(previous.get("changed_concepts", [])) | set(event.get("changed_concepts", []))
+                    ),
+                    "student_insights": {
+                        **previous.get("student_insights", {}),
+                        **event.get("student_insights", {})
+                    }
+                }
+
+        delta = {"mastery": mastery, "risk": risk}
+        if analytics is not None:
+            delta["analytics"] = analytics
+        return delta
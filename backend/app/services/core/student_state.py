@@ -19,6 +19,17 @@ class StudentState:
         # 17-feature baseline (cold test)
         self.global_feature_vector = [0.0] * 17
 
+    def record_attempt(self, concept, correct, timestamp=None):
+        """
+        Append one observation to the concept's correctness sequence.
+        Sequences are plain lists of bools (oldest first), so appends are
+        amortized O(1); consumers that need arrays convert on read.
+        """
+        self.attempt_history.setdefault(concept, []).append(bool(correct))
+
+        if timestamp is not None:
+            self.last_attempt_time[concept] = timestamp
+
     def compute_decay_deltas(self):
         return self.decay_deltas_cache
 
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class StudentStateCache:
+    """
+    Process-wide LRU cache of hydrated StudentState objects.
+
+    Entries expire after `ttl_seconds` and the least recently used
+    entry is evicted once `max_size` is reached.
+
+    Serves read paths only. Cached objects are shared between requests,
+    so writers load their own state from the primary database and
+    put it back (or invalidate the entry) after committing.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+        self._entries = OrderedDict()   # user_id -> (expires_at, state)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, state = entry
+            if expires_at < self._clock():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return state
+
+    def put(self, user_id, state):
+        with self._lock:
+            self._entries[user_id] = (self._clock() + self.ttl_seconds, state)
+            self._entries.move_to_end(user_id)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, user_id, loader):
+        """
+        Return the cached state, or build it with `loader()` and cache it.
+        The loader runs outside the lock so slow DB reads don't block other students.
+        """
+
+        state = self.get(user_id)
+        if state is None:
+            state = loader()
+            self.put(user_id, state)
+        return state
+
+    async def get_or_load_async(self, user_id, loader):
+        """
+        Async variant of get_or_load; `loader()` returns an awaitable.
+        """
+
+        state = self.get(user_id)
+        if state is None:
+            state = await loader()
+            self.put(user_id, state)
+        return state
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses
+            }
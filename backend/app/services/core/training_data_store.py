@@ -1,29 +1,146 @@
+import atexit
 import json
+import mmap
 import os
+import threading
+import time
 from datetime import datetime
 
 
+def _json_default(value):
+    # numpy arrays / scalars coming out of the feature extractor
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _is_legacy_array(path) -> bool:
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(1) == b"["
+
+
+def _read_legacy(path) -> list:
+    """Records of a legacy JSON array file, plus any JSONL appended after the array"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    records, end = json.JSONDecoder().raw_decode(text)
+    records.extend(json.loads(line) for line in text[end:].splitlines() if line.strip())
+    return records
+
+
 class TrainingDataStore:
+    """
+    Append-only JSONL store for training samples.
+
+    Each append is O(1): records are buffered in memory, written to the
+    end of the file every `flush_every` records, and fsync'd at most
+    once per `fsync_interval` seconds. The buffer is flushed by close(),
+    which also runs at interpreter exit; records still buffered are
+    lost only if the process is killed.
+
+    If `path` does not exist yet and the legacy `training_data.json`
+    array sits next to it (same name without the trailing "l"), or
+    `path` itself still holds a legacy array, its records are migrated
+    to JSONL once and the old file is kept as `*.migrated`.
+    """
 
-    def __init__(self, path="training_data.json"):
+    def __init__(self, path="training_data.jsonl", flush_every=64, fsync_interval=5.0):
         self.path = path
-        if not os.path.exists(self.path):
-            with open(self.path, "w") as f:
-                json.dump([], f)
+        self.flush_every = flush_every
+        self.fsync_interval = fsync_interval
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+
+        self._migrate_legacy()
+        self._file = open(self.path, "a", encoding="utf-8")
+        atexit.register(self.close)
+
+    def _migrate_legacy(self):
+        """
+        One-time rewrite of legacy JSON-array data as JSONL, so reads can
+        always stream line by line: either the `*.json` file next to a new
+        `path`, or `path` itself if it still holds an array.
+        """
+
+        legacy_path = self.path[:-1] if self.path.endswith(".jsonl") else None
+
+        if legacy_path is not None and not os.path.exists(self.path) and os.path.exists(legacy_path):
+            tmp_path = self._write_jsonl(_read_legacy(legacy_path))
+            os.replace(tmp_path, self.path)
+            os.replace(legacy_path, legacy_path + ".migrated")
+        elif _is_legacy_array(self.path):
+            tmp_path = self._write_jsonl(_read_legacy(self.path))
+            os.replace(self.path, self.path + ".migrated")
+            os.replace(tmp_path, self.path)
+
+    def _write_jsonl(self, records):
+        # Written to a temp file first so a crash can't leave half a migration
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=_json_default, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
 
     def append(self, features, label):
-        with open(self.path, "r") as f:
-            data = json.load(f)
+        line = json.dumps(
+            {
+                "features": features,
+                "label": label,
+                "timestamp": datetime.now().isoformat()
+            },
+            default=_json_default,
+            separators=(",", ":")
+        )
+
+        with self._lock:
+            self._buffer.append(line + "\n")
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        """Write buffered records and fsync (no-op once closed)."""
+        with self._lock:
+            if not self._file.closed:
+                self._flush_locked(force_fsync=True)
+
+    def _flush_locked(self, force_fsync=False):
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._buffer.clear()
+            self._file.flush()
+
+        now = time.monotonic()
+        if force_fsync or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_locked(force_fsync=True)
+            self._file.close()
+
+    def iter_records(self):
+        """Stream records from a memory-mapped view of the file, one line at a time."""
 
-        data.append({
-            "features": features,
-            "label": label,
-            "timestamp": datetime.now().isoformat()
-        })
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
 
-        with open(self.path, "w") as f:
-            json.dump(data, f, indent=2)
+        with open(self.path, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
 
     def load_all(self):
-        with open(self.path, "r") as f:
-            return json.load(f)
\ No newline at end of file
+        self.flush()
+        return list(self.iter_records())
@@ -0,0 +1,181 @@
+import queue
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.core.logging import get_logger
+from app.models.training_data import TrainingData
+from app.services.core.training_data_store import TrainingDataStore
+
+logger = get_logger("training_sink")
+
+
+class DatabaseTrainingBackend:
+    """Writes training samples to the `training_data` table."""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from app.db.session import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    def write_batch(self, records):
+        db = self.session_factory()
+        try:
+            db.execute(
+                insert(TrainingData),
+                [{"features": r["features"], "label": r["label"]} for r in records]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def load_all(self):
+        db = self.session_factory()
+        try:
+            rows = db.query(TrainingData.features, TrainingData.label).order_by(TrainingData.id).all()
+            return [{"features": r.features, "label": r.label} for r in rows]
+        finally:
+            db.close()
+
+
+class FileTrainingBackend:
+    """Writes training samples to an append-only TrainingDataStore file."""
+
+    def __init__(self, store: TrainingDataStore):
+        self.store = store
+
+    def write_batch(self, records):
+        for r in records:
+            self.store.append(r["features"], r["label"])
+        self.store.flush()
+
+    def load_all(self):
+        return self.store.load_all()
+
+    def close(self):
+        self.store.close()
+
+
+class TrainingSampleSink:
+    """
+    Bounded, asynchronous sink for training samples.
+
+    Submissions append to an in-memory queue of at most `capacity`
+    samples; a daemon thread drains it in batches into the backend.
+    append() never blocks (it is called from request handlers): when
+    the queue is full the sample is dropped and counted in `dropped`,
+    so memory stays flat no matter how far the backend falls behind.
+    """
+
+    def __init__(
+        self,
+        backend,
+        capacity: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 2.0
+    ):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=capacity)
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+
+    # --------------------------------------------------
+    # Producer Side
+    # --------------------------------------------------
+
+    def append(self, features, label, timestamp: datetime = None):
+        record = {
+            "features": features.tolist() if hasattr(features, "tolist") else features,
+            "label": label.item() if hasattr(label, "item") else label,
+            "timestamp": (timestamp or datetime.now()).isoformat()
+        }
+
+        self._ensure_worker()
+
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Training sample queue full, {self.dropped} samples dropped so far")
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    # --------------------------------------------------
+    # Drain Worker
+    # --------------------------------------------------
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="training-sample-sink",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.backend.write_batch(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Failed to persist {len(batch)} training samples: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued sample has been handed to the backend."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+    def load_all(self):
+        self.flush()
+        return self.backend.load_all()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
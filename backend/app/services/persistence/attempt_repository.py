@@ -1,4 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.attempt import Attempt
 
 
@@ -25,4 +27,33 @@ class AttemptRepository:
         )
 
         db.add(attempt)
-        return attempt
\ No newline at end of file
+        return attempt
+
+class AsyncAttemptRepository:
+
+    @staticmethod
+    def save_attempt(
+        db: AsyncSession,
+        user_id: int,
+        question_id: int,
+        is_correct: bool,
+        confidence: int
+    ) -> Attempt:
+        """
+        Persist a single student attempt.
+        Does NOT commit. Caller must commit.
+        """
+
+        return AttemptRepository.save_attempt(db, user_id, question_id, is_correct, confidence)
+
+    @staticmethod
+    async def recent_attempts(db: AsyncSession, user_id: int, limit: int = 10) -> list:
+        """Most recent attempts first."""
+
+        result = await db.execute(
+            select(Attempt)
+            .where(Attempt.user_id == user_id)
+            .order_by(Attempt.id.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
@@ -0,0 +1,64 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.concept_graph_version import ConceptGraphVersion
+from app.services.cognitive_engine.concept_graph import ConceptGraph
+
+
+class ConceptGraphRepository:
+
+    @staticmethod
+    def latest_versions(db: Session, scopes: list = None) -> dict:
+        """
+        Highest stored version per scope in one query.
+
+        Returns:
+        {
+            scope: version
+        }
+        """
+
+        query = db.query(
+            ConceptGraphVersion.scope,
+            func.max(ConceptGraphVersion.version)
+        )
+        if scopes is not None:
+            query = query.filter(ConceptGraphVersion.scope.in_(list(scopes)))
+
+        return dict(query.group_by(ConceptGraphVersion.scope).all())
+
+    @staticmethod
+    def load(db: Session, scope: str, version: int = None):
+        """The requested (default: latest) version row of a scope, or None"""
+
+        query = db.query(ConceptGraphVersion).filter(ConceptGraphVersion.scope == scope)
+        if version is not None:
+            return query.filter(ConceptGraphVersion.version == version).first()
+        return query.order_by(ConceptGraphVersion.version.desc()).first()
+
+    @staticmethod
+    def save_version(db: Session, scope: str, graph: ConceptGraph) -> ConceptGraphVersion:
+        """
+        Store `graph` as the next version of `scope`. Does NOT commit;
+        the (scope, version) unique key rejects a concurrent publish.
+        """
+
+        latest = ConceptGraphRepository.latest_versions(db, [scope]).get(scope, 0)
+
+        row = ConceptGraphVersion(
+            scope=scope,
+            version=latest + 1,
+            concepts=sorted(graph.nodes),
+            edges=[list(edge) for edge in graph.edges()]
+        )
+        db.add(row)
+        db.flush()
+
+        return row
+
+    @staticmethod
+    def to_graph(row: ConceptGraphVersion) -> ConceptGraph:
+        return ConceptGraph.from_edges(
+            [tuple(edge) for edge in row.edges],
+            concepts=row.concepts
+        )
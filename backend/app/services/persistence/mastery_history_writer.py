@@ -0,0 +1,124 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, delete, select, func
+from sqlalchemy.orm import Session
+
+from app.models.mastery_history import MasteryHistory
+
+# strftime formats used to bucket timestamps on SQLite
+_SQLITE_BUCKETS = {
+    "minute": "%Y-%m-%d %H:%M",
+    "hour": "%Y-%m-%d %H",
+    "day": "%Y-%m-%d",
+}
+
+
+class MasteryHistoryWriter:
+    """
+    Delta-only MasteryHistory writer.
+
+    A snapshot is recorded only when a concept moved by more than
+    `epsilon` since the last value recorded for it, so the history
+    table grows with real learning events instead of C rows per answer.
+    """
+
+    def __init__(self, epsilon: float = None):
+        if epsilon is None:
+            epsilon = float(os.getenv("MASTERY_HISTORY_EPSILON", "0.005"))
+        self.epsilon = epsilon
+
+    def latest_values(self, db: Session, user_id: int, concepts: list) -> dict:
+        """
+        Last recorded mastery per concept, in one window-function query.
+        """
+
+        ranked = (
+            select(
+                MasteryHistory.concept.label("concept"),
+                MasteryHistory.mastery_value.label("mastery_value"),
+                func.row_number().over(
+                    partition_by=MasteryHistory.concept,
+                    order_by=(MasteryHistory.timestamp.desc(), MasteryHistory.id.desc())
+                ).label("rn")
+            )
+            .where(
+                MasteryHistory.user_id == user_id,
+                MasteryHistory.concept.in_(concepts)
+            )
+            .subquery()
+        )
+
+        rows = db.execute(
+            select(ranked.c.concept, ranked.c.mastery_value).where(ranked.c.rn == 1)
+        ).all()
+
+        return {row.concept: row.mastery_value for row in rows}
+
+    def record(self, db: Session, user_id: int, rows: list) -> list:
+        """
+        rows: [{"user_id", "concept", "mastery_value", "confidence"}]
+
+        Inserts the rows that clear the epsilon threshold with one
+        executemany. Does NOT commit. Returns the rows written.
+        """
+
+        if not rows:
+            return []
+
+        if self.epsilon > 0:
+            last = self.latest_values(db, user_id, [r["concept"] for r in rows])
+            rows = [
+                r for r in rows
+                if r["concept"] not in last
+                or last[r["concept"]] is None
+                or abs(r["mastery_value"] - last[r["concept"]]) > self.epsilon
+            ]
+
+        if rows:
+            db.execute(insert(MasteryHistory), rows)
+
+        return rows
+
+    # --------------------------------------------------
+    # Maintenance
+    # --------------------------------------------------
+
+    @staticmethod
+    def compact(db: Session, older_than_days: int = 30, bucket: str = "hour") -> int:
+        """
+        Keep only the last snapshot per (user, concept, time bucket) for
+        history older than `older_than_days`. Does NOT commit.
+        Returns the number of rows deleted.
+        """
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        dialect = db.get_bind().dialect.name
+
+        if dialect == "postgresql":
+            bucket_expr = func.date_trunc(bucket, MasteryHistory.timestamp)
+        elif dialect == "sqlite":
+            if bucket not in _SQLITE_BUCKETS:
+                raise ValueError(f"Unsupported bucket for SQLite: {bucket}")
+            bucket_expr = func.strftime(_SQLITE_BUCKETS[bucket], MasteryHistory.timestamp)
+            # SQLite stores naive UTC timestamps
+            cutoff = cutoff.replace(tzinfo=None)
+        else:
+            raise ValueError(f"History compaction not supported on {dialect}")
+
+        keep_ids = (
+            select(func.max(MasteryHistory.id))
+            .where(MasteryHistory.timestamp < cutoff)
+            .group_by(MasteryHistory.user_id, MasteryHistory.concept, bucket_expr)
+        )
+
+        result = db.execute(
+            delete(MasteryHistory)
+            .where(
+                MasteryHistory.timestamp < cutoff,
+                MasteryHistory.id.not_in(keep_ids)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount
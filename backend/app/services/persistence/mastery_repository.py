@@ -1,9 +1,22 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.models.mastery import Mastery
-from app.models.mastery_history import MasteryHistory
+from app.services.persistence.mastery_history_writer import MasteryHistoryWriter
+
+# Dialects supporting INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
 
 
 class MasteryRepository:
 
+    # Shared delta-only history writer (MASTERY_HISTORY_EPSILON)
+    history_writer = MasteryHistoryWriter()
+
     @staticmethod
     def upsert_mastery(
         db,
@@ -13,6 +26,20 @@ class MasteryRepository:
         confidence
     ):
 
+        MasteryRepository._upsert_row(db, user_id, concept, mastery_value, confidence)
+
+        # History snapshot, only if the value moved past epsilon
+        MasteryRepository.history_writer.record(db, user_id, [{
+            "user_id": user_id,
+            "concept": concept,
+            "mastery_value": mastery_value,
+            "confidence": confidence
+        }])
+
+
+    @staticmethod
+    def _upsert_row(db, user_id, concept, mastery_value, confidence):
+
         existing = (
             db.query(Mastery)
             .filter(
@@ -34,12 +61,85 @@ class MasteryRepository:
             )
             db.add(new_mastery)
 
-        # 🔥 Always insert history snapshot
-        history_entry = MasteryHistory(
-            user_id=user_id,
-            concept=concept,
-            mastery_value=mastery_value,
-            confidence=confidence
-        )
 
-        db.add(history_entry)
\ No newline at end of file
+    @staticmethod
+    def bulk_upsert_mastery(
+        db,
+        user_id,
+        values: dict,
+        previous: dict = None
+    ):
+        """
+        Persist many concepts for one student with one
+        INSERT ... ON CONFLICT (user_id, concept) DO UPDATE and one
+        executemany of MasteryHistory rows (plus one lookup of the last
+        recorded values when the history epsilon is non-zero).
+
+        values   : {concept: (mastery_value, confidence)}
+        previous : {concept: (mastery_value, confidence)} as last persisted;
+                   concepts whose values are unchanged are skipped
+
+        Does NOT commit. Caller must commit.
+        Returns the list of concepts written.
+        """
+
+        previous = previous or {}
+
+        rows = [
+            {
+                "user_id": user_id,
+                "concept": concept,
+                "mastery_value": mastery_value,
+                "confidence": confidence
+            }
+            for concept, (mastery_value, confidence) in values.items()
+            if previous.get(concept) != (mastery_value, confidence)
+        ]
+
+        if not rows:
+            return []
+
+        insert_fn = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+
+        if insert_fn is None:
+            # No native upsert: fall back to per-row select + update/insert
+            for row in rows:
+                MasteryRepository._upsert_row(db, **row)
+        else:
+            stmt = insert_fn(Mastery).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Mastery.user_id, Mastery.concept],
+                set_={
+                    "mastery_value": stmt.excluded.mastery_value,
+                    "confidence": stmt.excluded.confidence
+                }
+            )
+            db.execute(stmt)
+
+        MasteryRepository.history_writer.record(db, user_id, rows)
+
+        return [row["concept"] for row in rows]
+
+
+class AsyncMasteryRepository:
+    """
+    AsyncSession counterpart of MasteryRepository. The upsert and history
+    logic is shared: it runs through AsyncSession.run_sync, so statements
+    go over the async driver without blocking the event loop.
+    """
+
+    @staticmethod
+    async def bulk_upsert_mastery(
+        db: AsyncSession,
+        user_id,
+        values: dict,
+        previous: dict = None
+    ):
+        """See MasteryRepository.bulk_upsert_mastery. Does NOT commit."""
+
+        return await db.run_sync(
+            MasteryRepository.bulk_upsert_mastery,
+            user_id,
+            values,
+            previous
+        )
@@ -0,0 +1,261 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
+
+from app.models.mastery import Mastery
+from app.models.attempt import Attempt
+from app.models.question import Question
+from app.models.risk_history import RiskHistory
+from app.services.core.student_state import StudentState
+
+
+class StudentStateRepository:
+
+    @staticmethod
+    def load(db: Session, user_id: int) -> StudentState:
+        """
+        Hydrate a StudentState from the database.
+        Loads mastery, attempt history, and latest risk profile.
+        """
+
+        state = StudentState(student_id=user_id)
+
+        # Load mastery
+        mastery_rows = db.query(Mastery).filter(Mastery.user_id == user_id).all()
+        for row in mastery_rows:
+            state.mastery_dict[row.concept] = row.mastery_value
+            state.confidence_metrics[row.concept] = row.confidence
+
+        # Load attempt history
+        state.attempt_history = StudentStateRepository.load_attempt_history(db, user_id)
+
+        # Load latest risk profile
+        latest_risk = db.query(RiskHistory).filter(
+            RiskHistory.student_id == str(user_id)
+        ).order_by(RiskHistory.timestamp.desc()).first()
+
+        if latest_risk:
+            state.risk_profile = StudentStateRepository.risk_profile_from_row(latest_risk)
+
+        return state
+
+    @staticmethod
+    def load_many(db: Session, user_ids: list) -> dict:
+        """
+        Bulk-hydrate mastery and latest risk for a roster in a constant
+        number of queries. Attempt history is not loaded.
+
+        Returns:
+        {
+            user_id: StudentState
+        }
+        """
+
+        states = {
+            user_id: StudentState(student_id=user_id)
+            for user_id in user_ids
+        }
+
+        if not states:
+            return states
+
+        mastery_rows = (
+            db.query(Mastery.user_id, Mastery.concept, Mastery.mastery_value, Mastery.confidence)
+            .filter(Mastery.user_id.in_(list(states)))
+            .all()
+        )
+
+        for row in mastery_rows:
+            state = states[row.user_id]
+            state.mastery_dict[row.concept] = row.mastery_value
+            state.confidence_metrics[row.concept] = row.confidence
+
+        for row in StudentStateRepository.latest_risk_rows(db, list(states)):
+            states[int(row.student_id)].risk_profile = \
+                StudentStateRepository.risk_profile_from_row(row)
+
+        return states
+
+    @staticmethod
+    def latest_risk_rows(db: Session, user_ids: list) -> list:
+        """
+        Latest RiskHistory row per student in one query (ROW_NUMBER window).
+        """
+
+        ranked = (
+            db.query(
+                RiskHistory.student_id.label("student_id"),
+                RiskHistory.risk_label.label("risk_label"),
+                RiskHistory.risk_score.label("risk_score"),
+                func.row_number().over(
+                    partition_by=RiskHistory.student_id,
+                    order_by=(RiskHistory.timestamp.desc(), RiskHistory.id.desc())
+                ).label("rn")
+            )
+            .filter(RiskHistory.student_id.in_([str(user_id) for user_id in user_ids]))
+            .subquery()
+        )
+
+        return (
+            db.query(ranked.c.student_id, ranked.c.risk_label, ranked.c.risk_score)
+            .filter(ranked.c.rn == 1)
+            .all()
+        )
+
+    @staticmethod
+    def latest_concept_attempts_many(db: Session, user_ids: list, limit: int = 10) -> dict:
+        """
+        Per student, the last `limit` attempts on the concept of their most
+        recent attempt, in one query (ROW_NUMBER windows per student and per
+        (student, concept)). These are the attempts the submit pipeline fed
+        the risk model for that student's latest score, so a re-score is
+        comparable with it. Shape as the risk feature extractor takes.
+
+        Returns:
+        {
+            user_id: [{"correct": bool}, ...]   # oldest attempt first
+        }
+        """
+
+        recent = {user_id: [] for user_id in user_ids}
+        if not recent:
+            return recent
+
+        ranked = (
+            select(
+                Attempt.user_id.label("user_id"),
+                Attempt.id.label("id"),
+                Attempt.is_correct.label("is_correct"),
+                Question.concept.label("concept"),
+                func.row_number().over(
+                    partition_by=Attempt.user_id,
+                    order_by=Attempt.id.desc()
+                ).label("rn_user"),
+                func.row_number().over(
+                    partition_by=(Attempt.user_id, Question.concept),
+                    order_by=Attempt.id.desc()
+                ).label("rn_concept")
+            )
+            .join(Question, Question.id == Attempt.question_id)
+            .where(Attempt.user_id.in_(list(recent)))
+            .subquery()
+        )
+
+        latest = (
+            select(ranked.c.user_id, ranked.c.concept)
+            .where(ranked.c.rn_user == 1)
+            .subquery()
+        )
+
+        rows = db.execute(
+            select(ranked.c.user_id, ranked.c.is_correct)
+            .join(latest, and_(
+                latest.c.user_id == ranked.c.user_id,
+                latest.c.concept == ranked.c.concept
+            ))
+            .where(ranked.c.rn_concept <= limit)
+            .order_by(ranked.c.user_id, ranked.c.id.asc())
+        ).all()
+
+        for user_id, is_correct in rows:
+            recent[user_id].append({"correct": bool(is_correct)})
+
+        return recent
+
+    @staticmethod
+    def load_attempt_history(db: Session, user_id: int) -> dict:
+        """
+        Load per-concept correctness sequences in a single joined query.
+
+        Returns:
+        {
+            concept: [bool, ...]   # oldest attempt first
+        }
+        """
+
+        rows = db.execute(StudentStateRepository.attempt_history_query(user_id))
+        return StudentStateRepository.group_attempt_history(rows)
+
+    @staticmethod
+    def attempt_history_query(user_id: int):
+        """(concept, is_correct) per attempt, oldest first; shared with the async repository"""
+        return (
+            select(Question.concept, Attempt.is_correct)
+            .join(Question, Question.id == Attempt.question_id)
+            .where(Attempt.user_id == user_id)
+            .order_by(Attempt.id.asc())
+        )
+
+    @staticmethod
+    def group_attempt_history(rows) -> dict:
+        grouped = {}
+        for concept, is_correct in rows:
+            grouped.setdefault(concept, []).append(bool(is_correct))
+        return grouped
+
+    @staticmethod
+    def risk_profile_from_row(row) -> dict:
+        return {
+            "risk_probability": row.risk_score,
+            "risk_label": row.risk_label,
+            "risk_level": "high" if row.risk_score > 0.6 else "medium" if row.risk_score > 0.3 else "low"
+        }
+
+
+class AsyncStudentStateRepository:
+    """AsyncSession counterpart of StudentStateRepository for async routes."""
+
+    @staticmethod
+    async def load_for_read(db: AsyncSession, user_id: int, cache) -> StudentState:
+        """
+        State for read routes on a read-replica session: a state in `cache`
+        (a StudentStateCache) is reused, but one loaded from the replica is
+        not cached, since it may lag the primary the cache is written from.
+        """
+        state = cache.get(user_id)
+        if state is None:
+            state = await AsyncStudentStateRepository.load(db, user_id)
+        return state
+
+    @staticmethod
+    async def load(db: AsyncSession, user_id: int) -> StudentState:
+        """
+        Hydrate a StudentState from the database.
+        Loads mastery, attempt history, and latest risk profile.
+        """
+
+        state = StudentState(student_id=user_id)
+
+        # Load mastery
+        mastery_rows = await db.execute(
+            select(Mastery.concept, Mastery.mastery_value, Mastery.confidence)
+            .where(Mastery.user_id == user_id)
+        )
+        for row in mastery_rows:
+            state.mastery_dict[row.concept] = row.mastery_value
+            state.confidence_metrics[row.concept] = row.confidence
+
+        # Load attempt history
+        state.attempt_history = await AsyncStudentStateRepository.load_attempt_history(db, user_id)
+
+        # Load latest risk profile
+        latest_risk = (await db.execute(
+            select(RiskHistory.risk_label, RiskHistory.risk_score)
+            .where(RiskHistory.student_id == str(user_id))
+            .order_by(RiskHistory.timestamp.desc())
+            .limit(1)
+        )).first()
+
+        if latest_risk:
+            state.risk_profile = StudentStateRepository.risk_profile_from_row(latest_risk)
+
+        return state
+
+    @staticmethod
+    async def load_attempt_history(db: AsyncSession, user_id: int) -> dict:
+        """
+        Per-concept correctness sequences, oldest attempt first.
+        """
+
+        rows = await db.execute(StudentStateRepository.attempt_history_query(user_id))
+        return StudentStateRepository.group_attempt_history(rows)
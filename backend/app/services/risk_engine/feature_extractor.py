@@ -11,8 +11,11 @@ class RiskFeatureExtractor:
         mastery_dict: dict,
         confidence_metrics: dict,
         attempt_history: list,
-        decay_deltas: dict
+        decay_deltas: dict,
+        graph=None
     ):
+        """graph: ConceptGraph to use instead of self.graph (a per-call snapshot)"""
+
         concepts = list(mastery_dict.keys())
         mastery_values = np.array(list(mastery_dict.values()), dtype=np.float32)
 
@@ -24,10 +27,9 @@ class RiskFeatureExtractor:
         mastery_variance = np.var(mastery_values)
         low_mastery_ratio = np.mean(mastery_values < 0.4)
 
-        depths = np.array(
-            [self.graph.compute_depth(c) for c in concepts],
-            dtype=np.float32
-        )
+        graph = (self.graph if graph is None else graph).compile()
+
+        depths = graph.depth_of(concepts).astype(np.float32)
 
         depth_sum = np.sum(depths) if np.sum(depths) > 0 else 1
         depth_weighted_mastery = np.sum(depths * mastery_values) / depth_sum
@@ -89,13 +91,10 @@ class RiskFeatureExtractor:
         # Layer 4: Graph Signals
         # -----------------------------
 
-        influence_scores = np.array(
-            [self.graph.influence_score(c) for c in concepts],
-            dtype=np.float32
-        )
+        influence_scores = graph.influence_of(concepts).astype(np.float32)
 
         avg_influence = np.mean(influence_scores)
-        graph_density = self.graph.density()
+        graph_density = graph.density
 
         high_influence_threshold = (
             np.percentile(influence_scores, 75)
@@ -143,6 +142,160 @@ class RiskFeatureExtractor:
             depth_weighted_weakness
         ], dtype=np.float32)
 
-        metadata = dict(zip(FEATURE_ORDER, feature_vector))
+        metadata = dict(zip(FEATURE_ORDER, feature_vector.tolist()))
+
+        return feature_vector, metadata
+
+    # --------------------------------------------------
+    # Batch Extraction (whole roster)
+    # --------------------------------------------------
+
+    def extract_batch(
+        self,
+        mastery_dicts: list,
+        confidence_metrics: list = None,
+        attempt_histories: list = None,
+        decay_deltas: list = None
+    ) -> np.ndarray:
+        """
+        Feature matrix (N x 17, FEATURE_ORDER columns) for N students.
+
+        Each argument is a list aligned by student, taking the same
+        per-student values as extract_features. All students' concepts are
+        flattened into one array with a segment id per student, so every
+        per-student reduction is a single bincount instead of a Python loop.
+        Students without mastery rows get zeros for the mastery/graph layers.
+        """
+
+        n = len(mastery_dicts)
+        confidence_metrics = confidence_metrics or [{}] * n
+        attempt_histories = attempt_histories or [[]] * n
+        decay_deltas = decay_deltas or [{}] * n
+
+        features = np.zeros((n, len(FEATURE_ORDER)), dtype=np.float64)
+        if n == 0:
+            return features.astype(np.float32)
+
+        column = {name: i for i, name in enumerate(FEATURE_ORDER)}
+
+        # -----------------------------
+        # Flatten (student, concept) pairs
+        # -----------------------------
+
+        counts = np.array([len(m) for m in mastery_dicts], dtype=np.int64)
+        seg = np.repeat(np.arange(n), counts)
+        concepts = [c for m in mastery_dicts for c in m]
+        values = np.fromiter(
+            (v for m in mastery_dicts for v in m.values()),
+            dtype=np.float32, count=len(concepts)
+        ).astype(np.float64)
+
+        graph = self.graph.compile()
+        depths = graph.depth_of(concepts).astype(np.float64)
+        influence = graph.influence_of(concepts).astype(np.float64)
+
+        def segment_sum(weights):
+            return np.bincount(seg, weights=weights, minlength=n)
+
+        def segment_mean(weights):
+            return np.divide(segment_sum(weights), counts, out=np.zeros(n), where=counts > 0)
+
+        low = (values < 0.4).astype(np.float64)
+
+        # -----------------------------
+        # Layer 1: Mastery Signals
+        # -----------------------------
+
+        avg_mastery = segment_mean(values)
+        features[:, column["avg_mastery"]] = avg_mastery
+        features[:, column["mastery_variance"]] = np.maximum(
+            segment_mean(values ** 2) - avg_mastery ** 2, 0.0
+        )
+        features[:, column["low_mastery_ratio"]] = segment_mean(low)
+
+        depth_sum = segment_sum(depths)
+        depth_sum[depth_sum <= 0] = 1
+        features[:, column["depth_weighted_mastery"]] = segment_sum(depths * values) / depth_sum
+
+        # -----------------------------
+        # Layer 2: Confidence Signals
+        # -----------------------------
+
+        for name in ("avg_confidence", "overconfidence_score"):
+            features[:, column[name]] = [m.get(name, 0.0) for m in confidence_metrics]
+        features[:, column["confidence_reliability"]] = [
+            m.get("reliability", 0.0) for m in confidence_metrics
+        ]
+
+        # -----------------------------
+        # Layer 3: Temporal Signals
+        # -----------------------------
+
+        recent = [history[-10:] if history else [] for history in attempt_histories]
+        attempt_counts = np.array([len(r) for r in recent], dtype=np.int64)
+
+        if attempt_counts.sum():
+            a_seg = np.repeat(np.arange(n), attempt_counts)
+            flat = [a for r in recent for a in r]
+            correct = np.array([a["correct"] for a in flat], dtype=np.float32).astype(np.float64)
+            times = np.array([a.get("time_taken", 0.0) for a in flat], dtype=np.float32).astype(np.float64)
+            retries = np.array([a.get("retry_count", 0) for a in flat], dtype=np.float32).astype(np.float64)
+
+            def attempt_mean(weights):
+                return np.divide(
+                    np.bincount(a_seg, weights=weights, minlength=n), attempt_counts,
+                    out=np.zeros(n), where=attempt_counts > 0
+                )
+
+            # Least-squares slope of correctness over attempt index (polyfit deg 1)
+            starts = np.concatenate(([0], np.cumsum(attempt_counts)[:-1]))
+            x = np.arange(len(flat)) - np.repeat(starts, attempt_counts)
+            x_centered = x - attempt_mean(x)[a_seg]
+            y_centered = correct - attempt_mean(correct)[a_seg]
+            sxy = np.bincount(a_seg, weights=x_centered * y_centered, minlength=n)
+            sxx = np.bincount(a_seg, weights=x_centered ** 2, minlength=n)
+
+            features[:, column["recent_accuracy_trend"]] = np.divide(
+                sxy, sxx, out=np.zeros(n), where=attempt_counts > 1
+            )
+            features[:, column["avg_time"]] = attempt_mean(times)
+            features[:, column["retry_rate"]] = attempt_mean((retries > 0).astype(np.float64))
+            features[:, column["avg_retry_count"]] = attempt_mean(retries)
+
+        features[:, column["decay_vulnerability"]] = [
+            np.mean(np.array(list(d.values()), dtype=np.float32)) if d else 0.0
+            for d in decay_deltas
+        ]
+
+        # -----------------------------
+        # Layer 4: Graph Signals
+        # -----------------------------
+
+        features[:, column["avg_influence"]] = segment_mean(influence)
+        features[:, column["graph_density"]] = graph.density
+
+        # Per-student 75th percentile of influence (numpy's linear method)
+        order = np.lexsort((influence, seg))
+        sorted_influence = influence[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        position = 0.75 * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        has_rows = counts > 0
+        threshold = np.zeros(n)
+        lo_values = sorted_influence[(starts + lower)[has_rows]]
+        hi_values = sorted_influence[(starts + upper)[has_rows]]
+        threshold[has_rows] = lo_values + (hi_values - lo_values) * (position - lower)[has_rows]
+
+        features[:, column["high_influence_low_mastery_count"]] = segment_sum(
+            ((influence >= threshold[seg]) & (values < 0.4)).astype(np.float64)
+        )
+
+        # -----------------------------
+        # Layer 5: Composite
+        # -----------------------------
+
+        features[:, column["bottleneck_risk_score"]] = segment_sum(influence * (1 - values))
+        features[:, column["depth_weighted_weakness"]] = segment_sum(depths * (1 - values))
 
-        return feature_vector, metadata
\ No newline at end of file
+        return features.astype(np.float32)
@@ -5,17 +5,26 @@ from sklearn.linear_model import LogisticRegression
 
 class ManualRetrainer:
 
-    def __init__(self, training_data_store: list, model_output_path: str):
+    def __init__(self, training_data_store, model_output_path: str):
+        """
+        training_data_store: a list of {"features", "label"} dicts, or any
+        durable store exposing load_all() (TrainingSampleSink, TrainingDataStore)
+        """
         self.training_data_store = training_data_store
         self.model_output_path = model_output_path
 
     def retrain(self):
 
-        if len(self.training_data_store) < 50:
+        if hasattr(self.training_data_store, "load_all"):
+            records = self.training_data_store.load_all()
+        else:
+            records = self.training_data_store
+
+        if len(records) < 50:
             raise ValueError("Not enough data to retrain.")
 
-        X = np.array([item["features"] for item in self.training_data_store])
-        y = np.array([item["label"] for item in self.training_data_store])
+        X = np.array([item["features"] for item in records])
+        y = np.array([item["label"] for item in records])
 
         model = LogisticRegression(
             class_weight="balanced",
@@ -28,6 +28,10 @@ class RiskPredictor:
                 f"Failed to load risk model from {model_path}: {e}"
             )
 
+        # Precomputed vectors for StandardScaler + LogisticRegression models,
+        # None for anything else (sklearn predict_proba is used instead)
+        self._linear = self._compile_linear(self.model)
+
     def predict(self, features: Dict[str, float]) -> Dict[str, Any]:
 
         missing = [f for f in FEATURE_ORDER if f not in features]
@@ -39,9 +43,7 @@ class RiskPredictor:
             dtype=np.float32
         )
 
-        probability = float(
-            self.model.predict_proba(feature_vector)[0][1]
-        )
+        probability = self._predict_proba(feature_vector)
 
         risk_level = self._risk_level(probability)
         confidence_score = abs(probability - 0.5) * 2
@@ -54,6 +56,114 @@ class RiskPredictor:
         "features": features,
         }
 
+    # --------------------------------------------------
+    # Batch Scoring
+    # --------------------------------------------------
+
+    def predict_proba_batch(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """
+        Risk probability per row of an (N x 17) matrix in FEATURE_ORDER.
+        One matrix-vector product on the fast path; a single sklearn
+        predict_proba call otherwise.
+        """
+
+        feature_matrix = np.asarray(feature_matrix, dtype=np.float32)
+        if feature_matrix.ndim != 2 or feature_matrix.shape[1] != len(FEATURE_ORDER):
+            raise ValueError(
+                f"Expected an (N x {len(FEATURE_ORDER)}) feature matrix, got {feature_matrix.shape}"
+            )
+
+        if feature_matrix.shape[0] == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        if self._linear is None:
+            return self.model.predict_proba(feature_matrix)[:, 1].astype(np.float64)
+
+        mean, scale, coef, intercept = self._linear
+        z = ((feature_matrix.astype(np.float64) - mean) / scale) @ coef + intercept
+        return self._sigmoid_array(z)
+
+    def predict_batch(self, feature_matrix: np.ndarray) -> list:
+        """predict() for every row of a feature matrix (without the echoed features)"""
+
+        probabilities = self.predict_proba_batch(feature_matrix)
+
+        return [
+            {
+                "risk_probability": float(probability),
+                "risk_level": self._risk_level(probability),
+                "confidence_score": abs(float(probability) - 0.5) * 2,
+            }
+            for probability in probabilities
+        ]
+
+    # --------------------------------------------------
+    # Fast Path
+    # --------------------------------------------------
+
+    @staticmethod
+    def _compile_linear(model):
+        """
+        Reduce a fitted [StandardScaler ->] binary LogisticRegression into
+        (mean, scale, coef, intercept) float64 vectors, or return None if the
+        model is any other type.
+        """
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.linear_model import LogisticRegression
+
+        steps = [step for _, step in model.steps] if isinstance(model, Pipeline) else [model]
+        steps = [step for step in steps if step is not None and step != "passthrough"]
+
+        if not steps or type(steps[-1]) is not LogisticRegression:
+            return None
+
+        classifier = steps[-1]
+        if classifier.coef_.shape[0] != 1 or len(classifier.classes_) != 2:
+            return None
+
+        n_features = classifier.coef_.shape[1]
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+
+        for step in steps[:-1]:
+            if type(step) is not StandardScaler:
+                return None
+            # Chained scalers: ((x - m1) / s1 - m2) / s2
+            step_mean = step.mean_ if step.with_mean else 0.0
+            step_scale = step.scale_ if step.with_std else 1.0
+            mean = mean + step_mean * scale
+            scale = scale * step_scale
+
+        return (
+            np.asarray(mean, dtype=np.float64),
+            np.asarray(scale, dtype=np.float64),
+            np.asarray(classifier.coef_[0], dtype=np.float64),
+            float(classifier.intercept_[0])
+        )
+
+    def _predict_proba(self, feature_vector: np.ndarray) -> float:
+        if self._linear is None:
+            return float(self.model.predict_proba(feature_vector)[0][1])
+
+        mean, scale, coef, intercept = self._linear
+        z = ((feature_vector[0].astype(np.float64) - mean) / scale) @ coef + intercept
+        return float(self._sigmoid(z))
+
+    @staticmethod
+    def _sigmoid(z):
+        # Overflow-safe logistic function
+        if z >= 0:
+            return 1.0 / (1.0 + np.exp(-z))
+        ez = np.exp(z)
+        return ez / (1.0 + ez)
+
+    @staticmethod
+    def _sigmoid_array(z: np.ndarray) -> np.ndarray:
+        # Same branches as _sigmoid, elementwise
+        ez = np.exp(-np.abs(z))
+        return np.where(z >= 0, 1.0 / (1.0 + ez), ez / (1.0 + ez))
+
     @staticmethod
     def _risk_level(probability: float) -> str:
         if probability < 0.3:
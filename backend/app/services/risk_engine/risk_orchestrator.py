@@ -5,4 +5,21 @@ class RiskOrchestrator:
 
     def compute_risk(self, student_state, concept_graph):
         features = self.feature_extractor.extract(student_state, concept_graph)
-        return self.predictor.predict(features)
\ No newline at end of file
+        return self.predictor.predict(features)
+
+    def compute_risk_batch(self, student_states: list, attempt_histories: list = None) -> list:
+        """
+        Score a roster in one pass: one (N x 17) feature matrix and one
+        vectorized prediction instead of N pipeline runs.
+
+        attempt_histories is aligned with student_states, each a list of
+        {"correct", "time_taken", "retry_count"} dicts (oldest first).
+        Returns predictor results in the same order.
+        """
+        feature_matrix = self.feature_extractor.extract_batch(
+            mastery_dicts=[state.mastery_dict for state in student_states],
+            confidence_metrics=[state.confidence_metrics for state in student_states],
+            attempt_histories=attempt_histories,
+            decay_deltas=[state.compute_decay_deltas() for state in student_states]
+        )
+        return self.predictor.predict_batch(feature_matrix)
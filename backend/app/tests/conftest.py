@@ -0,0 +1,36 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# The route modules create their engines at import time
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.db.base import Base
+
+# Register every table on Base.metadata
+from app.models import (  # noqa: F401
+    attempt, classroom, classroom_student, concept_graph_version, mastery,
+    mastery_history, question, quiz, risk_history, training_data, user
+)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
@@ -0,0 +1,279 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.classroom_student import ClassroomStudent
+from app.models.mastery import Mastery
+from app.models.mastery_history import MasteryHistory
+from app.services.analytics.class_analytics_refresher import ClassAnalyticsRefresher
+from app.services.analytics.class_mastery_aggregate import ClassMasteryAggregate
+from app.services.analytics.insight_generator import InsightGenerator
+from app.services.core.analytics_worker import AnalyticsWorker
+
+
+def _wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+# --------------------------------------------------
+# Analytics Worker
+# --------------------------------------------------
+
+def test_submissions_in_one_window_refresh_each_classroom_once(session_factory, db):
+    # Student 1 is in classrooms 10 and 11, student 2 only in 10
+    db.add_all([
+        ClassroomStudent(classroom_id=10, student_id=1),
+        ClassroomStudent(classroom_id=11, student_id=1),
+        ClassroomStudent(classroom_id=10, student_id=2),
+    ])
+    db.commit()
+
+    refresher = ClassAnalyticsRefresher(
+        ClassMasteryAggregate(),
+        coalesce_seconds=0.3,
+        session_factory=session_factory
+    )
+
+    calls = []
+    lock = threading.Lock()
+
+    def counting_refresh(classroom_id, items):
+        with lock:
+            calls.append((classroom_id, list(items)))
+        return refresher.refresh(classroom_id, items)
+
+    refresher.worker.handler = counting_refresh
+
+    try:
+        for user_id, concept in [(1, "a"), (2, "b"), (1, "c"), (2, "a"), (1, "b")]:
+            refresher.submission_committed(db, user_id, {concept: 0.5})
+
+        _wait_for(lambda: refresher.worker.stats()["completed"] == 2)
+        time.sleep(0.5)     # nothing else is scheduled after the window
+
+        assert sorted(classroom_id for classroom_id, _ in calls) == [10, 11]
+        items = dict(calls)
+        assert sorted(item["user_id"] for item in items[10]) == [1, 1, 1, 2, 2]
+        assert sorted(item["user_id"] for item in items[11]) == [1, 1, 1]
+
+        stats = refresher.worker.stats()
+        assert stats == {"pending": 0, "running": 0, "submitted": 8, "completed": 2, "failed": 0}
+        assert refresher.latest(10)["changed_concepts"] == ["a", "b", "c"]
+        assert refresher.latest(11)["changed_concepts"] == ["a", "b", "c"]
+    finally:
+        refresher.close()
+
+
+def test_failing_job_is_counted_and_worker_keeps_running():
+    handled = []
+
+    def handler(key, items):
+        if key == "bad":
+            raise RuntimeError("boom")
+        handled.append((key, items))
+
+    worker = AnalyticsWorker(handler, coalesce_seconds=0.05)
+    try:
+        worker.submit("bad", 1)
+        worker.submit("good", 1)
+        _wait_for(lambda: worker.stats()["completed"] + worker.stats()["failed"] == 2)
+
+        worker.submit("good", 2)
+        _wait_for(lambda: worker.stats()["completed"] == 2)
+
+        assert worker.stats()["failed"] == 1
+        assert handled == [("good", [1]), ("good", [2])]
+    finally:
+        worker.close()
+
+
+def test_closed_worker_drops_pending_and_ignores_submits():
+    handled = []
+    worker = AnalyticsWorker(lambda key, items: handled.append(key), coalesce_seconds=10)
+
+    worker.submit("a")
+    worker.close()
+    worker.submit("b")
+
+    assert worker.stats()["pending"] == 0
+    assert worker.stats()["submitted"] == 1
+    assert handled == []
+
+
+# --------------------------------------------------
+# Class Mastery Aggregate
+# --------------------------------------------------
+
+def _write_mastery(session_factory, rows):
+    """rows: {(user_id, concept): value}, upserted and committed"""
+    session = session_factory()
+    for (user_id, concept), value in rows.items():
+        row = session.query(Mastery).filter_by(user_id=user_id, concept=concept).first()
+        if row is None:
+            session.add(Mastery(user_id=user_id, concept=concept, mastery_value=value, confidence=0.5))
+        else:
+            row.mastery_value = value
+    session.commit()
+    session.close()
+
+
+def _seeded(session_factory, threshold=0.4):
+    aggregate = ClassMasteryAggregate(threshold=threshold)
+    session = session_factory()
+    aggregate.ensure_loaded(session)
+    session.close()
+    return aggregate
+
+
+def _assert_same(aggregate, expected):
+    assert aggregate.concept_averages() == pytest.approx(expected.concept_averages())
+    risk, expected_risk = aggregate.class_risk(), expected.class_risk()
+    assert risk["student_risk_map"] == pytest.approx(expected_risk["student_risk_map"])
+    assert sorted(risk["high_risk_students"]) == sorted(expected_risk["high_risk_students"])
+    assert aggregate.risk_summary() == pytest.approx(expected.risk_summary())
+
+
+class _QueryHook:
+    """Session proxy that runs `during` after the seed query read its rows"""
+
+    def __init__(self, session, during):
+        self.session = session
+        self.during = during
+
+    def query(self, *columns):
+        query = self.session.query(*columns)
+        hook = self
+
+        class _Query:
+            def all(self):
+                rows = query.all()
+                hook.during()
+                return rows
+
+        return _Query()
+
+
+def test_incremental_applies_match_seed(session_factory):
+    rng = random.Random(4)
+    _write_mastery(session_factory, {
+        (user_id, f"c{k}"): rng.random() for user_id in range(1, 6) for k in range(4)
+    })
+
+    aggregate = _seeded(session_factory)
+
+    for _ in range(200):
+        changes = {f"c{rng.randint(0, 5)}": rng.choice([0.0, 1.0, rng.random()])}
+        user_id = rng.randint(1, 8)
+        _write_mastery(session_factory, {(user_id, c): v for c, v in changes.items()})
+        aggregate.apply(user_id, changes)
+
+    _assert_same(aggregate, _seeded(session_factory))
+
+
+def test_applies_during_reseed_are_replayed(session_factory):
+    _write_mastery(session_factory, {(1, "a"): 0.2, (1, "b"): 0.9, (2, "a"): 0.6})
+    aggregate = _seeded(session_factory)
+
+    # Fresh: a write from another worker is not picked up yet
+    _write_mastery(session_factory, {(3, "b"): 0.1})
+    session = session_factory()
+    aggregate.ensure_loaded(session)
+    assert aggregate.student_risk(3) is None
+
+    def submits_after_the_query():
+        # Committed after the seed read its rows, so only the journal has them
+        def submit(user_id, changes):
+            _write_mastery(session_factory, {(user_id, c): v for c, v in changes.items()})
+            aggregate.apply(user_id, changes)
+
+        thread = threading.Thread(target=lambda: [
+            submit(1, {"a": 0.8}),
+            submit(2, {"c": 0.05}),
+            submit(4, {"a": 0.3, "b": 0.35}),
+        ])
+        thread.start()
+        thread.join()
+
+    # refresh_seconds (300 s) later
+    aggregate._loaded_at -= aggregate.refresh_seconds
+    aggregate.ensure_loaded(_QueryHook(session, submits_after_the_query))
+    session.close()
+
+    assert aggregate.student_risk(3) == pytest.approx(0.9)
+    assert aggregate.student_risk(1) == pytest.approx(1 - (0.8 + 0.9) / 2)
+    assert aggregate._pending is None
+    _assert_same(aggregate, _seeded(session_factory))
+
+
+def test_failed_reseed_keeps_serving_and_stops_journaling(session_factory):
+    _write_mastery(session_factory, {(1, "a"): 0.5})
+    aggregate = _seeded(session_factory)
+    aggregate.invalidate()
+
+    def fail():
+        raise RuntimeError("database went away")
+
+    session = session_factory()
+    with pytest.raises(RuntimeError):
+        aggregate.ensure_loaded(_QueryHook(session, fail))
+    session.close()
+
+    assert aggregate._pending is None
+    aggregate.apply(1, {"a": 0.7})
+    assert aggregate.concept_averages() == {"a": pytest.approx(0.7)}
+
+
+# --------------------------------------------------
+# Insights
+# --------------------------------------------------
+
+def test_concept_dynamics_matches_per_concept_helpers(db):
+    rng = random.Random(5)
+    start = datetime(2024, 1, 1)
+
+    # Interleaved history of several students; timestamps are distinct
+    # because the per-concept helpers order by timestamp only
+    points = [
+        (user_id, f"c{k}")
+        for user_id in (1, 2, 3)
+        for k in range(8)
+        for _ in range(rng.choice([0, 1, 2, 3, rng.randint(4, 25)]))
+    ]
+    rng.shuffle(points)
+    db.add_all([
+        MasteryHistory(
+            user_id=user_id,
+            concept=concept,
+            mastery_value=rng.choice([0.0, 1.0, round(rng.random(), 3)]),
+            confidence=0.5,
+            timestamp=start + timedelta(minutes=rng.randint(0, 100000), seconds=k)
+        )
+        for k, (user_id, concept) in enumerate(points)
+    ])
+    db.commit()
+
+    concepts = [f"c{k}" for k in range(8)] + ["never_attempted"]
+
+    for user_id in (1, 2, 3):
+        for window in (1, 2, 3, 10):
+            dynamics = InsightGenerator.concept_dynamics(db, user_id, concepts, window=window)
+
+            assert sorted(dynamics) == sorted(concepts)
+            for concept in concepts:
+                assert dynamics[concept] == {
+                    "volatility": InsightGenerator.volatility_score(db, user_id, concept, window),
+                    "learning_trend": InsightGenerator.learning_trend(db, user_id, concept, window)
+                }, (user_id, concept, window)
+
+    # Without a concept list: every concept with history, same values
+    assert InsightGenerator.concept_dynamics(db, 1) == {
+        concept: values
+        for concept, values in InsightGenerator.concept_dynamics(db, 1, concepts).items()
+        if db.query(MasteryHistory).filter_by(user_id=1, concept=concept).count()
+    }
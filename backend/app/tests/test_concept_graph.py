@@ -0,0 +1,367 @@
+from collections import deque
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.user import User, RoleEnum
+from app.models.classroom import Classroom
+from app.models.concept_graph_version import ConceptGraphVersion
+from app.schemas.classroom_schema import ConceptGraphUpload
+from app.core.service_container import get_service_container
+from app.services.cognitive_engine.concept_graph import ConceptGraph
+from app.services.cognitive_engine.compiled_graph import GraphCycleError
+from app.services.persistence.concept_graph_repository import ConceptGraphRepository
+from app.services.core.concept_graph_store import ConceptGraphStore, DEFAULT_SCOPE, classroom_scope, subject_scope
+from app.api import teacher_routes
+
+
+def _publish(session_factory, scope, edges):
+    session = session_factory()
+    row = ConceptGraphRepository.save_version(session, scope, ConceptGraph.from_edges(edges))
+    session.commit()
+    version = row.version
+    session.close()
+    return version
+
+
+# --------------------------------------------------
+# Compiled Graph
+# --------------------------------------------------
+
+def _reference_downstream(graph, concept):
+    """The original dict-based breadth-first downstream walk"""
+    visited = set()
+    queue = deque([concept])
+    while queue:
+        node = queue.popleft()
+        for child, _ in graph.children.get(node, []):
+            if child not in visited:
+                visited.add(child)
+                queue.append(child)
+    return visited
+
+
+def _reference_depth(graph, concept, memo=None):
+    """Longest prerequisite chain over the dict adjacency (memoized DFS)"""
+    memo = {} if memo is None else memo
+    if concept not in memo:
+        parents = graph.parents.get(concept, [])
+        memo[concept] = 1 + max(_reference_depth(graph, p, memo) for p, _ in parents) if parents else 0
+    return memo[concept]
+
+
+FIXED_DAGS = {
+    "chain": [("a", "b"), ("b", "c"), ("c", "d")],
+    "diamond": [("a", "b", 0.2), ("a", "c", 0.9), ("b", "d"), ("c", "d"), ("d", "e")],
+    "transitive_and_duplicate": [("a", "b"), ("b", "c"), ("a", "c"), ("a", "c", 0.1)],
+    "forest": [("r1", "x"), ("r1", "y"), ("r2", "y"), ("y", "z")],
+    # m is reached through x first; the path through m2 is the longer one
+    "converging": [("r", "m"), ("m", "x"), ("m", "m2"), ("m2", "c"), ("x", "d"), ("c", "d")],
+}
+
+
+@pytest.mark.parametrize("name", sorted(FIXED_DAGS))
+def test_compiled_graph_matches_dict_walks(name):
+    graph = ConceptGraph.from_edges(FIXED_DAGS[name], concepts=["isolated"])
+    compiled = graph.compile()
+
+    assert compiled.n_edges == graph.total_edges() == len(FIXED_DAGS[name])
+    assert compiled.density == graph.density()
+
+    for concept in graph.nodes:
+        downstream = _reference_downstream(graph, concept)
+        assert compiled.downstream(concept) == downstream
+        assert graph.influence_score(concept) == len(downstream)
+        assert graph.compute_depth(concept) == _reference_depth(graph, concept)
+
+        i = compiled.index[concept]
+        children, weights = compiled.children_of(i)
+        assert sorted(zip((compiled.concepts[c] for c in children), weights)) == sorted(graph.children.get(concept, []))
+        parents, weights = compiled.parents_of(i)
+        assert sorted(zip((compiled.concepts[p] for p in parents), weights)) == sorted(graph.parents.get(concept, []))
+
+    order = graph.topological_sort()
+    assert sorted(order) == sorted(graph.nodes)
+    position = {concept: k for k, concept in enumerate(order)}
+    assert all(position[parent] < position[child] for parent, child, _ in graph.edges())
+
+
+def test_compiled_graph_fixed_values():
+    graph = ConceptGraph.from_edges(FIXED_DAGS["converging"])
+
+    # The old DFS shared one visited set across branches and gave d a depth of 3
+    assert {c: graph.compute_depth(c) for c in sorted(graph.nodes)} == \
+        {"c": 3, "d": 4, "m": 1, "m2": 2, "r": 0, "x": 2}
+    assert {c: graph.influence_score(c) for c in sorted(graph.nodes)} == \
+        {"c": 1, "d": 0, "m": 4, "m2": 2, "r": 5, "x": 1}
+    assert graph.max_depth() == 4
+    assert graph.average_influence() == 13 / 6
+
+
+def test_compiled_graph_lookups_and_freezing():
+    graph = ConceptGraph.from_edges(FIXED_DAGS["diamond"])
+    compiled = graph.compile()
+
+    assert compiled.ids(["a", "missing", "e"]).tolist() == [compiled.index["a"], -1, compiled.index["e"]]
+    assert compiled.depth_of(["e", "missing"]).tolist() == [3, 0]
+    assert compiled.influence_of(["a", "missing"]).tolist() == [4, 0]
+    assert compiled.downstream("missing") == set()
+
+    with pytest.raises(ValueError):
+        compiled.depth[0] = 7
+
+    # Cached until the graph changes
+    assert graph.compile() is compiled
+    graph.add_prerequisite("e", "f")
+    assert graph.compile() is not compiled
+    assert graph.compute_depth("f") == 4
+
+    empty = ConceptGraph().compile()
+    assert len(empty) == 0
+    assert empty.depth_of(["a"]).tolist() == [0]
+    assert ConceptGraph().max_depth() == 0
+
+
+# --------------------------------------------------
+# Cycle Detection
+# --------------------------------------------------
+
+def test_self_loop_is_a_cycle():
+    with pytest.raises(GraphCycleError) as error:
+        ConceptGraph.from_edges([("a", "b"), ("x", "x")])
+    assert error.value.cycles == [["x"]]
+
+    graph = ConceptGraph.from_edges([("a", "b")])
+    with pytest.raises(ValueError):
+        graph.add_prerequisite("b", "b")
+    assert graph.total_edges() == 1
+
+
+def test_disjoint_cycles_reported_once_each():
+    edges = [
+        ("p", "q"), ("q", "r"), ("r", "p"),     # three-node cycle
+        ("r", "tail"), ("tail", "end"),         # downstream of it, not part of it
+        ("a", "b"), ("b", "a"), ("a", "c"), ("c", "a"),    # one component, two loops
+        ("ok1", "ok2"),
+    ]
+
+    with pytest.raises(GraphCycleError) as error:
+        ConceptGraph.from_edges(edges)
+
+    cycles = error.value.cycles
+    assert [sorted(cycle) for cycle in cycles] == [["a", "b"], ["p", "q", "r"]]
+    assert cycles == sorted(cycles)
+
+    # Each cycle is in edge order, closing back on its first concept
+    edge_set = {(parent, child) for parent, child in edges}
+    for cycle in cycles:
+        assert all((cycle[i], cycle[(i + 1) % len(cycle)]) in edge_set for i in range(len(cycle)))
+
+
+def test_add_prerequisite_cycle_direction():
+    graph = ConceptGraph.from_edges([("a", "b"), ("b", "c")])
+
+    # A transitive shortcut is not a cycle
+    graph.add_prerequisite("a", "c", 0.9)
+    assert ("a", "c", 0.9) in graph.edges()
+    assert graph.compute_depth("c") == 2
+
+    for parent, child in [("c", "a"), ("c", "b"), ("b", "a")]:
+        with pytest.raises(ValueError):
+            graph.add_prerequisite(parent, child)
+
+    assert graph.total_edges() == 3
+    assert graph.topological_sort() == ["a", "b", "c"]
+
+
+# --------------------------------------------------
+# Repository
+# --------------------------------------------------
+
+def test_repository_versions_each_scope_separately(session_factory, db):
+    assert _publish(session_factory, "global", [("a", "b", 0.3)]) == 1
+    assert _publish(session_factory, "global", [("a", "b", 0.3), ("b", "c")]) == 2
+    assert _publish(session_factory, classroom_scope(7), [("x", "y")]) == 1
+
+    assert ConceptGraphRepository.latest_versions(db) == {"global": 2, "classroom:7": 1}
+    assert ConceptGraphRepository.latest_versions(db, ["global", "missing"]) == {"global": 2}
+
+    first = ConceptGraphRepository.to_graph(ConceptGraphRepository.load(db, "global", 1))
+    latest = ConceptGraphRepository.to_graph(ConceptGraphRepository.load(db, "global"))
+    assert first.edges() == [("a", "b", 0.3)]
+    assert sorted(latest.edges()) == [("a", "b", 0.3), ("b", "c", 0.5)]
+    assert ConceptGraphRepository.load(db, "missing") is None
+
+
+def test_repository_rejects_duplicate_version(session_factory, db, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+
+    _publish(session_factory, "global", [("a", "b")])
+    monkeypatch.setattr(ConceptGraphRepository, "latest_versions", staticmethod(lambda db, scopes=None: {}))
+
+    with pytest.raises(IntegrityError):
+        ConceptGraphRepository.save_version(db, "global", ConceptGraph.from_edges([("a", "c")]))
+
+
+# --------------------------------------------------
+# Store
+# --------------------------------------------------
+
+class _CountingSessions:
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        return self.session_factory()
+
+
+def test_store_serves_cached_graph_without_queries(session_factory):
+    _publish(session_factory, "global", [("a", "b")])
+    sessions = _CountingSessions(session_factory)
+    store = ConceptGraphStore(session_factory=sessions, check_seconds=0)
+
+    graph = store.get()
+    assert sorted(graph.nodes) == ["a", "b"]
+    assert store.version() == 1
+
+    opened = sessions.opened
+    for _ in range(10):
+        assert store.get() is graph
+    assert sessions.opened == opened
+
+    # Unpublished scopes resolve to an empty graph
+    assert not store.get("classroom:1").nodes
+    assert store.version("classroom:1") is None
+
+
+def test_store_check_versions_picks_up_new_versions(session_factory):
+    _publish(session_factory, "global", [("a", "b")])
+    store = ConceptGraphStore(session_factory=session_factory, check_seconds=0)
+    old = store.get()
+    store.get(classroom_scope(1))
+
+    assert store.check_versions() == []
+    assert store.get() is old
+
+    _publish(session_factory, "global", [("a", "b"), ("b", "c")])
+    _publish(session_factory, classroom_scope(1), [("x", "y")])
+
+    # Not re-read until the next check
+    assert store.get() is old
+
+    assert sorted(store.check_versions()) == ["classroom:1", "global"]
+    assert sorted(store.get().nodes) == ["a", "b", "c"]
+    assert store.versions() == {"global": 2, "classroom:1": 1}
+
+
+def test_store_resolves_most_specific_scope(session_factory, db):
+    teacher = User(email="t@example.com", password_hash="x", role=RoleEnum.teacher)
+    db.add(teacher)
+    db.flush()
+    classroom = Classroom(name="c", subject="Math ", teacher_id=teacher.id)
+    db.add(classroom)
+    db.commit()
+
+    store = ConceptGraphStore(session_factory=session_factory, check_seconds=0)
+    assert store.resolve_scope(db, classroom) == DEFAULT_SCOPE
+
+    _publish(session_factory, subject_scope("math"), [("a", "b")])
+    assert store.resolve_scope(db, classroom) == "subject:math"
+
+    _publish(session_factory, classroom_scope(classroom.id), [("c", "d")])
+    assert store.resolve_scope(db, classroom) == classroom_scope(classroom.id)
+    assert sorted(store.for_classroom(db, classroom).nodes) == ["c", "d"]
+
+
+def test_store_background_thread_stops_on_close(session_factory):
+    store = ConceptGraphStore(session_factory=session_factory, check_seconds=0.01)
+    store.get()
+    assert store._thread.is_alive()
+
+    store.close()
+    assert not store._thread.is_alive()
+
+
+# --------------------------------------------------
+# Routes
+# --------------------------------------------------
+
+@pytest.fixture
+def classroom_setup(session_factory, db, monkeypatch):
+    teacher = User(email="t@example.com", password_hash="x", role=RoleEnum.teacher)
+    other = User(email="o@example.com", password_hash="x", role=RoleEnum.teacher)
+    db.add_all([teacher, other])
+    db.flush()
+    classroom = Classroom(name="c", subject="math", teacher_id=teacher.id)
+    db.add(classroom)
+    db.commit()
+
+    store = ConceptGraphStore(session_factory=session_factory, check_seconds=0)
+    monkeypatch.setattr(get_service_container(), "_graph_store", store)
+
+    return teacher, other, classroom, store
+
+
+def test_publish_route_versions_and_reloads(db, classroom_setup):
+    teacher, _, classroom, store = classroom_setup
+    upload = ConceptGraphUpload(edges=[["a", "b", 0.7], ["b", "c"]], concepts=["d"])
+
+    first = teacher_routes.publish_classroom_concept_graph(classroom.id, upload, db, teacher)
+    second = teacher_routes.publish_classroom_concept_graph(classroom.id, upload, db, teacher)
+
+    assert (first["version"], second["version"]) == (1, 2)
+    assert first["concepts"] == 4 and first["edges"] == 2
+    assert store.version(classroom_scope(classroom.id)) == 2
+
+    current = teacher_routes.get_classroom_concept_graph(classroom.id, db, teacher)
+    assert current["scope"] == classroom_scope(classroom.id)
+    assert current["version"] == 2
+    assert current["edges"] == [("a", "b", 0.7), ("b", "c", 0.5)]
+
+
+def test_publish_route_rejects_cycles_and_strangers(db, classroom_setup):
+    teacher, other, classroom, _ = classroom_setup
+
+    with pytest.raises(HTTPException) as cycle:
+        teacher_routes.publish_classroom_concept_graph(
+            classroom.id, ConceptGraphUpload(edges=[["a", "b"], ["b", "a"]]), db, teacher
+        )
+    assert cycle.value.status_code == 400
+    assert cycle.value.detail["cycles"] == [["a", "b"]]
+
+    with pytest.raises(HTTPException) as forbidden:
+        teacher_routes.publish_classroom_concept_graph(
+            classroom.id, ConceptGraphUpload(edges=[["a", "b"]]), db, other
+        )
+    assert forbidden.value.status_code == 403
+
+    assert db.query(ConceptGraphVersion).count() == 0
+
+
+def test_publish_route_retries_version_conflicts(session_factory, db, classroom_setup, monkeypatch):
+    teacher, _, classroom, _ = classroom_setup
+    scope = classroom_scope(classroom.id)
+    _publish(session_factory, scope, [("a", "b")])
+
+    latest_versions = ConceptGraphRepository.latest_versions
+    stale = {"calls": 1}
+
+    def racing_latest_versions(db, scopes=None):
+        # The first read misses a concurrent publish
+        if stale["calls"]:
+            stale["calls"] -= 1
+            return {}
+        return latest_versions(db, scopes)
+
+    monkeypatch.setattr(ConceptGraphRepository, "latest_versions", staticmethod(racing_latest_versions))
+    upload = ConceptGraphUpload(edges=[["a", "c"]])
+
+    result = teacher_routes.publish_classroom_concept_graph(classroom.id, upload, db, teacher)
+    assert result["version"] == 2
+
+    stale["calls"] = 100
+    with pytest.raises(HTTPException) as conflict:
+        teacher_routes.publish_classroom_concept_graph(classroom.id, upload, db, teacher)
+    assert conflict.value.status_code == 409
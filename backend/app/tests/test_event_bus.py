@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+from app.services.core.event_bus import EventBus, classroom_topic
+
+
+def _analytics(heatmap, changed, insights=None, risk=0.3):
+    return {
+        "type": "class_analytics",
+        "classroom_id": 1,
+        "class_average_risk": risk,
+        "high_risk_students": [],
+        "heatmap": heatmap,
+        "changed_concepts": changed,
+        "student_insights": insights or {}
+    }
+
+
+# --------------------------------------------------
+# Delta Merging
+# --------------------------------------------------
+
+def test_merge_deltas_keeps_latest_mastery_and_risk():
+    delta = EventBus.merge_deltas([
+        {"type": "mastery_delta", "student_id": 1, "mastery": {"a": 0.2, "b": 0.4}, "risk": 0.6},
+        {"type": "mastery_delta", "student_id": 2, "mastery": {"a": 0.9}, "risk": None},
+        {"type": "risk_scores", "risk": {2: 0.1, 3: 0.8}},
+        {"type": "mastery_delta", "student_id": 1, "mastery": {"a": 0.3}, "risk": 0.5},
+        {"type": "unknown"},
+    ])
+
+    assert delta == {
+        "mastery": {1: {"a": 0.3, "b": 0.4}, 2: {"a": 0.9}},
+        "risk": {1: 0.5, 2: 0.1, 3: 0.8}
+    }
+
+
+def test_merge_deltas_merges_heatmaps_across_analytics_events():
+    first = _analytics({"a": 0.5, "b": 0.4}, ["a", "b"], {1: {"weak_topics": ["b"]}}, risk=0.3)
+    second = _analytics({"b": 0.6, "c": 0.7}, ["b", "c"], {2: {"weak_topics": []}}, risk=0.2)
+    third = _analytics({"a": 0.55}, ["a"], {1: {"weak_topics": []}}, risk=0.25)
+
+    analytics = EventBus.merge_deltas([first, second, third])["analytics"]
+
+    assert analytics["heatmap"] == {"a": 0.55, "b": 0.6, "c": 0.7}
+    assert analytics["changed_concepts"] == ["a", "b", "c"]
+    assert analytics["student_insights"] == {1: {"weak_topics": []}, 2: {"weak_topics": []}}
+    assert analytics["class_average_risk"] == 0.25
+
+    # Events are shared between subscribers and must not change
+    assert first["heatmap"] == {"a": 0.5, "b": 0.4}
+    assert third["changed_concepts"] == ["a"]
+
+
+def test_merge_deltas_without_analytics():
+    assert EventBus.merge_deltas([]) == {"mastery": {}, "risk": {}}
+
+
+# --------------------------------------------------
+# Subscriptions
+# --------------------------------------------------
+
+def test_slow_subscriber_drops_oldest_events():
+    topic = classroom_topic("drop-test")
+
+    async def run():
+        subscription = EventBus.subscribe(topic, max_queue=3)
+        try:
+            # Published from another thread, like the analytics worker
+            publisher = threading.Thread(
+                target=lambda: [EventBus.publish(topic, {"n": n}) for n in range(7)]
+            )
+            publisher.start()
+            publisher.join()
+
+            for _ in range(20):
+                await asyncio.sleep(0)
+
+            received = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+            return received, subscription.dropped
+        finally:
+            EventBus.unsubscribe(subscription)
+
+    received, dropped = asyncio.run(run())
+
+    assert received == [{"n": 4}, {"n": 5}, {"n": 6}]
+    assert dropped == 4
+    assert EventBus.subscriber_count(topic) == 0
+
+
+def test_batches_gather_events_within_the_window():
+    topic = classroom_topic("batch-test")
+
+    async def run():
+        subscription = EventBus.subscribe(topic)
+        try:
+            for n in range(5):
+                EventBus.publish(topic, {"n": n})
+            batches = subscription.batches(window=0.05, max_events=3, idle_timeout=0.05)
+            return [await batches.__anext__() for _ in range(3)]
+        finally:
+            EventBus.unsubscribe(subscription)
+
+    first, second, idle = asyncio.run(run())
+
+    assert [e["n"] for e in first] == [0, 1, 2]
+    assert [e["n"] for e in second] == [3, 4]
+    assert idle == []
@@ -0,0 +1,203 @@
+import random
+from collections import deque
+
+import numpy as np
+
+from app.services.cognitive_engine.concept_graph import ConceptGraph
+from app.services.cognitive_engine.mastery_update import MasteryUpdater, BKTParameters
+from app.services.cognitive_engine.dependency_propagation import DependencyPropagator
+
+
+def _reference_propagate(graph, mastery_dict, updated_concept, alpha=0.08, decay_factor=0.7, max_depth=5):
+    """The original one-edge-at-a-time breadth-first propagation"""
+
+    if updated_concept not in mastery_dict:
+        return mastery_dict
+
+    queue = deque([(updated_concept, 0)])
+    visited = set([updated_concept])
+
+    while queue:
+        current_concept, level = queue.popleft()
+
+        if level >= max_depth:
+            continue
+
+        parent_mastery = mastery_dict.get(current_concept, 0.0)
+
+        for child, weight in graph.children.get(current_concept, []):
+
+            if child not in mastery_dict:
+                mastery_dict[child] = 0.0
+
+            child_mastery = mastery_dict[child]
+            influence_strength = alpha * (decay_factor ** level) * weight
+            adjustment = influence_strength * (parent_mastery - child_mastery)
+            new_mastery = child_mastery + adjustment
+            mastery_dict[child] = min(max(new_mastery, 0.0), 1.0)
+
+            if child not in visited:
+                visited.add(child)
+                queue.append((child, level + 1))
+
+    return mastery_dict
+
+
+def _random_graph(rng, n_concepts):
+    """Random DAG with converging paths, transitive and duplicate edges"""
+    concepts = [f"c{i}" for i in range(n_concepts)]
+    edges = []
+    for _ in range(rng.randint(n_concepts, 3 * n_concepts)):
+        a, b = sorted(rng.sample(range(n_concepts), 2))
+        edges.append((concepts[a], concepts[b], rng.uniform(0.05, 3.0)))
+    edges += rng.sample(edges, min(3, len(edges)))
+    return ConceptGraph.from_edges(edges, concepts=concepts), concepts
+
+
+def _random_mastery(rng, concepts):
+    # Some concepts missing (created by propagation); extremes exercise the clamp
+    return {
+        c: rng.choice([0.0, 1.0, rng.random()])
+        for c in concepts if rng.random() < 0.7
+    }
+
+
+def test_propagate_matches_reference_bfs():
+    rng = random.Random(0)
+
+    for _ in range(300):
+        graph, concepts = _random_graph(rng, rng.randint(2, 30))
+        propagator = DependencyPropagator(graph)
+
+        for _ in range(5):
+            mastery = _random_mastery(rng, concepts)
+            updated = rng.choice(concepts)
+            params = dict(
+                alpha=rng.choice([0.08, rng.uniform(0.01, 0.9)]),
+                decay_factor=rng.choice([0.7, rng.uniform(0.1, 1.0)]),
+                max_depth=rng.randint(0, 8)
+            )
+
+            expected = _reference_propagate(graph, dict(mastery), updated, **params)
+            result = propagator.propagate(dict(mastery), updated, **params)
+
+            assert result == expected
+
+
+def test_propagate_many_matches_single_student():
+    rng = random.Random(1)
+    graph, concepts = _random_graph(rng, 40)
+    propagator = DependencyPropagator(graph)
+
+    students = [_random_mastery(rng, concepts) for _ in range(60)]
+    updated = [rng.choice(concepts + ["not_in_graph"]) for _ in students]
+
+    expected = [
+        _reference_propagate(graph, dict(mastery), concept)
+        for mastery, concept in zip(students, updated)
+    ]
+    result = propagator.propagate_many([dict(m) for m in students], updated)
+
+    assert result == expected
+
+
+def test_batched_propagation_uses_the_graph_snapshot():
+    rng = random.Random(7)
+    engine_graph, _ = _random_graph(rng, 10)
+    snapshot, concepts = _random_graph(rng, 25)
+    propagator = DependencyPropagator(engine_graph)
+
+    students = [_random_mastery(rng, concepts) for _ in range(30)]
+    updated = [rng.choice(concepts) for _ in students]
+
+    expected = [
+        _reference_propagate(snapshot, dict(mastery), concept)
+        for mastery, concept in zip(students, updated)
+    ]
+
+    result = propagator.propagate_many([dict(m) for m in students], updated, graph=snapshot)
+    assert result == expected
+
+    compiled = snapshot.compile()
+    matrix = np.array([[m.get(c, 0.0) for c in compiled.concepts] for m in students])
+    starts = np.array([compiled.index[c] if c in m else -1 for m, c in zip(students, updated)])
+    written = propagator.propagate_matrix(matrix, starts, graph=snapshot)
+
+    for row, (mastery, start) in enumerate(zip(expected, starts)):
+        if start < 0:
+            continue
+        for i in written.get(int(start), []):
+            assert matrix[row, i] == mastery[compiled.concepts[i]]
+
+    # The engine's own graph (and its schedules) are still used by default
+    assert propagator.propagate_many([dict(students[0])], [updated[0]]) == \
+        [_reference_propagate(engine_graph, dict(students[0]), updated[0])]
+
+
+def test_graph_edit_invalidates_schedules():
+    graph = ConceptGraph.from_edges([("a", "b", 1.0)])
+    propagator = DependencyPropagator(graph)
+    propagator.propagate({"a": 1.0, "b": 0.0}, "a")
+
+    graph.add_prerequisite("b", "c", 1.0)
+
+    expected = _reference_propagate(graph, {"a": 1.0, "b": 0.0}, "a")
+    assert propagator.propagate({"a": 1.0, "b": 0.0}, "a") == expected
+    assert "c" in expected
+
+
+def _bkt_params(rng, concepts):
+    return {
+        c: BKTParameters(
+            p_init=rng.random(),
+            p_learn=rng.uniform(0.0, 0.4),
+            p_guess=rng.uniform(0.0, 0.4),
+            p_slip=rng.uniform(0.0, 0.3)
+        )
+        for c in concepts
+    }
+
+
+def test_update_batch_matches_update():
+    rng = random.Random(2)
+    concepts = [f"c{i}" for i in range(5)]
+    updater = MasteryUpdater(_bkt_params(rng, concepts))
+
+    cases = [
+        (rng.choice(concepts), rng.choice([0.0, 1.0, rng.random()]), rng.random() < 0.5, rng.choice([0.1, 0.7, 1.0, 5]))
+        for _ in range(2000)
+    ]
+    batch = updater.update_batch(*map(list, zip(*cases)))
+
+    for (concept, mastery, correct, confidence), result in zip(cases, batch):
+        assert result == updater.update(concept, mastery, correct, confidence)
+
+
+def test_replay_matches_sequential_updates():
+    rng = random.Random(3)
+    concepts = [f"c{i}" for i in range(4)]
+    updater = MasteryUpdater(_bkt_params(rng, concepts))
+
+    # Interleaved attempts of many students; "other" has no BKT parameters
+    log = [
+        (rng.randint(1, 30), rng.choice(concepts + ["other"]), rng.random() < 0.6, rng.randint(1, 10) / 10.0)
+        for _ in range(3000)
+    ]
+
+    for initial in (0.5, None):
+        result = updater.replay(log, initial_mastery=initial)
+
+        expected = {}
+        trajectory = []
+        for user_id, concept, correct, confidence in log:
+            if concept not in updater.concept_params:
+                trajectory.append(np.nan)
+                continue
+            student = expected.setdefault(user_id, {})
+            prior = student.get(concept, updater.concept_params[concept].p_init if initial is None else initial)
+            student[concept] = updater.update(concept, prior, correct, confidence)
+            trajectory.append(student[concept])
+
+        assert result["mastery"] == expected
+        np.testing.assert_array_equal(result["trajectory"], np.array(trajectory))
+        assert result["skipped"] == sum(1 for row in log if row[1] == "other")
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.mastery import Mastery
+from app.models.mastery_history import MasteryHistory
+from app.services.persistence import mastery_repository
+from app.services.persistence.mastery_repository import MasteryRepository
+from app.services.persistence.mastery_history_writer import MasteryHistoryWriter
+
+
+def _mastery_rows(db):
+    return sorted(
+        (row.user_id, row.concept, row.mastery_value, row.confidence)
+        for row in db.query(Mastery).all()
+    )
+
+
+@pytest.fixture(params=["on_conflict", "per_row"])
+def upsert_path(request, monkeypatch):
+    if request.param == "per_row":
+        # A dialect without native upsert
+        monkeypatch.setattr(mastery_repository, "_UPSERT_INSERTS", {})
+    monkeypatch.setattr(MasteryRepository, "history_writer", MasteryHistoryWriter(epsilon=0.0))
+    return request.param
+
+
+# --------------------------------------------------
+# Bulk Upsert
+# --------------------------------------------------
+
+def test_upserting_the_same_key_twice_keeps_one_row(db, upsert_path):
+    written = MasteryRepository.bulk_upsert_mastery(db, 1, {"a": (0.4, 0.5), "b": (0.6, 0.5)})
+    db.commit()
+    assert written == ["a", "b"]
+
+    written = MasteryRepository.bulk_upsert_mastery(db, 1, {"a": (0.7, 0.8), "b": (0.6, 0.5)})
+    db.commit()
+    assert written == ["a", "b"]
+
+    assert _mastery_rows(db) == [(1, "a", 0.7, 0.8), (1, "b", 0.6, 0.5)]
+
+
+def test_unchanged_concepts_are_skipped(db, upsert_path):
+    MasteryRepository.bulk_upsert_mastery(db, 1, {"a": (0.4, 0.5)})
+    MasteryRepository.bulk_upsert_mastery(db, 2, {"a": (0.9, 0.5)})
+    db.commit()
+
+    written = MasteryRepository.bulk_upsert_mastery(
+        db, 1,
+        {"a": (0.4, 0.5), "b": (0.3, 0.5)},
+        previous={"a": (0.4, 0.5)}
+    )
+    db.commit()
+
+    assert written == ["b"]
+    assert MasteryRepository.bulk_upsert_mastery(db, 1, {"a": (0.4, 0.5)}, previous={"a": (0.4, 0.5)}) == []
+    assert _mastery_rows(db) == [(1, "a", 0.4, 0.5), (1, "b", 0.3, 0.5), (2, "a", 0.9, 0.5)]
+    assert db.query(MasteryHistory).count() == 3
+
+
+# --------------------------------------------------
+# History Epsilon And Compaction
+# --------------------------------------------------
+
+def _history(db, user_id=1, concept="a"):
+    return [
+        row.mastery_value
+        for row in db.query(MasteryHistory)
+        .filter_by(user_id=user_id, concept=concept)
+        .order_by(MasteryHistory.id)
+    ]
+
+
+def test_history_written_only_past_epsilon(db, upsert_path, monkeypatch):
+    monkeypatch.setattr(MasteryRepository, "history_writer", MasteryHistoryWriter(epsilon=0.01))
+
+    # Each move is compared with the last *recorded* value, so slow drift
+    # is still recorded once it adds up
+    for value in (0.5, 0.505, 0.508, 0.516, 0.52, 0.40):
+        MasteryRepository.bulk_upsert_mastery(db, 1, {"a": (value, 0.5)})
+        db.commit()
+
+    assert _history(db) == [0.5, 0.516, 0.40]
+    assert _mastery_rows(db) == [(1, "a", 0.40, 0.5)]
+
+
+def test_history_epsilon_is_per_student_and_concept(db, upsert_path, monkeypatch):
+    monkeypatch.setattr(MasteryRepository, "history_writer", MasteryHistoryWriter(epsilon=0.01))
+
+    MasteryRepository.bulk_upsert_mastery(db, 1, {"a": (0.5, 0.5), "b": (0.5, 0.5)})
+    MasteryRepository.bulk_upsert_mastery(db, 2, {"a": (0.9, 0.5)})
+    MasteryRepository.bulk_upsert_mastery(db, 1, {"a": (0.505, 0.5), "b": (0.6, 0.5)})
+    MasteryRepository.bulk_upsert_mastery(db, 2, {"a": (0.905, 0.5)})
+    db.commit()
+
+    assert _history(db, 1, "a") == [0.5]
+    assert _history(db, 1, "b") == [0.5, 0.6]
+    assert _history(db, 2, "a") == [0.9]
+
+
+def test_history_epsilon_from_environment(monkeypatch):
+    monkeypatch.setenv("MASTERY_HISTORY_EPSILON", "0.02")
+    assert MasteryHistoryWriter().epsilon == 0.02
+    assert MasteryHistoryWriter(epsilon=0.0).epsilon == 0.0
+
+
+def _add_history(db, user_id, concept, timestamps):
+    for k, timestamp in enumerate(timestamps):
+        db.add(MasteryHistory(
+            user_id=user_id, concept=concept,
+            mastery_value=k / 10, confidence=0.5, timestamp=timestamp
+        ))
+    db.commit()
+
+
+def test_compact_keeps_last_snapshot_per_bucket(db):
+    old = datetime(2020, 3, 1, 10, 0)
+    recent = datetime.utcnow() - timedelta(minutes=5)
+
+    _add_history(db, 1, "a", [old + timedelta(minutes=m) for m in (5, 20, 50, 70)])
+    _add_history(db, 1, "b", [old + timedelta(minutes=m) for m in (10, 30)])
+    _add_history(db, 2, "a", [old + timedelta(minutes=15)])
+    _add_history(db, 1, "a", [recent, recent])
+
+    deleted = MasteryHistoryWriter.compact(db, older_than_days=30, bucket="hour")
+    db.commit()
+
+    assert deleted == 3
+    # Last of 10:05/10:20/10:50, then 11:10; recent rows untouched
+    assert _history(db, 1, "a") == [0.2, 0.3, 0.0, 0.1]
+    assert _history(db, 1, "b") == [0.1]
+    assert _history(db, 2, "a") == [0.0]
+
+    deleted = MasteryHistoryWriter.compact(db, older_than_days=30, bucket="day")
+    db.commit()
+
+    assert deleted == 1
+    assert _history(db, 1, "a")[-2:] == [0.0, 0.1]
+
+
+def test_compact_rejects_unknown_sqlite_bucket(db):
+    with pytest.raises(ValueError):
+        MasteryHistoryWriter.compact(db, bucket="week")
@@ -0,0 +1,126 @@
+import numpy as np
+import joblib
+
+from app.services.risk_engine.risk_model import RiskModel
+from app.services.risk_engine.predictor import RiskPredictor
+from app.services.risk_engine.feature_schema import FEATURE_ORDER
+
+
+def _training_data(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(loc=0.5, scale=[0.2 + 0.5 * i for i in range(len(FEATURE_ORDER))],
+                   size=(n, len(FEATURE_ORDER)))
+    logits = X[:, 0] * -3 + X[:, 2] * 2 + rng.normal(scale=0.5, size=n)
+    y = (logits > np.median(logits)).astype(int)
+    return X, y
+
+
+def _features(row):
+    return dict(zip(FEATURE_ORDER, row))
+
+
+def test_fast_path_matches_predict_proba(tmp_path):
+    X, y = _training_data()
+    model = RiskModel()
+    model.train(X, y)
+    path = tmp_path / "risk_model.joblib"
+    model.save(str(path))
+
+    predictor = RiskPredictor(str(path))
+    assert predictor._linear is not None
+
+    samples, _ = _training_data(n=200, seed=1)
+    # Extreme inputs exercise both branches of the sigmoid
+    samples = np.vstack([samples, samples * 50, samples * -50])
+
+    for row in samples:
+        result = predictor.predict(_features(row))
+
+        # What production computed before the fast path: sklearn fed the
+        # float32 vector, so it scales in float32 while the fast path
+        # scales those same values in float64
+        feature_vector = np.array([row], dtype=np.float32)
+        expected = model.model.predict_proba(feature_vector)[0][1]
+
+        assert abs(result["risk_probability"] - expected) < 1e-5
+        assert result["risk_level"] == RiskPredictor._risk_level(expected)
+
+        # With sklearn also doing float64 math the two agree to rounding
+        exact = model.model.predict_proba(feature_vector.astype(np.float64))[0][1]
+        assert abs(result["risk_probability"] - exact) < 1e-9
+
+
+def test_unknown_model_falls_back_to_sklearn(tmp_path):
+    from sklearn.tree import DecisionTreeClassifier
+
+    X, y = _training_data()
+    tree = DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y)
+    path = tmp_path / "tree.joblib"
+    joblib.dump(tree, path)
+
+    predictor = RiskPredictor(str(path))
+    assert predictor._linear is None
+
+    for row in X[:20]:
+        expected = tree.predict_proba(np.array([row], dtype=np.float32))[0][1]
+        assert predictor.predict(_features(row))["risk_probability"] == expected
+
+
+def test_predict_batch_matches_predict(tmp_path):
+    X, y = _training_data()
+    model = RiskModel()
+    model.train(X, y)
+    path = tmp_path / "risk_model.joblib"
+    model.save(str(path))
+
+    predictor = RiskPredictor(str(path))
+    samples, _ = _training_data(n=100, seed=2)
+
+    batch = predictor.predict_batch(samples)
+
+    assert len(batch) == len(samples)
+    for row, result in zip(samples, batch):
+        single = predictor.predict(_features(row))
+        # Matrix and vector products may sum in a different order
+        assert abs(result["risk_probability"] - single["risk_probability"]) < 1e-12
+        assert result["risk_level"] == single["risk_level"]
+
+
+def test_extract_batch_matches_extract_features():
+    from app.services.cognitive_engine.concept_graph import ConceptGraph
+    from app.services.risk_engine.feature_extractor import RiskFeatureExtractor
+
+    graph = ConceptGraph()
+    for parent, child in [("a", "b"), ("b", "c"), ("a", "d"), ("d", "c"), ("c", "e")]:
+        graph.add_prerequisite(parent, child)
+    extractor = RiskFeatureExtractor(graph)
+
+    rng = np.random.default_rng(3)
+    concepts = sorted(graph.nodes)
+    students = []
+    for i in range(40):
+        chosen = rng.choice(concepts, size=rng.integers(1, len(concepts) + 1), replace=False)
+        students.append({
+            "mastery": {c: float(rng.random()) for c in chosen},
+            "confidence": {"avg_confidence": float(rng.random()), "reliability": 0.5},
+            "attempts": [
+                {"correct": bool(rng.random() < 0.6), "time_taken": float(rng.random() * 30),
+                 "retry_count": int(rng.integers(0, 3))}
+                for _ in range(rng.integers(0, 15))
+            ],
+            "decay": {c: float(rng.random() * 0.1) for c in chosen[:2]} if i % 3 else {}
+        })
+
+    matrix = extractor.extract_batch(
+        [s["mastery"] for s in students],
+        [s["confidence"] for s in students],
+        [s["attempts"] for s in students],
+        [s["decay"] for s in students]
+    )
+
+    assert matrix.shape == (len(students), len(FEATURE_ORDER))
+    for student, row in zip(students, matrix):
+        expected, _ = extractor.extract_features(
+            student["mastery"], student["confidence"], student["attempts"], student["decay"]
+        )
+        np.testing.assert_allclose(row, expected, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,111 @@
+import asyncio
+
+from app.services.core.student_state import StudentState
+from app.services.core.student_state_cache import StudentStateCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Loader:
+    """Counting loader; returns a new StudentState per call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, user_id):
+        self.calls.append(user_id)
+        return StudentState(str(user_id))
+
+    def for_user(self, user_id):
+        return lambda: self(user_id)
+
+    def for_user_async(self, user_id):
+        async def load():
+            await asyncio.sleep(0)
+            return self(user_id)
+        return load
+
+
+def test_get_or_load_loads_once_until_expiry():
+    clock = _Clock()
+    cache = StudentStateCache(ttl_seconds=60, clock=clock)
+    loader = _Loader()
+
+    first = cache.get_or_load(1, loader.for_user(1))
+    assert cache.get_or_load(1, loader.for_user(1)) is first
+    assert loader.calls == [1]
+
+    clock.now += 60
+    assert cache.get(1) is first    # expires strictly after the TTL
+
+    clock.now += 0.001
+    assert cache.get(1) is None
+    second = cache.get_or_load(1, loader.for_user(1))
+    assert second is not first
+    assert loader.calls == [1, 1]
+
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 3
+
+
+def test_get_or_load_async_loads_once():
+    cache = StudentStateCache(clock=_Clock())
+    loader = _Loader()
+
+    async def run():
+        first = await cache.get_or_load_async(7, loader.for_user_async(7))
+        second = await cache.get_or_load_async(7, loader.for_user_async(7))
+        other = await cache.get_or_load_async(8, loader.for_user_async(8))
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+
+    assert first is second
+    assert other is not first
+    assert loader.calls == [7, 8]
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = StudentStateCache(max_size=3, clock=_Clock())
+    loader = _Loader()
+
+    for user_id in (1, 2, 3):
+        cache.put(user_id, loader(user_id))
+
+    cache.get(1)                    # 2 is now least recently used
+    cache.put(4, loader(4))
+
+    assert cache.get(2) is None
+    assert all(cache.get(user_id) is not None for user_id in (1, 3, 4))
+
+    cache.put(3, loader(3))         # re-put refreshes recency too
+    cache.put(5, loader(5))
+    assert cache.get(1) is None
+    assert cache.stats()["size"] == 3
+
+
+def test_put_refreshes_ttl_and_invalidate_forces_reload():
+    clock = _Clock()
+    cache = StudentStateCache(ttl_seconds=10, clock=clock)
+    loader = _Loader()
+
+    state = cache.get_or_load(1, loader.for_user(1))
+    clock.now += 8
+    cache.put(1, state)
+    clock.now += 8
+    assert cache.get(1) is state
+
+    cache.invalidate(1)
+    cache.invalidate(99)            # unknown ids are ignored
+    assert cache.get_or_load(1, loader.for_user(1)) is not state
+    assert loader.calls == [1, 1]
+
+    cache.clear()
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,38 @@
+import random
+
+from app.models.attempt import Attempt
+from app.models.question import Question
+from app.services.persistence.student_state_repository import StudentStateRepository
+
+
+def test_latest_concept_attempts_match_the_pipeline_window(db):
+    rng = random.Random(6)
+
+    questions = [Question(concept=f"c{k % 4}", question_text=f"q{k}", correct_answer="a") for k in range(12)]
+    db.add_all(questions)
+    db.commit()
+
+    # Interleaved attempts of several students across concepts
+    db.add_all([
+        Attempt(user_id=rng.randint(1, 4), question_id=rng.choice(questions).id, is_correct=rng.random() < 0.6)
+        for _ in range(400)
+    ])
+    db.commit()
+
+    recent = StudentStateRepository.latest_concept_attempts_many(db, [1, 2, 3, 4, 5], limit=10)
+
+    for user_id in (1, 2, 3, 4):
+        last = (
+            db.query(Question.concept)
+            .join(Attempt, Attempt.question_id == Question.id)
+            .filter(Attempt.user_id == user_id)
+            .order_by(Attempt.id.desc())
+            .first()
+        ).concept
+
+        # What process_submission passed the extractor for this concept
+        history = StudentStateRepository.load_attempt_history(db, user_id)[last]
+        assert recent[user_id] == [{"correct": correct} for correct in history[-10:]]
+
+    assert recent[5] == []
+    assert StudentStateRepository.latest_concept_attempts_many(db, []) == {}
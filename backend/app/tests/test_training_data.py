@@ -0,0 +1,181 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.core.training_data_store import TrainingDataStore
+from app.services.core.training_sample_sink import (
+    DatabaseTrainingBackend,
+    FileTrainingBackend,
+    TrainingSampleSink
+)
+
+
+# --------------------------------------------------
+# Training Sample Sink
+# --------------------------------------------------
+
+class _GatedBackend:
+    """Holds the drain thread inside write_batch until released"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.batches = []
+
+    def write_batch(self, records):
+        self.entered.set()
+        assert self.release.wait(5)
+        self.batches.append(len(records))
+        self.backend.write_batch(records)
+
+    def load_all(self):
+        return self.backend.load_all()
+
+    def close(self):
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+
+@pytest.fixture(params=["database", "file"])
+def backends(request, session_factory, tmp_path):
+    """(backend, reopen) where reopen() gives a new backend over the same storage"""
+    if request.param == "database":
+        return DatabaseTrainingBackend(session_factory), lambda: DatabaseTrainingBackend(session_factory)
+
+    path = str(tmp_path / "training_data.jsonl")
+    return (
+        FileTrainingBackend(TrainingDataStore(path, flush_every=4)),
+        lambda: FileTrainingBackend(TrainingDataStore(path))
+    )
+
+
+def test_full_queue_drops_and_close_persists_the_rest(backends):
+    backend, reopen = backends
+    gated = _GatedBackend(backend)
+    sink = TrainingSampleSink(gated, capacity=10, batch_size=4, flush_interval=0.05)
+
+    # The first sample is taken by the drain thread, which then blocks
+    sink.append(np.array([0.0, 0.5], dtype=np.float32), np.int64(0))
+    assert gated.entered.wait(5)
+
+    for i in range(1, 16):
+        sink.append(np.array([float(i), 0.5], dtype=np.float32), np.int64(i % 2))
+
+    assert sink.stats()["queued"] == 10
+    assert sink.dropped == 5
+
+    gated.release.set()
+    sink.close()
+
+    assert sink.stats() == {"queued": 0, "capacity": 10, "written": 11, "dropped": 5, "failed": 0}
+    assert gated.batches == [1, 4, 4, 2]
+
+    records = reopen().load_all()
+    assert [r["features"] for r in records] == [[float(i), 0.5] for i in range(11)]
+    assert [r["label"] for r in records] == [i % 2 for i in range(11)]
+
+
+def test_flush_hands_everything_to_the_backend(backends):
+    backend, _ = backends
+    sink = TrainingSampleSink(backend, capacity=100, batch_size=8, flush_interval=0.05)
+    for i in range(30):
+        sink.append([i], 1)
+
+    sink.flush()
+    assert sink.written == 30
+    assert [r["features"] for r in sink.load_all()] == [[i] for i in range(30)]
+    sink.close()
+
+
+def test_failed_batch_is_counted_and_drain_continues():
+    class _FlakyBackend:
+        def __init__(self):
+            self.records = []
+
+        def write_batch(self, records):
+            if any(r["label"] == -1 for r in records):
+                raise RuntimeError("disk full")
+            self.records.extend(records)
+
+    flaky = _FlakyBackend()
+    sink = TrainingSampleSink(flaky, batch_size=1, flush_interval=0.05)
+    for label in (1, -1, 0):
+        sink.append([0.0], label)
+    sink.close()
+
+    assert (sink.written, sink.failed) == (2, 1)
+    assert [r["label"] for r in flaky.records] == [1, 0]
+
+
+# --------------------------------------------------
+# Training Data Store
+# --------------------------------------------------
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [line for line in f if line.strip()]
+
+
+def test_legacy_json_is_migrated_and_round_trips(tmp_path):
+    legacy = [
+        {"features": [0.1, 0.2], "label": 1, "timestamp": "2024-01-01T00:00:00"},
+        {"features": [0.3, 0.4], "label": 0, "timestamp": "2024-01-02T00:00:00"},
+    ]
+    (tmp_path / "training_data.json").write_text(json.dumps(legacy, indent=2))
+
+    path = str(tmp_path / "training_data.jsonl")
+    store = TrainingDataStore(path)
+
+    assert not (tmp_path / "training_data.json").exists()
+    assert json.loads((tmp_path / "training_data.json.migrated").read_text()) == legacy
+    assert not (tmp_path / "training_data.jsonl.tmp").exists()
+    assert [json.loads(line) for line in _lines(path)] == legacy
+
+    store.append(np.array([0.5, 0.6]), 1)
+    records = store.load_all()
+    store.close()
+
+    assert records[:2] == legacy
+    assert records[2]["features"] == [0.5, 0.6] and records[2]["label"] == 1
+
+    # Migrated once: reopening reads the JSONL and leaves the backup alone
+    assert TrainingDataStore(path).load_all() == records
+
+
+def test_legacy_array_at_path_is_rewritten_as_jsonl(tmp_path):
+    path = tmp_path / "training_data.jsonl"
+    path.write_text(
+        json.dumps([{"features": [1], "label": 1}])
+        + "\n" + json.dumps({"features": [2], "label": 0}) + "\n"
+    )
+
+    store = TrainingDataStore(str(path))
+
+    assert path.read_text().startswith("{")
+    assert (tmp_path / "training_data.jsonl.migrated").read_text().startswith("[")
+    assert store.load_all() == [{"features": [1], "label": 1}, {"features": [2], "label": 0}]
+    store.close()
+
+
+def test_appends_are_buffered_until_flush_every(tmp_path):
+    path = str(tmp_path / "training_data.jsonl")
+    store = TrainingDataStore(path, flush_every=3, fsync_interval=3600)
+
+    store.append([1], 1)
+    store.append([2], 0)
+    assert _lines(path) == []
+
+    store.append([3], 1)
+    assert len(_lines(path)) == 3
+
+    store.append([4], 0)
+    assert len(_lines(path)) == 3
+
+    store.close()
+    assert [json.loads(line)["features"] for line in _lines(path)] == [[1], [2], [3], [4]]
+
+    # Reading a closed store still works
+    assert len(store.load_all()) == 4
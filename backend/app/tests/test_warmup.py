@@ -0,0 +1,118 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app import main
+from app.core import service_container, warmup
+from app.services.analytics.class_mastery_aggregate import ClassMasteryAggregate
+from app.services.cognitive_engine.concept_graph import ConceptGraph
+from app.services.cognitive_engine.pipeline import CognitivePipeline
+from app.services.risk_engine.feature_schema import FEATURE_ORDER
+from app.services.risk_engine.risk_model import RiskModel
+
+
+class _RecordingSink:
+    def __init__(self):
+        self.samples = []
+
+    def append(self, features, label, timestamp=None):
+        self.samples.append((features, label))
+
+
+class _GatedPredictor:
+    """Blocks predict() until released, to observe warmup while it runs"""
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def predict(self, features):
+        self.entered.set()
+        assert self.release.wait(5)
+        return self.predictor.predict(features)
+
+
+@pytest.fixture
+def services(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, len(FEATURE_ORDER)))
+    y = (X[:, 0] > 0).astype(int)
+    model = RiskModel()
+    model.train(X, y)
+    model.save(str(tmp_path / "risk_model.joblib"))
+
+    graph = ConceptGraph.from_edges([("algebra", "probability", 0.8)])
+    pipeline = CognitivePipeline(
+        graph=graph,
+        risk_model_path=str(tmp_path / "risk_model.joblib"),
+        training_data_store=_RecordingSink(),
+        class_aggregate=ClassMasteryAggregate()
+    )
+    services = SimpleNamespace(pipeline=pipeline, concept_graph=graph)
+
+    monkeypatch.setattr(service_container, "get_service_container", lambda: services)
+    monkeypatch.setattr(warmup, "_state", warmup.WarmupState())
+    return services
+
+
+def _health():
+    response = main.health_check()
+    if isinstance(response, dict):
+        return 200, response
+    return response.status_code, json.loads(response.body)
+
+
+def test_health_is_503_until_warmup_is_ready(services):
+    assert _health()[0] == 200                      # disabled
+
+    gated = _GatedPredictor(services.pipeline.risk_predictor)
+    services.pipeline.risk_predictor = gated
+
+    thread = warmup.start_warmup()
+    assert gated.entered.wait(5)
+
+    status, body = _health()
+    assert status == 503
+    assert body["status"] == "warming_up"
+    assert body["warmup"]["status"] == "running"
+
+    gated.release.set()
+    thread.join(5)
+
+    status, body = _health()
+    assert status == 200
+    assert body["warmup"]["status"] == "ready"
+    assert set(body["warmup"]["timings_ms"]) == {"pipeline_build", "process_submission", "total"}
+
+
+def test_warmup_does_not_touch_the_real_sink_or_aggregate(services):
+    pipeline = services.pipeline
+    sink, aggregate = pipeline.training_data_store, pipeline.class_aggregate
+
+    warmup.run_warmup()
+
+    assert warmup.warmup_status()["status"] == "ready"
+    assert sink.samples == []
+    assert aggregate.risk_summary()["total_students"] == 0
+    assert pipeline.training_data_store is sink
+    assert pipeline.class_aggregate is aggregate
+
+
+def test_broken_pipeline_keeps_health_at_503(services):
+    class _Broken:
+        def predict(self, features):
+            raise RuntimeError("model file is corrupt")
+
+    services.pipeline.risk_predictor = _Broken()
+
+    warmup.run_warmup()
+
+    status, body = _health()
+    assert status == 503
+    assert body["status"] == "unhealthy"
+    assert body["warmup"]["status"] == "failed"
+    assert "corrupt" in body["warmup"]["error"]
@@ -0,0 +1,71 @@
+"""
+Benchmark for HeatmapBuilder.matrix_from_columns.
+Shows that building the class matrix scales linearly with the number of mastery rows.
+
+Run from backend directory: python benchmark_heatmap.py
+Optional: python benchmark_heatmap.py <max_students> <concepts>
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.analytics.heatmap_builder import HeatmapBuilder
+
+
+def synthetic_columns(n_students, n_concepts, seed=42):
+    """Every student has a mastery row for every concept, in shuffled order."""
+    rng = np.random.default_rng(seed)
+    names = [f"concept_{i:03d}" for i in range(n_concepts)]
+
+    n_rows = n_students * n_concepts
+    order = rng.permutation(n_rows)
+
+    user_ids = (order // n_concepts) + 1
+    concepts = [names[i] for i in (order % n_concepts)]
+    values = rng.random(n_rows)
+
+    return user_ids, concepts, values
+
+
+def run(max_students=100_000, n_concepts=200):
+    sizes = []
+    n = 1_000
+    while n <= max_students:
+        sizes.append(n)
+        n *= 10
+    if sizes[-1] != max_students:
+        sizes.append(max_students)
+
+    print(f"Heatmap matrix build, {n_concepts} concepts\n")
+    print(f"{'students':>10} {'rows':>12} {'seconds':>10} {'ns/row':>10}")
+
+    per_row = []
+    for n_students in sizes:
+        user_ids, concepts, values = synthetic_columns(n_students, n_concepts)
+
+        start = time.perf_counter()
+        result = HeatmapBuilder.matrix_from_columns(
+            user_ids, concepts, values, as_array=True
+        )
+        elapsed = time.perf_counter() - start
+
+        n_rows = len(values)
+        assert result["matrix"].shape == (n_students, n_concepts)
+
+        per_row.append(elapsed / n_rows * 1e9)
+        print(f"{n_students:>10} {n_rows:>12} {elapsed:>10.3f} {per_row[-1]:>10.1f}")
+
+        del user_ids, concepts, values, result
+
+    # Linear scaling means cost per row stays roughly flat as rows grow 100x
+    print(f"\nns/row ratio largest/smallest: {per_row[-1] / per_row[0]:.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*args)
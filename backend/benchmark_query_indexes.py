@@ -0,0 +1,186 @@
+"""
+Benchmark for the composite indexes added by migrate_add_composite_indexes.py.
+
+Seeds a dedicated database with ~1M attempts, then runs the hot query
+shapes from quiz_routes.py, teacher_routes.py and InsightGenerator with
+the composite indexes dropped and again after creating them, printing
+the query plan and median latency of each.
+
+Run from backend directory: python benchmark_query_indexes.py [attempts]
+Target database: BENCH_DATABASE_URL (default sqlite:///benchmark_indexes.db).
+Never point it at a production database - tables are dropped and reseeded.
+"""
+
+import os
+import sys
+import time
+import random
+import statistics
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///benchmark_indexes.db")
+os.environ.setdefault("DATABASE_URL", BENCH_DATABASE_URL)
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine, text
+
+from app.db.base import Base
+from app.models.user import User
+from app.models.question import Question
+from app.models.attempt import Attempt
+from app.models.mastery import Mastery
+from app.models.mastery_history import MasteryHistory
+from app.models.risk_history import RiskHistory
+from app.models.classroom import Classroom
+from app.models.classroom_student import ClassroomStudent
+from migrate_add_composite_indexes import add_composite_indexes, drop_composite_indexes
+
+N_USERS = 5_000
+N_QUESTIONS = 2_000
+N_CONCEPTS = 50
+N_CLASSROOMS = 50
+HISTORY_PER_USER = 100
+RISK_PER_USER = 20
+RUNS = 25
+
+HOT_QUERIES = {
+    "attempt history (quiz_routes hydration)": """
+        SELECT q.concept, a.is_correct FROM attempts a
+        JOIN questions q ON q.id = a.question_id
+        WHERE a.user_id = :user_id ORDER BY a.id
+    """,
+    "recent attempts (dashboards)": """
+        SELECT * FROM attempts WHERE user_id = :user_id ORDER BY id DESC LIMIT 10
+    """,
+    "calibration gap (InsightGenerator)": """
+        SELECT AVG(confidence), AVG(CASE WHEN is_correct THEN 1.0 ELSE 0.0 END)
+        FROM attempts WHERE user_id = :user_id
+    """,
+    "latest risk (student state)": """
+        SELECT * FROM risk_history WHERE student_id = :student_id
+        ORDER BY timestamp DESC LIMIT 1
+    """,
+    "volatility window (InsightGenerator)": """
+        SELECT mastery_value FROM mastery_history
+        WHERE user_id = :user_id AND concept = :concept
+        ORDER BY timestamp DESC LIMIT 10
+    """,
+    "roster (teacher_routes)": """
+        SELECT student_id FROM classroom_students WHERE classroom_id = :classroom_id
+    """,
+    "student classrooms (access check)": """
+        SELECT classroom_id FROM classroom_students WHERE student_id = :user_id
+    """,
+}
+
+
+def chunked_insert(connection, table, rows, chunk=50_000):
+    for i in range(0, len(rows), chunk):
+        connection.execute(table.insert(), rows[i:i + chunk])
+
+
+def seed(engine, n_attempts):
+    print(f"Seeding {n_attempts:,} attempts into {engine.url}...")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(42)
+    concepts = [f"concept_{i}" for i in range(N_CONCEPTS)]
+    now = datetime.utcnow()
+
+    with engine.begin() as connection:
+        chunked_insert(connection, User.__table__, [
+            {"id": u, "email": f"user{u}@bench.local", "password_hash": "x",
+             "role": "teacher" if u <= N_CLASSROOMS else "student"}
+            for u in range(1, N_USERS + 1)
+        ])
+        chunked_insert(connection, Question.__table__, [
+            {"id": q, "topic": "bench", "concept": concepts[q % N_CONCEPTS],
+             "difficulty": 1 + q % 5, "question_text": f"q{q}", "correct_answer": "a"}
+            for q in range(1, N_QUESTIONS + 1)
+        ])
+        chunked_insert(connection, Classroom.__table__, [
+            {"id": c, "name": f"class{c}", "subject": "bench", "teacher_id": c}
+            for c in range(1, N_CLASSROOMS + 1)
+        ])
+        chunked_insert(connection, ClassroomStudent.__table__, [
+            {"classroom_id": 1 + u % N_CLASSROOMS, "student_id": u}
+            for u in range(N_CLASSROOMS + 1, N_USERS + 1)
+        ])
+        chunked_insert(connection, Attempt.__table__, [
+            {"user_id": rng.randint(1, N_USERS), "question_id": rng.randint(1, N_QUESTIONS),
+             "is_correct": rng.random() < 0.6, "confidence": rng.randint(1, 10)}
+            for _ in range(n_attempts)
+        ])
+        chunked_insert(connection, Mastery.__table__, [
+            {"user_id": u, "concept": c, "mastery_value": rng.random(), "confidence": 0.5}
+            for u in range(1, N_USERS + 1) for c in concepts[:10]
+        ])
+        chunked_insert(connection, MasteryHistory.__table__, [
+            {"user_id": u, "concept": concepts[i % 10], "mastery_value": rng.random(),
+             "confidence": 0.5, "timestamp": now - timedelta(minutes=i)}
+            for u in range(1, N_USERS + 1) for i in range(HISTORY_PER_USER)
+        ])
+        chunked_insert(connection, RiskHistory.__table__, [
+            {"student_id": str(u), "risk_label": 0, "risk_score": rng.random(),
+             "timestamp": now - timedelta(hours=i)}
+            for u in range(1, N_USERS + 1) for i in range(RISK_PER_USER)
+        ])
+
+
+def explain(connection, sql, params):
+    if connection.dialect.name == "postgresql":
+        rows = connection.execute(text("EXPLAIN ANALYZE " + sql), params).all()
+        return [r[0] for r in rows]
+    rows = connection.execute(text("EXPLAIN QUERY PLAN " + sql), params).all()
+    return [r[-1] for r in rows]
+
+
+def measure(engine, label):
+    print(f"\n===== {label} =====")
+    rng = random.Random(7)
+    results = {}
+
+    with engine.connect() as connection:
+        for name, sql in HOT_QUERIES.items():
+            samples = []
+            for _ in range(RUNS):
+                user_id = rng.randint(N_CLASSROOMS + 1, N_USERS)
+                params = {
+                    "user_id": user_id,
+                    "student_id": str(user_id),
+                    "concept": f"concept_{rng.randint(0, 9)}",
+                    "classroom_id": rng.randint(1, N_CLASSROOMS),
+                }
+                start = time.perf_counter()
+                connection.execute(text(sql), params).all()
+                samples.append((time.perf_counter() - start) * 1000)
+
+            results[name] = statistics.median(samples)
+            print(f"\n{name}: median {results[name]:.3f} ms")
+            for line in explain(connection, sql, params):
+                print(f"    {line}")
+
+    return results
+
+
+def run(n_attempts=1_000_000):
+    engine = create_engine(BENCH_DATABASE_URL)
+    seed(engine, n_attempts)
+
+    drop_composite_indexes(engine)
+    before = measure(engine, "BEFORE composite indexes")
+
+    add_composite_indexes(engine)
+    after = measure(engine, "AFTER composite indexes")
+
+    print(f"\n{'query':<42} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in HOT_QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<42} {before[name]:>10.3f} {after[name]:>10.3f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run(*[int(a) for a in sys.argv[1:]])
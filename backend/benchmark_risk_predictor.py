@@ -0,0 +1,72 @@
+"""
+Microbenchmark for RiskPredictor.predict.
+Compares the sklearn predict_proba path with the precomputed numpy path
+on a freshly trained StandardScaler + LogisticRegression model.
+
+Run from backend directory: python benchmark_risk_predictor.py
+Optional: python benchmark_risk_predictor.py <calls>
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.risk_engine.risk_model import RiskModel
+from app.services.risk_engine.predictor import RiskPredictor
+from app.services.risk_engine.feature_schema import FEATURE_ORDER
+
+
+def time_calls(predictor, samples):
+    start = time.perf_counter()
+    for features in samples:
+        predictor.predict(features)
+    return (time.perf_counter() - start) / len(samples) * 1e6
+
+
+def run(calls=20_000):
+    rng = np.random.default_rng(42)
+    X = rng.random((2_000, len(FEATURE_ORDER)))
+    y = (X[:, 0] + rng.normal(scale=0.2, size=len(X)) < 0.5).astype(int)
+
+    model = RiskModel()
+    model.train(X, y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "risk_model.joblib")
+        model.save(path)
+        fast = RiskPredictor(path)
+
+    slow = RiskPredictor.__new__(RiskPredictor)
+    slow.model = fast.model
+    slow._linear = None  # force the sklearn path
+
+    samples = [
+        dict(zip(FEATURE_ORDER, row))
+        for row in rng.random((calls, len(FEATURE_ORDER)))
+    ]
+
+    # Warm both paths
+    time_calls(slow, samples[:100])
+    time_calls(fast, samples[:100])
+
+    sklearn_us = time_calls(slow, samples)
+    numpy_us = time_calls(fast, samples)
+
+    max_diff = max(
+        abs(slow.predict(f)["risk_probability"] - fast.predict(f)["risk_probability"])
+        for f in samples[:1_000]
+    )
+
+    print(f"{'path':<24} {'us / predict':>14}")
+    print(f"{'sklearn predict_proba':<24} {sklearn_us:>14.2f}")
+    print(f"{'numpy fast path':<24} {numpy_us:>14.2f}")
+    print(f"\nspeedup: {sklearn_us / numpy_us:.1f}x   max |p_sklearn - p_fast|: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    run(*[int(a) for a in sys.argv[1:]])
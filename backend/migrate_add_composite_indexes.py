@@ -0,0 +1,60 @@
+"""
+Migration script to add composite indexes for the hot query shapes.
+Run this after updating the Attempt, MasteryHistory, RiskHistory and
+ClassroomStudent models with their __table_args__ indexes.
+
+Query shapes covered:
+- attempts:           WHERE user_id = ? ORDER BY id           (history hydration, recent attempts)
+- mastery_history:    WHERE user_id = ? AND concept = ? ORDER BY timestamp   (InsightGenerator)
+- risk_history:       WHERE student_id = ? ORDER BY timestamp DESC           (latest risk)
+- classroom_students: WHERE classroom_id = ? / WHERE student_id = ?          (rosters, access checks)
+
+The (user_id, concept) key on mastery is added by migrate_mastery_unique_key.py.
+"""
+
+from sqlalchemy import text, inspect
+from app.db.session import engine
+
+COMPOSITE_INDEXES = [
+    ("ix_attempts_user_id_id", "attempts", "user_id, id"),
+    ("ix_mastery_history_user_concept_ts", "mastery_history", "user_id, concept, timestamp"),
+    ("ix_risk_history_student_ts", "risk_history", "student_id, timestamp"),
+    ("ix_classroom_students_classroom_student", "classroom_students", "classroom_id, student_id"),
+    ("ix_classroom_students_student", "classroom_students", "student_id"),
+]
+
+def add_composite_indexes(target_engine=engine):
+    """Create each composite index if it doesn't exist"""
+
+    inspector = inspect(target_engine)
+
+    with target_engine.connect() as connection:
+        for name, table, columns in COMPOSITE_INDEXES:
+            existing = {idx['name'] for idx in inspector.get_indexes(table)}
+            if name in existing:
+                print(f"✓ {name} already exists")
+                continue
+
+            print(f"Creating {name} on {table} ({columns})...")
+            try:
+                connection.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+                connection.commit()
+                print(f"✓ {name} created")
+            except Exception as e:
+                connection.rollback()
+                print(f"Error: {str(e)}")
+                raise
+
+def drop_composite_indexes(target_engine=engine):
+    """Drop the composite indexes (used by the benchmark's 'before' run)"""
+
+    with target_engine.connect() as connection:
+        for name, _, _ in COMPOSITE_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        connection.commit()
+
+if __name__ == "__main__":
+    try:
+        add_composite_indexes()
+    except Exception as e:
+        print(f"\nMigration failed: {str(e)}")
@@ -0,0 +1,45 @@
+"""
+Migration script to add the (user_id, concept) unique key on the mastery table.
+Required by MasteryRepository.bulk_upsert_mastery (INSERT ... ON CONFLICT).
+Duplicate rows are collapsed first, keeping the most recent (highest id) row.
+"""
+
+from sqlalchemy import text, inspect
+from app.db.session import engine
+
+def add_mastery_unique_key():
+    """Deduplicate mastery rows and create uq_mastery_user_concept if missing"""
+
+    inspector = inspect(engine)
+    existing = {idx['name'] for idx in inspector.get_indexes('mastery')}
+    existing |= {uc['name'] for uc in inspector.get_unique_constraints('mastery')}
+
+    if 'uq_mastery_user_concept' in existing:
+        print("✓ uq_mastery_user_concept already exists")
+        return
+
+    with engine.connect() as connection:
+        try:
+            result = connection.execute(text("""
+                DELETE FROM mastery
+                WHERE id NOT IN (
+                    SELECT MAX(id) FROM mastery GROUP BY user_id, concept
+                )
+            """))
+            print(f"Removed {result.rowcount} duplicate mastery rows")
+
+            connection.execute(text("""
+                CREATE UNIQUE INDEX uq_mastery_user_concept ON mastery (user_id, concept)
+            """))
+            connection.commit()
+            print("✓ Unique key uq_mastery_user_concept created")
+        except Exception as e:
+            connection.rollback()
+            print(f"Error: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    try:
+        add_mastery_unique_key()
+    except Exception as e:
+        print(f"\nMigration failed: {str(e)}")